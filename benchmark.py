@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+import argparse
+import json
+import os
+import sys
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--sizes", default="small,medium")
+parser.add_argument("--repeat", type=int, default=20)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--stampede", type=int, default=50)
+parser.add_argument("--aggregate-keys", default="10000,100000")
+parser.add_argument("--stats-years", type=int, default=5)
+parser.add_argument("-o", "--output")
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "shiftplanner.settings")
+    with open("env.txt") as fp:
+        for line in fp:
+            if "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            os.environ[k.strip()] = v.strip()
+    import django
+
+    django.setup()
+
+    from django.test.utils import setup_test_environment
+
+    from shifts import benchmark
+
+    args = parser.parse_args()
+    sizes = args.sizes.split(",")
+    for size in sizes:
+        if size not in benchmark.SIZES:
+            parser.error(
+                "unknown size %r (choose from %s)" % (size, ", ".join(benchmark.SIZES))
+            )
+    setup_test_environment()
+    aggregate_keys = [int(n) for n in args.aggregate_keys.split(",") if n]
+    result = benchmark.run(
+        sizes, args.repeat, args.seed, args.stampede, aggregate_keys, args.stats_years
+    )
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(result, fp, indent=2)
+            fp.write("\n")
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -38,10 +38,10 @@ object-assign
 Error generating stack: `+o.message+`
 `+o.stack}return{value:e,source:t,stack:l}}function go(e,t){try{console.error(t.value)}catch(n){setTimeout(function(){throw n})}}var Xf=typeof WeakMap=="function"?WeakMap:Map;function Na(e,t,n){n=Ye(-1,n),n.tag=3,n.payload={element:null};var r=t.value;return n.callback=function(){Gr||(Gr=!0,Eo=r),go(e,t)},n}function La(e,t,n){n=Ye(-1,n),n.tag=3;var r=e.type.getDerivedStateFromError;if(typeof r=="function"){var l=t.value;n.payload=function(){return go(e,t),r(l)}}var o=e.stateNode;return o!==null&&typeof o.componentDidCatch=="function"&&(n.callback=function(){typeof r!="function"&&(Te===null?Te=new Set([this]):Te.add(this),go(e,t));var i=t.stack;this.componentDidCatch(t.value,{componentStack:i!==null?i:""})}),n}var Zf=typeof WeakSet=="function"?WeakSet:Set;function zu(e){var t=e.ref;if(t!==null)if(typeof t=="function")try{t(null)}catch(n){Ze(e,n)}else t.current=null}function Jf(e,t){switch(t.tag){case 0:case 11:case 15:case 22:return;case 1:if(t.flags&256&&e!==null){var n=e.memoizedProps,r=e.memoizedState;e=t.stateNode,t=e.getSnapshotBeforeUpdate(t.elementType===t.type?n:Ee(t.type,n),r),e.__reactInternalSnapshotBeforeUpdate=t}return;case 3:t.flags&256&&ti(t.stateNode.containerInfo);return;case 5:case 6:case 4:case 17:return}throw Error(_(163))}function qf(e,t,n){switch(n.tag){case 0:case 11:case 15:case 22:if(t=n.updateQueue,t=t!==null?t.lastEffect:null,t!==null){e=t=t.next;do{if((e.tag&3)===3){var r=e.create;e.destroy=r()}e=e.next}while(e!==t)}if(t=n.updateQueue,t=t!==null?t.lastEffect:null,t!==null){e=t=t.next;do{var l=e;r=l.next,l=l.tag,l&4&&l&1&&(Ua(n,e),id(n,e)),e=r}while(e!==t)}return;case 1:e=n.stateNode,n.flags&4&&(t===null?e.componentDidMount():(r=n.elementType===n.type?t.memoizedProps:Ee(n.type,t.memoizedProps),e.componentDidUpdate(r,t.memoizedState,e.__reactInternalSnapshotBeforeUpdate))),t=n.updateQueue,t!==null&&vu(n,t,e);return;case 3:if(t=n.updateQueue,t!==null){if(e=null,n.child!==null)switch(n.child.tag){case 5:e=n.child.stateNode;break;case 1:e=n.child.stateNode}vu(n,t,e)}return;case 5:e=n.stateNode,t===null&&n.flags&4&&ta(n.type,n.memoizedProps)&&e.focus();return;case 6:return;case 4:return;case 12:return;case 13:n.memoizedState===null&&(n=n.alternate,n!==null&&(n=n.memoizedState,n!==null&&(n=n.dehydrated,n!==null&&js(n))));return;case 19:case 17:case 20:case 21:case 23:case 24:return}throw Error(_(163))}function Fu(e,t){for(var n=e;;){if(n.tag===5){var r=n.stateNode;if(t)r=r.style,typeof r.setProperty=="function"?r.setProperty("display","none","important"):r.display="none";else{r=n.stateNode;var l=n.memoizedProps.style;l=l!=null&&l.hasOwnProperty("display")?l.display:null,r.style.display=_s("display",l)}}else if(n.tag===6)n.stateNode.nodeValue=t?"":n.memoizedProps;else if((n.tag!==23&&n.tag!==24||n.memoizedState===null||n===e)&&n.child!==null){n.child.return=n,n=n.child;continue}if(n===e)break;for(;n.sibling===null;){if(n.return===null||n.return===e)return;n=n.return}n.sibling.return=n.return,n=n.sibling}}function $u(e,t){if(mt&&typeof mt.onCommitFiberUnmount=="function")try{mt.onCommitFiberUnmount(ni,t)}catch{}switch(t.tag){case 0:case 11:case 14:case 15:case 22:if(e=t.updateQueue,e!==null&&(e=e.lastEffect,e!==null)){var n=e=e.next;do{var r=n,l=r.destroy;if(r=r.tag,l!==void 0)if(r&4)Ua(t,n);else{r=t;try{l()}catch(o){Ze(r,o)}}n=n.next}while(n!==e)}break;case 1:if(zu(t),e=t.stateNode,typeof e.componentWillUnmount=="function")try{e.props=t.memoizedProps,e.state=t.memoizedState,e.componentWillUnmount()}catch(o){Ze(t,o)}break;case 5:zu(t);break;case 4:Oa(e,t)}}function Uu(e){e.alternate=null,e.child=null,e.dependencies=null,e.firstEffect=null,e.lastEffect=null,e.memoizedProps=null,e.memoizedState=null,e.pendingProps=null,e.return=null,e.updateQueue=null}function Wu(e){return e.tag===5||e.tag===3||e.tag===4}function Vu(e){e:{for(var t=e.return;t!==null;){if(Wu(t))break e;t=t.return}throw Error(_(160))}var n=t;switch(t=n.stateNode,n.tag){case 5:var r=!1;break;case 3:t=t.containerInfo,r=!0;break;case 4:t=t.containerInfo,r=!0;break;default:throw Error(_(161))}n.flags&16&&(zn(t,""),n.flags&=-17);e:t:for(n=e;;){for(;n.sibling===null;){if(n.return===null||Wu(n.return)){n=null;break e}n=n.return}for(n.sibling.return=n.return,n=n.sibling;n.tag!==5&&n.tag!==6&&n.tag!==18;){if(n.flags&2||n.child===null||n.tag===4)continue t;n.child.return=n,n=n.child}if(!(n.flags&2)){n=n.stateNode;break e}}r?vo(e,n,t):yo(e,n,t)}function vo(e,t,n){var r=e.tag,l=r===5||r===6;if(l)e=l?e.stateNode:e.stateNode.instance,t?n.nodeType===8?n.parentNode.insertBefore(e,t):n.insertBefore(e,t):(n.nodeType===8?(t=n.parentNode,t.insertBefore(e,n)):(t=n,t.appendChild(e)),n=n._reactRootContainer,n!=null||t.onclick!==null||(t.onclick=Rr));else if(r!==4&&(e=e.child,e!==null))for(vo(e,t,n),e=e.sibling;e!==null;)vo(e,t,n),e=e.sibling}function yo(e,t,n){var r=e.tag,l=r===5||r===6;if(l)e=l?e.stateNode:e.stateNode.instance,t?n.insertBefore(e,t):n.appendChild(e);else if(r!==4&&(e=e.child,e!==null))for(yo(e,t,n),e=e.sibling;e!==null;)yo(e,t,n),e=e.sibling}function Oa(e,t){for(var n=t,r=!1,l,o;;){if(!r){r=n.return;e:for(;;){if(r===null)throw Error(_(160));switch(l=r.stateNode,r.tag){case 5:o=!1;break e;case 3:l=l.containerInfo,o=!0;break e;case 4:l=l.containerInfo,o=!0;break e}r=r.return}r=!0}if(n.tag===5||n.tag===6){e:for(var i=e,u=n,s=u;;)if($u(i,s),s.child!==null&&s.tag!==4)s.child.return=s,s=s.child;else{if(s===u)break e;for(;s.sibling===null;){if(s.return===null||s.return===u)break e;s=s.return}s.sibling.return=s.return,s=s.sibling}o?(i=l,u=n.stateNode,i.nodeType===8?i.parentNode.removeChild(u):i.removeChild(u)):l.removeChild(n.stateNode)}else if(n.tag===4){if(n.child!==null){l=n.stateNode.containerInfo,o=!0,n.child.return=n,n=n.child;continue}}else if($u(e,n),n.child!==null){n.child.return=n,n=n.child;continue}if(n===t)break;for(;n.sibling===null;){if(n.return===null||n.return===t)return;n=n.return,n.tag===4&&(r=!1)}n.sibling.return=n.return,n=n.sibling}}function jl(e,t){switch(t.tag){case 0:case 11:case 14:case 15:case 22:var n=t.updateQueue;if(n=n!==null?n.lastEffect:null,n!==null){var r=n=n.next;do(r.tag&3)===3&&(e=r.destroy,r.destroy=void 0,e!==void 0&&e()),r=r.next;while(r!==n)}return;case 1:return;case 5:if(n=t.stateNode,n!=null){r=t.memoizedProps;var l=e!==null?e.memoizedProps:r;e=t.type;var o=t.updateQueue;if(t.updateQueue=null,o!==null){for(n[jr]=r,e==="input"&&r.type==="radio"&&r.name!=null&&ws(n,r),Xl(e,l),t=Xl(e,r),l=0;l<o.length;l+=2){var i=o[l],u=o[l+1];i==="style"?Cs(n,u):i==="dangerouslySetInnerHTML"?Es(n,u):i==="children"?zn(n,u):jo(n,i,u,t)}switch(e){case"input":Al(n,r);break;case"textarea":ks(n,r);break;case"select":e=n._wrapperState.wasMultiple,n._wrapperState.wasMultiple=!!r.multiple,o=r.value,o!=null?jt(n,!!r.multiple,o,!1):e!==!!r.multiple&&(r.defaultValue!=null?jt(n,!!r.multiple,r.defaultValue,!0):jt(n,!!r.multiple,r.multiple?[]:"",!1))}}}return;case 6:if(t.stateNode===null)throw Error(_(162));t.stateNode.nodeValue=t.memoizedProps;return;case 3:n=t.stateNode,n.hydrate&&(n.hydrate=!1,js(n.containerInfo));return;case 12:return;case 13:t.memoizedState!==null&&(vi=le(),Fu(t.child,!0)),Au(t);return;case 19:Au(t);return;case 17:return;case 23:case 24:Fu(t,t.memoizedState!==null);return}throw Error(_(163))}function Au(e){var t=e.updateQueue;if(t!==null){e.updateQueue=null;var n=e.stateNode;n===null&&(n=e.stateNode=new Zf),t.forEach(function(r){var l=ad.bind(null,e,r);n.has(r)||(n.add(r),r.then(l,l))})}}function bf(e,t){return e!==null&&(e=e.memoizedState,e===null||e.dehydrated!==null)?(t=t.memoizedState,t!==null&&t.dehydrated===null):!1}var ed=Math.ceil,Kr=kt.ReactCurrentDispatcher,mi=kt.ReactCurrentOwner,M=0,ue=null,G=null,oe=0,yt=0,wo=lt(0),ee=0,sl=null,qt=0,tr=0,bt=0,gi=0,ko=null,vi=0,So=1/0;function en(){So=le()+500}var T=null,Gr=!1,Eo=null,Te=null,et=!1,On=null,kn=90,_o=[],Co=[],Ie=null,Mn=0,xo=null,_r=-1,Me=0,Cr=0,Rn=null,xr=!1;function pe(){return M&48?le():_r!==-1?_r:_r=le()}function Ge(e){if(e=e.mode,!(e&2))return 1;if(!(e&4))return Qt()===99?1:2;if(Me===0&&(Me=qt),Vf.transition!==0){Cr!==0&&(Cr=ko!==null?ko.pendingLanes:0),e=Me;var t=4186112&~Cr;return t&=-t,t===0&&(e=4186112&~e,t=e&-e,t===0&&(t=8192)),t}return e=Qt(),M&4&&e===98?e=Or(12,Me):(e=Bc(e),e=Or(e,Me)),e}function Xe(e,t,n){if(50<Mn)throw Mn=0,xo=null,Error(_(185));if(e=al(e,t),e===null)return null;tl(e,t,n),e===ue&&(bt|=t,ee===4&&Wt(e,oe));var r=Qt();t===1?M&8&&!(M&48)?Do(e):(we(e,n),M===0&&(en(),Le())):(!(M&4)||r!==98&&r!==99||(Ie===null?Ie=new Set([e]):Ie.add(e)),we(e,n)),ko=e}function al(e,t){e.lanes|=t;var n=e.alternate;for(n!==null&&(n.lanes|=t),n=e,e=e.return;e!==null;)e.childLanes|=t,n=e.alternate,n!==null&&(n.childLanes|=t),n=e,e=e.return;return n.tag===3?n.stateNode:null}function we(e,t){for(var n=e.callbackNode,r=e.suspendedLanes,l=e.pingedLanes,o=e.expirationTimes,i=e.pendingLanes;0<i;){var u=31-qe(i),s=1<<u,a=o[u];if(a===-1){if(!(s&r)||s&l){a=t,xt(s);var g=U;o[u]=10<=g?a+250:6<=g?a+5e3:-1}}else a<=t&&(e.expiredLanes|=s);i&=~s}if(r=Wn(e,e===ue?oe:0),t=U,r===0)n!==null&&(n!==Nl&&io(n),e.callbackNode=null,e.callbackPriority=0);else{if(n!==null){if(e.callbackPriority===t)return;n!==Nl&&io(n)}t===15?(n=Do.bind(null,e),Oe===null?(Oe=[n],Er=ri(il,aa)):Oe.push(n),n=Nl):t===14?n=Hn(99,Do.bind(null,e)):(n=Hc(t),n=Hn(n,Ma.bind(null,e))),e.callbackPriority=t,e.callbackNode=n}}function Ma(e){if(_r=-1,Cr=Me=0,M&48)throw Error(_(327));var t=e.callbackNode;if(ot()&&e.callbackNode!==t)return null;var n=Wn(e,e===ue?oe:0);if(n===0)return null;var r=n,l=M;M|=16;var o=za();(ue!==e||oe!==r)&&(en(),Vt(e,r));do try{rd();break}catch(u){Ia(e,u)}while(1);if(li(),Kr.current=o,M=l,G!==null?r=0:(ue=null,oe=0,r=ee),qt&bt)Vt(e,0);else if(r!==0){if(r===2&&(M|=64,e.hydrate&&(e.hydrate=!1,ti(e.containerInfo)),n=Vs(e),n!==0&&(r=Sn(e,n))),r===1)throw t=sl,Vt(e,0),Wt(e,n),we(e,le()),t;switch(e.finishedWork=e.current.alternate,e.finishedLanes=n,r){case 0:case 1:throw Error(_(345));case 2:at(e);break;case 3:if(Wt(e,n),(n&62914560)===n&&(r=vi+500-le(),10<r)){if(Wn(e,0)!==0)break;if(l=e.suspendedLanes,(l&n)!==n){pe(),e.pingedLanes|=e.suspendedLanes&l;break}e.timeoutHandle=au(at.bind(null,e),r);break}at(e);break;case 4:if(Wt(e,n),(n&4186112)===n)break;for(r=e.eventTimes,l=-1;0<n;){var i=31-qe(n);o=1<<i,i=r[i],i>l&&(l=i),n&=~o}if(n=l,n=le()-n,n=(120>n?120:480>n?480:1080>n?1080:1920>n?1920:3e3>n?3e3:4320>n?4320:1960*ed(n/1960))-n,10<n){e.timeoutHandle=au(at.bind(null,e),n);break}at(e);break;case 5:at(e);break;default:throw Error(_(329))}}return we(e,le()),e.callbackNode===t?Ma.bind(null,e):null}function Wt(e,t){for(t&=~gi,t&=~bt,e.suspendedLanes|=t,e.pingedLanes&=~t,e=e.expirationTimes;0<t;){var n=31-qe(t),r=1<<n;e[n]=-1,t&=~r}}function Do(e){if(M&48)throw Error(_(327));if(ot(),e===ue&&e.expiredLanes&oe){var t=oe,n=Sn(e,t);qt&bt&&(t=Wn(e,t),n=Sn(e,t))}else t=Wn(e,0),n=Sn(e,t);if(e.tag!==0&&n===2&&(M|=64,e.hydrate&&(e.hydrate=!1,ti(e.containerInfo)),t=Vs(e),t!==0&&(n=Sn(e,t))),n===1)throw n=sl,Vt(e,0),Wt(e,t),we(e,le()),n;return e.finishedWork=e.current.alternate,e.finishedLanes=t,at(e),we(e,le()),null}function td(){if(Ie!==null){var e=Ie;Ie=null,e.forEach(function(t){t.expiredLanes|=24&t.pendingLanes,we(t,le())})}Le()}function Ra(e,t){var n=M;M|=1;try{return e(t)}finally{M=n,M===0&&(en(),Le())}}function ja(e,t){var n=M;M&=-2,M|=8;try{return e(t)}finally{M=n,M===0&&(en(),Le())}}function hr(e,t){Q(wo,yt),yt|=t,qt|=t}function yi(){yt=wo.current,V(wo)}function Vt(e,t){e.finishedWork=null,e.finishedLanes=0;var n=e.timeoutHandle;if(n!==-1&&(e.timeoutHandle=-1,If(n)),G!==null)for(n=G.return;n!==null;){var r=n;switch(r.tag){case 1:r=r.type.childContextTypes,r!=null&&Ir();break;case 3:Yt(),V(fe),V(ie),si();break;case 5:ui(r);break;case 4:Yt();break;case 13:V(H);break;case 19:V(H);break;case 10:oi(r);break;case 23:case 24:yi()}n=n.return}ue=e,G=tt(e.current,null),oe=yt=qt=t,ee=0,sl=null,gi=bt=tr=0}function Ia(e,t){do{var n=G;try{if(li(),Nn.current=Yr,Ar){for(var r=K.memoizedState;r!==null;){var l=r.queue;l!==null&&(l.pending=null),r=r.next}Ar=!1}if(Gn=0,b=re=K=null,Ln=!1,mi.current=null,n===null||n.return===null){ee=1,sl=t,G=null;break}e:{var o=e,i=n.return,u=n,s=t;if(t=oe,u.flags|=2048,u.firstEffect=u.lastEffect=null,s!==null&&typeof s=="object"&&typeof s.then=="function"){var a=s;if(!(u.mode&2)){var g=u.alternate;g?(u.updateQueue=g.updateQueue,u.memoizedState=g.memoizedState,u.lanes=g.lanes):(u.updateQueue=null,u.memoizedState=null)}var S=(H.current&1)!==0,p=i;do{var m;if(m=p.tag===13){var w=p.memoizedState;if(w!==null)m=w.dehydrated!==null;else{var E=p.memoizedProps;m=E.fallback===void 0?!1:E.unstable_avoidThisFallback!==!0?!0:!S}}if(m){var f=p.updateQueue;if(f===null){var d=new Set;d.add(a),p.updateQueue=d}else f.add(a);if(!(p.mode&2)){if(p.flags|=64,u.flags|=16384,u.flags&=-2981,u.tag===1)if(u.alternate===null)u.tag=17;else{var h=Ye(-1,1);h.tag=2,Ke(u,h)}u.lanes|=1;break e}s=void 0,u=t;var v=o.pingCache;if(v===null?(v=o.pingCache=new Xf,s=new Set,v.set(a,s)):(s=v.get(a),s===void 0&&(s=new Set,v.set(a,s))),!s.has(u)){s.add(u);var y=sd.bind(null,o,a,u);a.then(y,y)}p.flags|=4096,p.lanes=t;break e}p=p.return}while(p!==null);s=Error((Rt(u.type)||"A React component")+` suspended while rendering, but no fallback UI was specified.
 
-Add a <Suspense fallback=...> component higher in the tree to provide a loading indicator or placeholder to display.`)}ee!==5&&(ee=2),s=hi(s,u),p=i;do{switch(p.tag){case 3:o=s,p.flags|=4096,t&=-t,p.lanes|=t;var L=Na(p,o,t);gu(p,L);break e;case 1:o=s;var C=p.type,O=p.stateNode;if(!(p.flags&64)&&(typeof C.getDerivedStateFromError=="function"||O!==null&&typeof O.componentDidCatch=="function"&&(Te===null||!Te.has(O)))){p.flags|=4096,t&=-t,p.lanes|=t;var P=La(p,o,t);gu(p,P);break e}}p=p.return}while(p!==null)}$a(n)}catch(x){t=x,G===n&&n!==null&&(G=n=n.return);continue}break}while(1)}function za(){var e=Kr.current;return Kr.current=Yr,e===null?Yr:e}function Sn(e,t){var n=M;M|=16;var r=za();ue===e&&oe===t||Vt(e,t);do try{nd();break}catch(l){Ia(e,l)}while(1);if(li(),M=n,Kr.current=r,G!==null)throw Error(_(261));return ue=null,oe=0,ee}function nd(){for(;G!==null;)Fa(G)}function rd(){for(;G!==null&&!$f();)Fa(G)}function Fa(e){var t=Wa(e.alternate,e,yt);e.memoizedProps=e.pendingProps,t===null?$a(e):G=t,mi.current=null}function $a(e){var t=e;do{var n=t.alternate;if(e=t.return,t.flags&2048){if(n=Gf(t),n!==null){n.flags&=2047,G=n;return}e!==null&&(e.firstEffect=e.lastEffect=null,e.flags|=2048)}else{if(n=Kf(n,t,yt),n!==null){G=n;return}if(n=t,n.tag!==24&&n.tag!==23||n.memoizedState===null||yt&1073741824||!(n.mode&4)){for(var r=0,l=n.child;l!==null;)r|=l.lanes|l.childLanes,l=l.sibling;n.childLanes=r}e!==null&&!(e.flags&2048)&&(e.firstEffect===null&&(e.firstEffect=t.firstEffect),t.lastEffect!==null&&(e.lastEffect!==null&&(e.lastEffect.nextEffect=t.firstEffect),e.lastEffect=t.lastEffect),1<t.flags&&(e.lastEffect!==null?e.lastEffect.nextEffect=t:e.firstEffect=t,e.lastEffect=t))}if(t=t.sibling,t!==null){G=t;return}G=t=e}while(t!==null);ee===0&&(ee=5)}function at(e){var t=Qt();return vt(99,ld.bind(null,e,t)),null}function ld(e,t){do ot();while(On!==null);if(M&48)throw Error(_(327));var n=e.finishedWork;if(n===null)return null;if(e.finishedWork=null,e.finishedLanes=0,n===e.current)throw Error(_(177));e.callbackNode=null;var r=n.lanes|n.childLanes,l=r,o=e.pendingLanes&~l;e.pendingLanes=l,e.suspendedLanes=0,e.pingedLanes=0,e.expiredLanes&=l,e.mutableReadLanes&=l,e.entangledLanes&=l,l=e.entanglements;for(var i=e.eventTimes,u=e.expirationTimes;0<o;){var s=31-qe(o),a=1<<s;l[s]=0,i[s]=-1,u[s]=-1,o&=~a}if(Ie!==null&&!(r&24)&&Ie.has(e)&&Ie.delete(e),e===ue&&(G=ue=null,oe=0),1<n.flags?n.lastEffect!==null?(n.lastEffect.nextEffect=n,r=n.firstEffect):r=n:r=n.firstEffect,r!==null){if(l=M,M|=32,mi.current=null,Dl=yr,i=nu(),to(i)){if("selectionStart"in i)u={start:i.selectionStart,end:i.selectionEnd};else e:if(u=(u=i.ownerDocument)&&u.defaultView||window,(a=u.getSelection&&u.getSelection())&&a.rangeCount!==0){u=a.anchorNode,o=a.anchorOffset,s=a.focusNode,a=a.focusOffset;try{u.nodeType,s.nodeType}catch{u=null;break e}var g=0,S=-1,p=-1,m=0,w=0,E=i,f=null;t:for(;;){for(var d;E!==u||o!==0&&E.nodeType!==3||(S=g+o),E!==s||a!==0&&E.nodeType!==3||(p=g+a),E.nodeType===3&&(g+=E.nodeValue.length),(d=E.firstChild)!==null;)f=E,E=d;for(;;){if(E===i)break t;if(f===u&&++m===o&&(S=g),f===s&&++w===a&&(p=g),(d=E.nextSibling)!==null)break;E=f,f=E.parentNode}E=d}u=S===-1||p===-1?null:{start:S,end:p}}else u=null;u=u||{start:0,end:0}}else u=null;Tl={focusedElem:i,selectionRange:u},yr=!1,Rn=null,xr=!1,T=r;do try{od()}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);Rn=null,T=r;do try{for(i=e;T!==null;){var h=T.flags;if(h&16&&zn(T.stateNode,""),h&128){var v=T.alternate;if(v!==null){var y=v.ref;y!==null&&(typeof y=="function"?y(null):y.current=null)}}switch(h&1038){case 2:Vu(T),T.flags&=-3;break;case 6:Vu(T),T.flags&=-3,jl(T.alternate,T);break;case 1024:T.flags&=-1025;break;case 1028:T.flags&=-1025,jl(T.alternate,T);break;case 4:jl(T.alternate,T);break;case 8:u=T,Oa(i,u);var L=u.alternate;Uu(u),L!==null&&Uu(L)}T=T.nextEffect}}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);if(y=Tl,v=nu(),h=y.focusedElem,i=y.selectionRange,v!==h&&h&&h.ownerDocument&&Xs(h.ownerDocument.documentElement,h)){for(i!==null&&to(h)&&(v=i.start,y=i.end,y===void 0&&(y=v),"selectionStart"in h?(h.selectionStart=v,h.selectionEnd=Math.min(y,h.value.length)):(y=(v=h.ownerDocument||document)&&v.defaultView||window,y.getSelection&&(y=y.getSelection(),u=h.textContent.length,L=Math.min(i.start,u),i=i.end===void 0?L:Math.min(i.end,u),!y.extend&&L>i&&(u=i,i=L,L=u),u=tu(h,L),o=tu(h,i),u&&o&&(y.rangeCount!==1||y.anchorNode!==u.node||y.anchorOffset!==u.offset||y.focusNode!==o.node||y.focusOffset!==o.offset)&&(v=v.createRange(),v.setStart(u.node,u.offset),y.removeAllRanges(),L>i?(y.addRange(v),y.extend(o.node,o.offset)):(v.setEnd(o.node,o.offset),y.addRange(v)))))),v=[],y=h;y=y.parentNode;)y.nodeType===1&&v.push({element:y,left:y.scrollLeft,top:y.scrollTop});for(typeof h.focus=="function"&&h.focus(),h=0;h<v.length;h++)y=v[h],y.element.scrollLeft=y.left,y.element.scrollTop=y.top}yr=!!Dl,Tl=Dl=null,e.current=n,T=r;do try{for(h=e;T!==null;){var C=T.flags;if(C&36&&qf(h,T.alternate,T),C&128){v=void 0;var O=T.ref;if(O!==null){var P=T.stateNode;switch(T.tag){case 5:v=P;break;default:v=P}typeof O=="function"?O(v):O.current=v}}T=T.nextEffect}}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);T=null,Wf(),M=l}else e.current=n;if(et)et=!1,On=e,kn=t;else for(T=r;T!==null;)t=T.nextEffect,T.nextEffect=null,T.flags&8&&(C=T,C.sibling=null,C.stateNode=null),T=t;if(r=e.pendingLanes,r===0&&(Te=null),r===1?e===xo?Mn++:(Mn=0,xo=e):Mn=0,n=n.stateNode,mt&&typeof mt.onCommitFiberRoot=="function")try{mt.onCommitFiberRoot(ni,n,void 0,(n.current.flags&64)===64)}catch{}if(we(e,le()),Gr)throw Gr=!1,e=Eo,Eo=null,e;return M&8||Le(),null}function od(){for(;T!==null;){var e=T.alternate;xr||Rn===null||(T.flags&8?Vi(T,Rn)&&(xr=!0):T.tag===13&&bf(e,T)&&Vi(T,Rn)&&(xr=!0));var t=T.flags;t&256&&Jf(e,T),!(t&512)||et||(et=!0,Hn(97,function(){return ot(),null})),T=T.nextEffect}}function ot(){if(kn!==90){var e=97<kn?97:kn;return kn=90,vt(e,ud)}return!1}function id(e,t){_o.push(t,e),et||(et=!0,Hn(97,function(){return ot(),null}))}function Ua(e,t){Co.push(t,e),et||(et=!0,Hn(97,function(){return ot(),null}))}function ud(){if(On===null)return!1;var e=On;if(On=null,M&48)throw Error(_(331));var t=M;M|=32;var n=Co;Co=[];for(var r=0;r<n.length;r+=2){var l=n[r],o=n[r+1],i=l.destroy;if(l.destroy=void 0,typeof i=="function")try{i()}catch(s){if(o===null)throw Error(_(330));Ze(o,s)}}for(n=_o,_o=[],r=0;r<n.length;r+=2){l=n[r],o=n[r+1];try{var u=l.create;l.destroy=u()}catch(s){if(o===null)throw Error(_(330));Ze(o,s)}}for(u=e.current.firstEffect;u!==null;)e=u.nextEffect,u.nextEffect=null,u.flags&8&&(u.sibling=null,u.stateNode=null),u=e;return M=t,Le(),!0}function Bu(e,t,n){t=hi(n,t),t=Na(e,t,1),Ke(e,t),t=pe(),e=al(e,1),e!==null&&(tl(e,1,t),we(e,t))}function Ze(e,t){if(e.tag===3)Bu(e,e,t);else for(var n=e.return;n!==null;){if(n.tag===3){Bu(n,e,t);break}else if(n.tag===1){var r=n.stateNode;if(typeof n.type.getDerivedStateFromError=="function"||typeof r.componentDidCatch=="function"&&(Te===null||!Te.has(r))){e=hi(t,e);var l=La(n,e,1);if(Ke(n,l),l=pe(),n=al(n,1),n!==null)tl(n,1,l),we(n,l);else if(typeof r.componentDidCatch=="function"&&(Te===null||!Te.has(r)))try{r.componentDidCatch(t,e)}catch{}break}}n=n.return}}function sd(e,t,n){var r=e.pingCache;r!==null&&r.delete(t),t=pe(),e.pingedLanes|=e.suspendedLanes&n,ue===e&&(oe&n)===n&&(ee===4||ee===3&&(oe&62914560)===oe&&500>le()-vi?Vt(e,0):gi|=n),we(e,t)}function ad(e,t){var n=e.stateNode;n!==null&&n.delete(t),t=0,t===0&&(t=e.mode,t&2?t&4?(Me===0&&(Me=qt),t=Dt(62914560&~Me),t===0&&(t=4194304)):t=Qt()===99?1:2:t=1),n=pe(),e=al(e,t),e!==null&&(tl(e,t,n),we(e,n))}var Wa;Wa=function(e,t,n){var r=t.lanes;if(e!==null)if(e.memoizedProps!==t.pendingProps||fe.current)_e=!0;else if(n&r)_e=!!(e.flags&16384);else{switch(_e=!1,t.tag){case 3:Nu(t),Ol();break;case 5:ku(t);break;case 1:de(t.type)&&Sr(t);break;case 4:ao(t,t.stateNode.containerInfo);break;case 10:r=t.memoizedProps.value;var l=t.type._context;Q(zr,l._currentValue),l._currentValue=r;break;case 13:if(t.memoizedState!==null)return n&t.child.childLanes?Lu(e,t,n):(Q(H,H.current&1),t=je(e,t,n),t!==null?t.sibling:null);Q(H,H.current&1);break;case 19:if(r=(n&t.childLanes)!==0,e.flags&64){if(r)return Iu(e,t,n);t.flags|=64}if(l=t.memoizedState,l!==null&&(l.rendering=null,l.tail=null,l.lastEffect=null),Q(H,H.current),r)break;return null;case 23:case 24:return t.lanes=0,Ml(e,t,n)}return je(e,t,n)}else _e=!1;switch(t.lanes=0,t.tag){case 2:if(r=t.type,e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),e=t.pendingProps,l=Ht(t,ie.current),$t(t,n),l=ci(null,t,r,e,l,n),t.flags|=1,typeof l=="object"&&l!==null&&typeof l.render=="function"&&l.$$typeof===void 0){if(t.tag=1,t.memoizedState=null,t.updateQueue=null,de(r)){var o=!0;Sr(t)}else o=!1;t.memoizedState=l.state!==null&&l.state!==void 0?l.state:null,ii(t);var i=r.getDerivedStateFromProps;typeof i=="function"&&Ur(t,r,i,e),l.updater=ul,t.stateNode=l,l._reactInternals=t,so(t,r,e,n),t=ho(null,t,r,!0,o,n)}else t.tag=0,ce(null,t,l,n),t=t.child;return t;case 16:l=t.elementType;e:{switch(e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),e=t.pendingProps,o=l._init,l=o(l._payload),t.type=l,o=t.tag=fd(l),e=Ee(l,e),o){case 0:t=po(null,t,l,e,n);break e;case 1:t=Pu(null,t,l,e,n);break e;case 11:t=Du(null,t,l,e,n);break e;case 14:t=Tu(null,t,l,Ee(l.type,e),r,n);break e}throw Error(_(306,l,""))}return t;case 0:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),po(e,t,r,l,n);case 1:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),Pu(e,t,r,l,n);case 3:if(Nu(t),r=t.updateQueue,e===null||r===null)throw Error(_(282));if(r=t.pendingProps,l=t.memoizedState,l=l!==null?l.element:null,fa(e,t),Qn(t,r,null,n),r=t.memoizedState.element,r===l)Ol(),t=je(e,t,n);else{if(l=t.stateNode,(o=l.hydrate)&&(Ae=Ft(t.stateNode.containerInfo.firstChild),Re=t,o=Ne=!0),o){if(e=l.mutableSourceEagerHydrationData,e!=null)for(l=0;l<e.length;l+=2)o=e[l],o._workInProgressVersionPrimary=e[l+1],Ut.push(o);for(n=ma(t,null,r,n),t.child=n;n;)n.flags=n.flags&-3|1024,n=n.sibling}else ce(e,t,r,n),Ol();t=t.child}return t;case 5:return ku(t),e===null&&co(t),r=t.type,l=t.pendingProps,o=e!==null?e.memoizedProps:null,i=l.children,lo(r,l)?i=null:o!==null&&lo(r,o)&&(t.flags|=16),xa(e,t),ce(e,t,i,n),t.child;case 6:return e===null&&co(t),null;case 13:return Lu(e,t,n);case 4:return ao(t,t.stateNode.containerInfo),r=t.pendingProps,e===null?t.child=Wr(t,null,r,n):ce(e,t,r,n),t.child;case 11:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),Du(e,t,r,l,n);case 7:return ce(e,t,t.pendingProps,n),t.child;case 8:return ce(e,t,t.pendingProps.children,n),t.child;case 12:return ce(e,t,t.pendingProps.children,n),t.child;case 10:e:{r=t.type._context,l=t.pendingProps,i=t.memoizedProps,o=l.value;var u=t.type._context;if(Q(zr,u._currentValue),u._currentValue=o,i!==null)if(u=i.value,o=me(u,o)?0:(typeof r._calculateChangedBits=="function"?r._calculateChangedBits(u,o):1073741823)|0,o===0){if(i.children===l.children&&!fe.current){t=je(e,t,n);break e}}else for(u=t.child,u!==null&&(u.return=t);u!==null;){var s=u.dependencies;if(s!==null){i=u.child;for(var a=s.firstContext;a!==null;){if(a.context===r&&a.observedBits&o){u.tag===1&&(a=Ye(-1,n&-n),a.tag=2,Ke(u,a)),u.lanes|=n,a=u.alternate,a!==null&&(a.lanes|=n),ca(u.return,n),s.lanes|=n;break}a=a.next}}else i=u.tag===10&&u.type===t.type?null:u.child;if(i!==null)i.return=u;else for(i=u;i!==null;){if(i===t){i=null;break}if(u=i.sibling,u!==null){u.return=i.return,i=u;break}i=i.return}u=i}ce(e,t,l.children,n),t=t.child}return t;case 9:return l=t.type,o=t.pendingProps,r=o.children,$t(t,n),l=ye(l,o.unstable_observedBits),r=r(l),t.flags|=1,ce(e,t,r,n),t.child;case 14:return l=t.type,o=Ee(l,t.pendingProps),o=Ee(l.type,o),Tu(e,t,l,o,r,n);case 15:return Ca(e,t,t.type,t.pendingProps,r,n);case 17:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),t.tag=1,de(r)?(e=!0,Sr(t)):e=!1,$t(t,n),pa(t,r,l),so(t,r,l,n),ho(null,t,r,!0,e,n);case 19:return Iu(e,t,n);case 23:return Ml(e,t,n);case 24:return Ml(e,t,n)}throw Error(_(156,t.tag))};function cd(e,t,n,r){this.tag=e,this.key=n,this.sibling=this.child=this.return=this.stateNode=this.type=this.elementType=null,this.index=0,this.ref=null,this.pendingProps=t,this.dependencies=this.memoizedState=this.updateQueue=this.memoizedProps=null,this.mode=r,this.flags=0,this.lastEffect=this.firstEffect=this.nextEffect=null,this.childLanes=this.lanes=0,this.alternate=null}function ge(e,t,n,r){return new cd(e,t,n,r)}function wi(e){return e=e.prototype,!(!e||!e.isReactComponent)}function fd(e){if(typeof e=="function")return wi(e)?1:0;if(e!=null){if(e=e.$$typeof,e===qr)return 11;if(e===br)return 14}return 2}function tt(e,t){var n=e.alternate;return n===null?(n=ge(e.tag,t,e.key,e.mode),n.elementType=e.elementType,n.type=e.type,n.stateNode=e.stateNode,n.alternate=e,e.alternate=n):(n.pendingProps=t,n.type=e.type,n.flags=0,n.nextEffect=null,n.firstEffect=null,n.lastEffect=null),n.childLanes=e.childLanes,n.lanes=e.lanes,n.child=e.child,n.memoizedProps=e.memoizedProps,n.memoizedState=e.memoizedState,n.updateQueue=e.updateQueue,t=e.dependencies,n.dependencies=t===null?null:{lanes:t.lanes,firstContext:t.firstContext},n.sibling=e.sibling,n.index=e.index,n.ref=e.ref,n}function Dr(e,t,n,r,l,o){var i=2;if(r=e,typeof e=="function")wi(e)&&(i=1);else if(typeof e=="string")i=5;else e:switch(e){case Ue:return At(n.children,l,o,t);case gs:i=8,l|=16;break;case Io:i=8,l|=1;break;case En:return e=ge(12,n,t,l|8),e.elementType=En,e.type=En,e.lanes=o,e;case _n:return e=ge(13,n,t,l),e.type=_n,e.elementType=_n,e.lanes=o,e;case Tr:return e=ge(19,n,t,l),e.elementType=Tr,e.lanes=o,e;case Vo:return ki(n,l,o,t);case Wl:return e=ge(24,n,t,l),e.elementType=Wl,e.lanes=o,e;default:if(typeof e=="object"&&e!==null)switch(e.$$typeof){case zo:i=10;break e;case Fo:i=9;break e;case qr:i=11;break e;case br:i=14;break e;case $o:i=16,r=null;break e;case Uo:i=22;break e}throw Error(_(130,e==null?e:typeof e,""))}return t=ge(i,n,t,l),t.elementType=e,t.type=r,t.lanes=o,t}function At(e,t,n,r){return e=ge(7,e,r,t),e.lanes=n,e}function ki(e,t,n,r){return e=ge(23,e,r,t),e.elementType=Vo,e.lanes=n,e}function Il(e,t,n){return e=ge(6,e,null,t),e.lanes=n,e}function zl(e,t,n){return t=ge(4,e.children!==null?e.children:[],e.key,t),t.lanes=n,t.stateNode={containerInfo:e.containerInfo,pendingChildren:null,implementation:e.implementation},t}function dd(e,t,n){this.tag=t,this.containerInfo=e,this.finishedWork=this.pingCache=this.current=this.pendingChildren=null,this.timeoutHandle=-1,this.pendingContext=this.context=null,this.hydrate=n,this.callbackNode=null,this.callbackPriority=0,this.eventTimes=wl(0),this.expirationTimes=wl(-1),this.entangledLanes=this.finishedLanes=this.mutableReadLanes=this.expiredLanes=this.pingedLanes=this.suspendedLanes=this.pendingLanes=0,this.entanglements=wl(0),this.mutableSourceEagerHydrationData=null}function pd(e,t,n){var r=3<arguments.length&&arguments[3]!==void 0?arguments[3]:null;return{$$typeof:ct,key:r==null?null:""+r,children:e,containerInfo:t,implementation:n}}function Xr(e,t,n,r){var l=t.current,o=pe(),i=Ge(l);e:if(n){n=n._reactInternals;t:{if(St(n)!==n||n.tag!==1)throw Error(_(170));var u=n;do{switch(u.tag){case 3:u=u.stateNode.context;break t;case 1:if(de(u.type)){u=u.stateNode.__reactInternalMemoizedMergedChildContext;break t}}u=u.return}while(u!==null);throw Error(_(171))}if(n.tag===1){var s=n.type;if(de(s)){n=ra(n,s,u);break e}}n=u}else n=be;return t.context===null?t.context=n:t.pendingContext=n,t=Ye(o,i),t.payload={element:e},r=r===void 0?null:r,r!==null&&(t.callback=r),Ke(l,t),Xe(l,i,o),i}function Fl(e){if(e=e.current,!e.child)return null;switch(e.child.tag){case 5:return e.child.stateNode;default:return e.child.stateNode}}function Hu(e,t){if(e=e.memoizedState,e!==null&&e.dehydrated!==null){var n=e.retryLane;e.retryLane=n!==0&&n<t?n:t}}function Si(e,t){Hu(e,t),(e=e.alternate)&&Hu(e,t)}function hd(){return null}function Ei(e,t,n){var r=n!=null&&n.hydrationOptions!=null&&n.hydrationOptions.mutableSources||null;if(n=new dd(e,t,n!=null&&n.hydrate===!0),t=ge(3,null,null,t===2?7:t===1?3:0),n.current=t,t.stateNode=n,ii(t),e[Jt]=n.current,qs(e.nodeType===8?e.parentNode:e),r)for(e=0;e<r.length;e++){t=r[e];var l=t._getVersion;l=l(t._source),n.mutableSourceEagerHydrationData==null?n.mutableSourceEagerHydrationData=[t,l]:n.mutableSourceEagerHydrationData.push(t,l)}this._internalRoot=n}Ei.prototype.render=function(e){Xr(e,this._internalRoot,null,null)};Ei.prototype.unmount=function(){var e=this._internalRoot,t=e.containerInfo;Xr(null,e,null,function(){t[Jt]=null})};function nr(e){return!(!e||e.nodeType!==1&&e.nodeType!==9&&e.nodeType!==11&&(e.nodeType!==8||e.nodeValue!==" react-mount-point-unstable "))}function md(e,t){if(t||(t=e?e.nodeType===9?e.documentElement:e.firstChild:null,t=!(!t||t.nodeType!==1||!t.hasAttribute("data-reactroot"))),!t)for(var n;n=e.lastChild;)e.removeChild(n);return new Ei(e,0,t?{hydrate:!0}:void 0)}function cl(e,t,n,r,l){var o=n._reactRootContainer;if(o){var i=o._internalRoot;if(typeof l=="function"){var u=l;l=function(){var a=Fl(i);u.call(a)}}Xr(t,i,e,l)}else{if(o=n._reactRootContainer=md(n,r),i=o._internalRoot,typeof l=="function"){var s=l;l=function(){var a=Fl(i);s.call(a)}}ja(function(){Xr(t,i,e,l)})}return Fl(i)}Os=function(e){if(e.tag===13){var t=pe();Xe(e,4,t),Si(e,4)}};Yo=function(e){if(e.tag===13){var t=pe();Xe(e,67108864,t),Si(e,67108864)}};Ms=function(e){if(e.tag===13){var t=pe(),n=Ge(e);Xe(e,n,t),Si(e,n)}};Rs=function(e,t){return t()};Zl=function(e,t,n){switch(t){case"input":if(Al(e,n),t=n.name,n.type==="radio"&&t!=null){for(n=e;n.parentNode;)n=n.parentNode;for(n=n.querySelectorAll("input[name="+JSON.stringify(""+t)+'][type="radio"]'),t=0;t<n.length;t++){var r=n[t];if(r!==e&&r.form===e.form){var l=ol(r);if(!l)throw Error(_(90));ys(r),Al(r,l)}}}break;case"textarea":ks(e,n);break;case"select":t=n.value,t!=null&&jt(e,!!n.multiple,t,!1)}};Bo=Ra;Ts=function(e,t,n,r,l){var o=M;M|=4;try{return vt(98,e.bind(null,t,n,r,l))}finally{M=o,M===0&&(en(),Le())}};Ho=function(){!(M&49)&&(td(),ot())};Ps=function(e,t){var n=M;M|=2;try{return e(t)}finally{M=n,M===0&&(en(),Le())}};function Va(e,t){var n=2<arguments.length&&arguments[2]!==void 0?arguments[2]:null;if(!nr(t))throw Error(_(200));return pd(e,t,null,n)}var gd={Events:[bn,Lt,ol,xs,Ds,ot,{current:!1}]},gn={findFiberByHostInstance:dt,bundleType:0,version:"17.0.2",rendererPackageName:"react-dom"},vd={bundleType:gn.bundleType,version:gn.version,rendererPackageName:gn.rendererPackageName,rendererConfig:gn.rendererConfig,overrideHookState:null,overrideHookStateDeletePath:null,overrideHookStateRenamePath:null,overrideProps:null,overridePropsDeletePath:null,overridePropsRenamePath:null,setSuspenseHandler:null,scheduleUpdate:null,currentDispatcherRef:kt.ReactCurrentDispatcher,findHostInstanceByFiber:function(e){return e=Ls(e),e===null?null:e.stateNode},findFiberByHostInstance:gn.findFiberByHostInstance||hd,findHostInstancesForRefresh:null,scheduleRefresh:null,scheduleRoot:null,setRefreshHandler:null,getCurrentFiber:null};if(typeof __REACT_DEVTOOLS_GLOBAL_HOOK__<"u"){var mr=__REACT_DEVTOOLS_GLOBAL_HOOK__;if(!mr.isDisabled&&mr.supportsFiber)try{ni=mr.inject(vd),mt=mr}catch{}}ke.__SECRET_INTERNALS_DO_NOT_USE_OR_YOU_WILL_BE_FIRED=gd;ke.createPortal=Va;ke.findDOMNode=function(e){if(e==null)return null;if(e.nodeType===1)return e;var t=e._reactInternals;if(t===void 0)throw typeof e.render=="function"?Error(_(188)):Error(_(268,Object.keys(e)));return e=Ls(t),e=e===null?null:e.stateNode,e};ke.flushSync=function(e,t){var n=M;if(n&48)return e(t);M|=1;try{if(e)return vt(99,e.bind(null,t))}finally{M=n,Le()}};ke.hydrate=function(e,t,n){if(!nr(t))throw Error(_(200));return cl(null,e,t,!0,n)};ke.render=function(e,t,n){if(!nr(t))throw Error(_(200));return cl(null,e,t,!1,n)};ke.unmountComponentAtNode=function(e){if(!nr(e))throw Error(_(40));return e._reactRootContainer?(ja(function(){cl(null,null,e,!1,function(){e._reactRootContainer=null,e[Jt]=null})}),!0):!1};ke.unstable_batchedUpdates=Ra;ke.unstable_createPortal=function(e,t){return Va(e,t,2<arguments.length&&arguments[2]!==void 0?arguments[2]:null)};ke.unstable_renderSubtreeIntoContainer=function(e,t,n,r){if(!nr(n))throw Error(_(200));if(e==null||e._reactInternals===void 0)throw Error(_(38));return cl(e,t,n,!1,r)};ke.version="17.0.2";(function(e){function t(){if(!(typeof __REACT_DEVTOOLS_GLOBAL_HOOK__>"u"||typeof __REACT_DEVTOOLS_GLOBAL_HOOK__.checkDCE!="function"))try{__REACT_DEVTOOLS_GLOBAL_HOOK__.checkDCE(t)}catch(n){console.error(n)}}t(),e.exports=ke})(Sc);const Aa=["monday","tuesday","wednesday","thursday","friday","saturday","sunday"],_i=k.createContext({}),Kt=k.createContext({});function yd(e){let t=null;if(document.cookie&&document.cookie!==""){const n=document.cookie.split(";");for(let r=0;r<n.length;r++){const l=n[r].trim();if(l.substring(0,e.length+1)===e+"="){t=decodeURIComponent(l.substring(e.length+1));break}}}return t}const nt=(e,t)=>{const n=yd("csrftoken")||"";return window.fetch(e,{method:"POST",body:JSON.stringify(t),headers:{"X-CSRFToken":n}})},Xn=()=>{const[e,t]=k.useState(0),[n,r]=k.useState(0),l=k.useRef([]);k.useEffect(()=>{(async()=>e!==n&&(await l.current[e](),t(e+1)))()},[e===n,e===n?n:e]);const o=k.useCallback(i=>{l.current.push(i),r(l.current.length)},[]);return[e>0&&e===n,o]},rt=()=>{const e=k.useRef({data:null}),t=k.useCallback(async n=>{const r=await n;e.current.data=await r.json()},[]);return[e.current.data,t]},wd=e=>{const t={};for(const n of e)t[n.id+""]=n;return t},Ba=e=>{const t=k.useRef({}).current;return k.useEffect(()=>{for(const r of Object.keys(t))delete t[r];const n=wd(e==null?[]:e.rows);for(const r of Object.keys(n))t[r]=n[r]},[e]),t};function kd(e,t){const[n,r]=k.useState(e);return k.useEffect(()=>{if(!e&&n){const l=setTimeout(()=>r(!1),t);return()=>void clearTimeout(l)}return e&&!n&&r(!0),()=>{}},[e,n]),n}const Sd=e=>{const[t,n]=k.useState("");return k.useState(()=>{let r=!1;return(async()=>{const l=await window.fetch("/api/v0/workplace/");if(r)return;const i=(await l.json()).rows[0];i&&i.settings&&i.settings.message_of_the_day&&n(i.settings.message_of_the_day)})(),()=>void(r=!0)}),t?c("div",{className:"sp_message_of_the_day",children:t}):c($,{})},Ed=e=>N("ul",{className:"sp_nav",children:[c("li",{className:e.current==="schedule"?"sp_current":"",children:c("a",{href:"/admin/",children:"Vagtbooking"})}),c("li",{className:e.current==="shifts"?"sp_current":"",children:c("a",{href:"/admin/shifts/",children:"Vagter"})}),c("li",{className:e.current==="workers"?"sp_current":"",children:c("a",{href:"/admin/workers/",children:"Vagttagere"})}),c("li",{className:e.current==="settings"?"sp_current":"",children:c("a",{href:"/admin/settings/",children:"Indstillinger"})}),c("li",{children:c("a",{href:"/adminlogout/",children:"Log ud"})})]}),tn=e=>N($,{children:[c(Sd,{}),c(Ed,{current:e.current})]}),_d=e=>{const[t,n]=rt();k.useEffect(()=>e.enqueue(()=>n(window.fetch("/api/v0/worker/"))),[]);const r=Ba(t);return c(_i.Provider,{value:r,children:e.children})},Cd=e=>{const[t,n]=k.useState(null),r=k.useContext(_i),l=[...Object.values(r)],o=N("select",{value:t==null?0:t.id,onChange:i=>n(i.target.selectedIndex===0?null:l[i.target.selectedIndex-1]),children:[c("option",{value:0,children:l.length===0&&!e?"Loading...":"---"}),l.map((i,u)=>c("option",{value:i.id,children:i.name},u))]});return[t,o]},xd={register:"Tilmeld",unregister:"Afmeld",worker_login:"Log ind",comment:"Bemærkning",edit_worker:"(Admin) Redigér vagttager",edit:"(Admin) Redigér vagtplan",import_workers:"(Admin) Importér vagttagere",edit_workplace_settings:"(Admin) Redigér indstillinger"},Dd=e=>{const t=k.useContext(_i),{data:{time:n,worker_id:r,user_id:l,kind:o,data:i}}=e,u=new Date(n*1e3),s={...i};t[s.worker]&&(s.worker=t[s.worker].name),o==="edit_worker"&&t[s.id]&&(s.id=t[s.id].name);const a=JSON.stringify(s)+"";return N("tr",{children:[c("td",{children:u+""}),c("td",{children:r==null?"-":t[r]?t[r].name:r+""}),c("td",{children:l==null?"-":l+""}),c("td",{children:xd[o]||o}),c("td",{title:a,children:a.substring(0,50)})]})},Td=e=>{const[t,n]=Xn(),[r,l]=rt();k.useEffect(()=>{let i="/api/v0/changelog/";e!=null&&(i+="?"+new URLSearchParams({worker:e.id+""})),n(()=>l(window.fetch(i)))},[e]);const o=r==null?[]:r.rows;return t?c("table",{children:c("tbody",{children:o.slice(0,1e3).map((i,u)=>c(Dd,{data:i},u))})}):c($,{children:"Loading..."})},Pd=e=>{const[t,n]=Cd(e.loaded),r=Td(t);return N($,{children:[n,r]})},Nd=e=>{const[t,n]=Xn();return N(_d,{enqueue:n,children:[c(tn,{current:"changelog"}),c(Pd,{loaded:t})]})},Ci=e=>{const[t,n,r]=e.split("-").map(l=>parseInt(l));return new Date(t,n-1,r)},Ha=["mandag","tirsdag","onsdag","torsdag","fredag","lørdag","søndag"],Ld=["januar","februar","marts","april","maj","juni","juli","august","september","oktober","november","december"],Qa=e=>Ha[(e.getDay()+6)%7],Ya=e=>`${e.getDate()}. ${Ld[e.getMonth()]} ${e.getFullYear()}`,Ka=e=>{const t="0"+(e.getMonth()+1),n="0"+e.getDate();return e.getFullYear()+"-"+t.slice(-2)+"-"+n.slice(-2)},Z=e=>{const t=e.state[0].split(`
-`).length;if(e.multiline)return c("textarea",{value:e.state[0],onChange:l=>e.state[1](l.target.value),placeholder:e.placeholder,style:{font:"inherit",flex:"1 0 auto"},rows:t});const n=e.onCancel==null?void 0:l=>{l.code==="Escape"&&e.onCancel!=null&&e.onCancel()},r=l=>{l.code==="Enter"&&(l.preventDefault(),e.save())};return c("input",{value:e.state[0],onChange:l=>e.state[1](l.target.value),onKeyPress:r,onKeyDown:n,placeholder:e.placeholder,style:{flex:"1 0 auto",...e.style||{}},className:e.className,ref:e.inputRef})},Zr=({value:e,onSave:t,onCancel:n,style:r,className:l,inputRef:o})=>{const i=k.useState(e),u=e!==i[0];return c(Z,{state:i,save:()=>t(i[0]),onCancel:n,style:{...r,background:u?"white":"transparent"},className:l,inputRef:o})},Ga=e=>{const t=e.map(l=>k.useState(l)),n=t.some(([l],o)=>l!==e[o]),r=t.map(([l])=>l);return[n,r,t]},xi=e=>{const[t,n]=k.useState(null),[r,l]=k.useState(null);return{onDragLeave:o=>i=>n(u=>u===o?null:u),onDragEnter:o=>i=>n(o),onDragOver:o=>i=>{r!=null&&i.preventDefault()},onDrop:o=>i=>{r==null||t!==o||(i.preventDefault(),e(r,t))},isDragging:o=>r!=null&&t===o,onDragStart:o=>i=>l(o),onDragEnd:o=>i=>l(u=>u===o?null:u)}},Di=(e,t,n)=>{if(t===n||t+1===n)return e;const r=[...e];return r.splice(t,1),r.splice(n<t?n:n-1,0,e[t]),r},Xa=k.createContext({}),Za=k.createContext(e=>e(async t=>{})),Od=e=>{const[t,n]=k.useState(""),[r,l]=k.useState(0),[o,i]=k.useState(!0),[u,s]=k.useState(!1),a=k.useRef(null);k.useLayoutEffect(()=>{a.current&&a.current.focus()},[]);const g=w=>{n(w),l(0)},S=t.trim().toLowerCase(),p=k.useMemo(()=>e.options.filter(({label:w})=>S===""||w.toLowerCase().indexOf(S)>=0),[S]),m=k.useCallback(w=>{w==="Enter"&&p.length>r?e.onSubmit(p[r].value):w==="Escape"?e.onCancel():w==="ArrowDown"?l(E=>Math.min(E+1,p.length-1)):w==="ArrowUp"&&l(E=>Math.max(0,E-1))},[S,r]);return c($,{children:N("div",{style:{display:"inline-block"},children:[c("input",{style:{display:"block"},ref:a,value:t,onKeyDown:w=>m(w.code),onChange:w=>g(w.target.value),onFocus:()=>i(!0),onBlur:()=>i(!1)}),(o||u)&&c("ul",{onMouseEnter:()=>s(!0),onMouseLeave:()=>s(!1),style:{position:"absolute",background:"white",border:"1px solid black",overflow:"auto",width:"200px",height:"200px"},children:p.map(({value:w,label:E},f)=>c("li",{children:c("a",{href:"#",onClick:d=>{d.preventDefault(),e.onSubmit(w)},style:{fontWeight:f===r?"bold":void 0},children:E})},w))})]})})},Md=e=>{const{row:t}=e,[n,r]=k.useState("hidden"),l=k.useContext(Za),o=S=>l(async p=>{const m={workers:S.map(({id:E})=>({id:E}))},w=await nt(`/api/v0/shift/${t.date}/${t.slug}/`,m);return p(w.ok),w}),i=xi((S,p)=>{const m=Di(t.workers,S,p);m!==t.workers&&o(m)}),u=async S=>{r("loading");const p=await o([...t.workers,S]);p.ok||console.log(`HTTP ${p.status} when adding worker`),r("show")},s=async S=>{const p=t.workers.slice();p.splice(S,1);const m=await o(p);m.ok||console.log(`HTTP ${m.status} when adding worker`)},a={};for(const S of t.workers)a[S.id+""]=!0;const g={};for(const{id:S,comment:p}of t.comments||[])g[S]=p;return N("div",{className:"sp_shift",children:[c("h2",{children:t.name}),e.showTimes&&N($,{children:[N("p",{children:["Tilmelding åbner: ",t.settings.registration_starts]}),N("p",{children:["Tilmelding lukker: ",t.settings.registration_deadline]})]}),N("ol",{children:[t.workers.map(({id:S,name:p},m)=>N("li",{style:i.isDragging(m)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:i.onDragLeave(m),onDragEnter:i.onDragEnter(m),onDragOver:i.onDragOver(m),onDrop:i.onDrop(m),children:[c("span",{draggable:!0,onDragStart:i.onDragStart(m),onDragEnd:i.onDragEnd(m),children:p})," ",c("a",{href:"#",onClick:w=>{w.preventDefault(),s(m)},children:"×"}),g[S]&&N($,{children:[" ",c("span",{style:{fontStyle:"italic"},children:g[S]})]})]},m)),c("li",{style:{listStyle:"none",...i.isDragging(t.workers.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:i.onDragLeave(t.workers.length),onDragEnter:i.onDragEnter(t.workers.length),onDragOver:i.onDragOver(t.workers.length),onDrop:i.onDrop(t.workers.length),children:n==="hidden"?c("a",{href:"#",onClick:S=>{S.preventDefault(),r("show")},children:"Tilføj"}):c(Xa.Consumer,{children:S=>c(Od,{options:Object.entries(S).filter(([p,m])=>m.active&&!(p+""in a)).map(([p,m])=>({value:p+"",label:m.name})),onCancel:()=>r("hidden"),onSubmit:p=>u(S[p])},t.workers.length+"add")})})]})]})},Rd=e=>{const{date:t,rows:n}=e,r=Ci(t);return N("div",{className:"sp_weekday_shifts",children:[N("h1",{children:[c("div",{className:"sp_the_weekday",children:Qa(r)}),c("div",{className:"sp_the_fulldate",children:Ya(r)})]}),n.map(l=>c(Md,{row:l,showTimes:e.showTimes},l.order))]})};function Qu(e){for(const t of e)if(t!==e[0])return!1;return!0}const jd=e=>{const{data:t}=e,n={};for(const l of t)(n[l.date]||(n[l.date]=[])).push(l);const r=Qu(t.map(l=>l.settings.registration_starts))&&Qu(t.map(l=>l.settings.registration_deadline));return N($,{children:[N("div",{children:[r&&t.length>0&&N($,{children:["Tilmelding åbner: ",t[0].settings.registration_starts," ","Tilmelding lukker: ",t[0].settings.registration_deadline," "]}),c("a",{href:"print/",children:"Print"})]}),c("div",{className:"sp_days",children:Object.entries(n).map(([l,o])=>c(Rd,{date:l,rows:o,showTimes:!r},l))})]})};function Id(e){k.useEffect(()=>{const t=n=>{if(n.target.tagName!=="INPUT"){if(n.code in e)e[n.code]();else return;n.preventDefault()}};return window.addEventListener("keypress",t,!1),()=>window.removeEventListener("keypress",t,!1)})}const zd=()=>{const[e,t]=rt(),[n,r]=k.useState(!1);return k.useEffect(()=>{t(window.fetch("/api/v0/workplace/")).then(()=>r(!0))},[]),console.log({workplaceJson:e}),e==null?null:e.rows[0].settings},Fd=e=>{const[t,n]=k.useState(!1),[r,l]=rt();return k.useEffect(()=>{e&&l(window.fetch("/api/v0/shift_delete/")).then(()=>n(!0))},[e]),r},$d=e=>{const t=zd(),n=t==null?void 0:t.retain_weeks,r=n!=null,l=Fd(r);return console.log({workplaceSettings:t,retain:n,workerShiftDataDeleteStatus:l}),n==null||l==null?c("div",{}):l.shifts+l.comments===0?N("div",{children:["Persondata: Gemmer ingen vagtbookinger ældre end ",n," uger"]}):N("div",{children:["Persondata:"," ","Gemmer pt. ",l.shifts," vagter"," ","og ",l.comments," noter"," ","ældre end ",n," uger"," ","(mellem uge ",l.earliest," ","og uge ",l.latest,")."," ",c("button",{onClick:()=>nt("/api/v0/shift_delete/",l),children:"Slet gamle vagtbookinger nu"})]})},Ud=e=>{const[t,n]=k.useState(""),[r,l]=k.useState(0),[o,i]=k.useState(!1),[u,s]=k.useState({week:0,year:0,refreshCount:r}),[a,g]=k.useState({week:e.week||1,year:e.year||2022,relative:0}),S=!o&&u.week===a.week+a.relative&&u.year===a.year&&u.refreshCount===r,{week:p,year:m,relative:w}=a,E=k.useRef([]),f=k.useRef({}),d=k.useRef({}),h=k.useRef({loadCount:0,workers:{}});k.useEffect(()=>{(async()=>{const x=await(await window.fetch("/api/v0/worker/")).json();for(const j of x.rows)h.current.workers[j.id+""]=j;h.current.loadCount+=1})()},[]);const v=k.useCallback(async(P,x)=>{const j=await window.fetch(`/api/v0/shift/?week=${P}w${x}`);if(!j.ok)return{ok:!1,status:j.status};const ne=await j.json();return console.log({next:ne.next,prev:ne.prev}),f.current[`${P}w${x}`]=ne.next,d.current[`${P}w${x}`]=ne.prev,{ok:!0,status:j.status,rows:ne.rows}},[]);k.useEffect(()=>{if(S)return;let P=!1;return(async()=>{let x=p,j=m,ne=w,B=null;for(;ne!==0;){if(P)return;if(!f.current[`${j}w${x}`]){const F=await v(j,x);if(!F.ok){n(`HTTP ${F.status}`);return}B=F.rows}ne>0?([j,x]=f.current[`${j}w${x}`].split("w").map(F=>parseInt(F)),ne-=1):([j,x]=d.current[`${j}w${x}`].split("w").map(F=>parseInt(F)),ne+=1)}if(B==null){if(P)return;const F=await v(j,x);if(!F.ok){n(`HTTP ${F.status}`);return}B=F.rows}E.current.splice(0,E.current.length,...B),s({week:x,year:j,refreshCount:r}),window.history.replaceState({},document.title,`/admin/s/${j}w${x}/`),g({week:x,year:j,relative:0})})(),()=>{P=!0}},[p,m,w,r]);const y=k.useCallback(()=>{g(({week:P,year:x,relative:j})=>({week:P,year:x,relative:j-1}))},[]),L=k.useCallback(()=>{g(({week:P,year:x,relative:j})=>({week:P,year:x,relative:j+1}))},[]),C=k.useCallback(async P=>(i(!0),await P(async x=>{x&&l(j=>j+1),i(!1)})),[]);Id({KeyJ:L,KeyK:y});const O=!kd(S,500);return N(Xa.Provider,{value:h.current.workers,children:[c(tn,{current:"schedule"}),t!==""&&c("div",{className:"sp_error",children:t}),N("div",{className:"sp_weekheader",children:[c("div",{className:"sp_prev",children:c("a",{href:"#",onClick:P=>{P.preventDefault(),y()},children:"←"})}),N("div",{className:"sp_weekdisplay",children:["Uge ",p,", ",m]}),c("div",{className:"sp_next",children:c("a",{href:"#",onClick:P=>{P.preventDefault(),L()},children:"→"})})]}),c($d,{}),c("div",{style:{opacity:O?.7:void 0},children:c(Za.Provider,{value:C,children:c(jd,{data:E.current})})})]})},Ce=e=>N("div",{className:"sp_EditRow",children:[c("div",{children:e.title}),N("div",{children:[c("div",{children:e.children}),c("div",{children:e.help})]})]}),Yu=e=>[(e[0]??"")+"",t=>{t===""?e[1](void 0):isNaN(+t)||e[1](+t)}],Wd=e=>{const t=e.workplace.settings,[n,r]=k.useState(""),[l,o,[i,u,s,a,g,S,p,m,w]]=Ga([t.default_view_day||"",t.message_of_the_day||"",t.print_header_text||"",t.max_print_per_shift,t.login_email_template||"",t.login_email_subject||"",t.login_sms_template||"",t.country_code||"",t.retain_weeks]),E=!0;k.useEffect(()=>{!l&&E&&r("")},[n,l,E]);const f=k.useCallback(async()=>{if(!l){r("");return}const[v,y,L,C,O,P,x,j,ne]=o,B=await e.save({...e.workplace,settings:{default_view_day:v,message_of_the_day:y,print_header_text:L,max_print_per_shift:C,login_email_template:O,login_email_subject:P,login_sms_template:x,country_code:j,retain_weeks:ne}});B.ok?r(""):typeof B.error=="string"?r(B.error):r(`Fejl fra serveren: ${JSON.stringify(B)}`)},[l,E,a,...o]),d=Yu(a),h=Yu(w);return N("div",{children:[N(Ce,{title:"",help:"",children:[c("button",{className:"sp_settings_save",disabled:!l,onClick:()=>f(),children:"Gem"}),n&&c("div",{style:{marginLeft:"10px",color:"red",fontWeight:"bold"},children:n})]}),c(Ce,{title:"Standard ugevisning",help:`Antal dage ud i fremtiden for den uge der skal vises.
-			'9d'=Vis næste uge, undtaget lørdag og søndag hvor der skal vises ugen efter.`,children:c(Z,{state:i,save:f})}),c(Ce,{title:"Besked til alle",help:"Vis en besked til alle øverst på hver side",children:c(Z,{state:u,save:f})}),c("h2",{children:"Printvisning"}),c(Ce,{title:"Maks antal vagttagere",help:"Maks antal vagttagere der skal vises pr. vagt i printvisning.",children:c(Z,{state:d,save:f})}),c(Ce,{title:"Tekst",help:"Tekst der skal stå øverst på den printede vagtplan.",children:c(Z,{multiline:!0,state:s,save:f})}),c("h2",{children:"Vagttagere"}),c(Ce,{title:"Email-emne",help:"Standard emnefelt når man ønsker at sende login-link til vagttagere.",children:c(Z,{state:S,save:f})}),c(Ce,{title:"Email-tekst",help:"Standard-tekst når man ønsker at sende login-link til vagttagere.",children:c(Z,{multiline:!0,state:g,save:f})}),c(Ce,{title:"SMS-tekst",help:"Standard-tekst når man ønsker at sende login-link på SMS til vagttagere.",children:c(Z,{multiline:!0,state:p,save:f})}),c(Ce,{title:"Landekode",help:"Standard-landekode (f.eks. +45) når der skal sendes SMS til vagttagere.",children:c(Z,{state:m,save:f})}),c("h2",{children:"Sletning af persondata"}),c(Ce,{title:"Slet data efter (uger)",help:"Slet gamle vagtbookinger efter dette antal uger.",children:c(Z,{state:h,save:f})})]})},Vd=e=>{const[t,n]=k.useState(0),r=k.useRef({});k.useEffect(()=>{(async()=>{const i=await(await window.fetch("/api/v0/workplace/")).json();for(const u of i.rows)r.current[u.id+""]=u;n(u=>u+1)})()},[]);const l=k.useCallback(async o=>{const i=await nt("/api/v0/workplace/",o);return i.status===400?await i.json():i.ok?(r.current[o.id]={...r.current[o.id],settings:{...r.current[o.id].settings,...o.settings}},n(u=>u+1),await i.json()):{error:`HTTP ${i.status}`}},[]);return N($,{children:[c(tn,{current:"settings"}),t?c(Wd,{save:l,workplace:[...Object.values(r.current)][0]}):c("div",{children:"Indlæser..."})]})};function Ja(){const[e,t]=k.useState(null);return k.useEffect(()=>{fetch("/api/v0/worker_stats/").then(n=>n.json()).then(n=>t(n.workers))},[]),e}const Ku=(e,t)=>{const n={},r=[];for(const l of t){const o=e(l);o in n||(r.push({name:o,count:0}),n[o]=r[r.length-1]),n[o].count+=l.count}return r},Gu=e=>Object.entries(e).map(([t,n])=>`${window.encodeURIComponent(t)}=${window.encodeURIComponent(n)}`).join("&"),Xu=e=>{const t={æ:"ae",Æ:"AE",ø:"oe",Ø:"OE",å:"aa",Å:"AA",ä:"ae",Ä:"AE",ö:"oe",Ö:"OE",ü:"ue",Ü:"UE"};return e.replace(new RegExp(Object.keys(t).join("|"),"g"),n=>t[n])},qa=e=>e===null?"... bookinger":e===void 0||e.last==null?"0 bookinger":`${e.count} bookinger, seneste i uge ${e.last.isoweek} ${e.last.isoyear}`,Ad=e=>{const t=e.worker,n=e.settings,r=t.phone||"",l=t.login_secret||"";if(r==="")return c($,{children:"(intet telefonnummer)"});if(l==="")return c($,{children:"(intet kodeord)"});const o=`${location.origin}/login/#`+new URLSearchParams({phone:r,password:l}),i=Xu(n.login_email_subject||""),u={name:t.name,link:o},s=Xu((n.login_email_template||"").replace(/\{(name|link)\}/g,(w,E)=>u[E])),a=(n.login_sms_template||"").replace(/\{(name|link)\}/g,(w,E)=>u[E]),g=`mailto:${window.encodeURIComponent(t.email||"")}?${Gu({subject:i,body:s})}`,p=`sms:${r.startsWith("+")||r.startsWith("0")?"":n.country_code||""}${r}?${Gu({body:a})}`,m=`/myshifts/?wid=${t.id}`;return N($,{children:[r===""?c("button",{disabled:!0,children:"Login kræver telefonnummer"}):l===""?c("button",{disabled:!0,children:"(kodeord mangler??)"}):c("button",{onClick:()=>{navigator.clipboard.writeText(o).catch(()=>window.prompt("Login-link",o))},children:"Kopiér login-link"})," · ",c("a",{href:g,target:"_blank",children:"Send email med login-link"}),e.settings.enable_sms&&N($,{children:[" · ",c("a",{href:p,target:"_blank",children:"Send SMS med login-link"})]})," · ",c("a",{href:m,target:"_blank",children:qa(e.stats)})]})},Zu=e=>{const t=e.worker,[n,r,[l,o,i,u,s]]=Ga([t.name,t.phone||"",t.email||"",t.note,t.active+""]),a=k.useCallback(async()=>{if(!n)return;const[g,S,p,m,w]=r;e.save({...e.worker,name:g,phone:S,email:p,note:m,active:w==="true"})},[n,...r]);return N("tr",{children:[c("td",{children:c(Z,{placeholder:"Navn",state:l,save:a})}),c("td",{children:c(Z,{placeholder:"Telefon",state:o,save:a})}),c(Kt.Consumer,{children:g=>g.enable_worker_email&&c("td",{children:c(Z,{placeholder:"Email",state:i,save:a})})}),c("td",{children:c(Z,{placeholder:"Note",state:u,save:a})}),c("td",{children:c("input",{type:"checkbox",checked:s[0]==="true",onChange:g=>s[1](g.target.checked+"")})}),c("td",{children:c("input",{type:"button",value:"Gem",onClick:()=>a(),disabled:!n})}),c("td",{children:c(Kt.Consumer,{children:g=>c(Ad,{worker:e.worker,settings:g,stats:e.stats})})})]})},Bd=e=>{const t=e.split(`
+Add a <Suspense fallback=...> component higher in the tree to provide a loading indicator or placeholder to display.`)}ee!==5&&(ee=2),s=hi(s,u),p=i;do{switch(p.tag){case 3:o=s,p.flags|=4096,t&=-t,p.lanes|=t;var L=Na(p,o,t);gu(p,L);break e;case 1:o=s;var C=p.type,O=p.stateNode;if(!(p.flags&64)&&(typeof C.getDerivedStateFromError=="function"||O!==null&&typeof O.componentDidCatch=="function"&&(Te===null||!Te.has(O)))){p.flags|=4096,t&=-t,p.lanes|=t;var P=La(p,o,t);gu(p,P);break e}}p=p.return}while(p!==null)}$a(n)}catch(x){t=x,G===n&&n!==null&&(G=n=n.return);continue}break}while(1)}function za(){var e=Kr.current;return Kr.current=Yr,e===null?Yr:e}function Sn(e,t){var n=M;M|=16;var r=za();ue===e&&oe===t||Vt(e,t);do try{nd();break}catch(l){Ia(e,l)}while(1);if(li(),M=n,Kr.current=r,G!==null)throw Error(_(261));return ue=null,oe=0,ee}function nd(){for(;G!==null;)Fa(G)}function rd(){for(;G!==null&&!$f();)Fa(G)}function Fa(e){var t=Wa(e.alternate,e,yt);e.memoizedProps=e.pendingProps,t===null?$a(e):G=t,mi.current=null}function $a(e){var t=e;do{var n=t.alternate;if(e=t.return,t.flags&2048){if(n=Gf(t),n!==null){n.flags&=2047,G=n;return}e!==null&&(e.firstEffect=e.lastEffect=null,e.flags|=2048)}else{if(n=Kf(n,t,yt),n!==null){G=n;return}if(n=t,n.tag!==24&&n.tag!==23||n.memoizedState===null||yt&1073741824||!(n.mode&4)){for(var r=0,l=n.child;l!==null;)r|=l.lanes|l.childLanes,l=l.sibling;n.childLanes=r}e!==null&&!(e.flags&2048)&&(e.firstEffect===null&&(e.firstEffect=t.firstEffect),t.lastEffect!==null&&(e.lastEffect!==null&&(e.lastEffect.nextEffect=t.firstEffect),e.lastEffect=t.lastEffect),1<t.flags&&(e.lastEffect!==null?e.lastEffect.nextEffect=t:e.firstEffect=t,e.lastEffect=t))}if(t=t.sibling,t!==null){G=t;return}G=t=e}while(t!==null);ee===0&&(ee=5)}function at(e){var t=Qt();return vt(99,ld.bind(null,e,t)),null}function ld(e,t){do ot();while(On!==null);if(M&48)throw Error(_(327));var n=e.finishedWork;if(n===null)return null;if(e.finishedWork=null,e.finishedLanes=0,n===e.current)throw Error(_(177));e.callbackNode=null;var r=n.lanes|n.childLanes,l=r,o=e.pendingLanes&~l;e.pendingLanes=l,e.suspendedLanes=0,e.pingedLanes=0,e.expiredLanes&=l,e.mutableReadLanes&=l,e.entangledLanes&=l,l=e.entanglements;for(var i=e.eventTimes,u=e.expirationTimes;0<o;){var s=31-qe(o),a=1<<s;l[s]=0,i[s]=-1,u[s]=-1,o&=~a}if(Ie!==null&&!(r&24)&&Ie.has(e)&&Ie.delete(e),e===ue&&(G=ue=null,oe=0),1<n.flags?n.lastEffect!==null?(n.lastEffect.nextEffect=n,r=n.firstEffect):r=n:r=n.firstEffect,r!==null){if(l=M,M|=32,mi.current=null,Dl=yr,i=nu(),to(i)){if("selectionStart"in i)u={start:i.selectionStart,end:i.selectionEnd};else e:if(u=(u=i.ownerDocument)&&u.defaultView||window,(a=u.getSelection&&u.getSelection())&&a.rangeCount!==0){u=a.anchorNode,o=a.anchorOffset,s=a.focusNode,a=a.focusOffset;try{u.nodeType,s.nodeType}catch{u=null;break e}var g=0,S=-1,p=-1,m=0,w=0,E=i,f=null;t:for(;;){for(var d;E!==u||o!==0&&E.nodeType!==3||(S=g+o),E!==s||a!==0&&E.nodeType!==3||(p=g+a),E.nodeType===3&&(g+=E.nodeValue.length),(d=E.firstChild)!==null;)f=E,E=d;for(;;){if(E===i)break t;if(f===u&&++m===o&&(S=g),f===s&&++w===a&&(p=g),(d=E.nextSibling)!==null)break;E=f,f=E.parentNode}E=d}u=S===-1||p===-1?null:{start:S,end:p}}else u=null;u=u||{start:0,end:0}}else u=null;Tl={focusedElem:i,selectionRange:u},yr=!1,Rn=null,xr=!1,T=r;do try{od()}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);Rn=null,T=r;do try{for(i=e;T!==null;){var h=T.flags;if(h&16&&zn(T.stateNode,""),h&128){var v=T.alternate;if(v!==null){var y=v.ref;y!==null&&(typeof y=="function"?y(null):y.current=null)}}switch(h&1038){case 2:Vu(T),T.flags&=-3;break;case 6:Vu(T),T.flags&=-3,jl(T.alternate,T);break;case 1024:T.flags&=-1025;break;case 1028:T.flags&=-1025,jl(T.alternate,T);break;case 4:jl(T.alternate,T);break;case 8:u=T,Oa(i,u);var L=u.alternate;Uu(u),L!==null&&Uu(L)}T=T.nextEffect}}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);if(y=Tl,v=nu(),h=y.focusedElem,i=y.selectionRange,v!==h&&h&&h.ownerDocument&&Xs(h.ownerDocument.documentElement,h)){for(i!==null&&to(h)&&(v=i.start,y=i.end,y===void 0&&(y=v),"selectionStart"in h?(h.selectionStart=v,h.selectionEnd=Math.min(y,h.value.length)):(y=(v=h.ownerDocument||document)&&v.defaultView||window,y.getSelection&&(y=y.getSelection(),u=h.textContent.length,L=Math.min(i.start,u),i=i.end===void 0?L:Math.min(i.end,u),!y.extend&&L>i&&(u=i,i=L,L=u),u=tu(h,L),o=tu(h,i),u&&o&&(y.rangeCount!==1||y.anchorNode!==u.node||y.anchorOffset!==u.offset||y.focusNode!==o.node||y.focusOffset!==o.offset)&&(v=v.createRange(),v.setStart(u.node,u.offset),y.removeAllRanges(),L>i?(y.addRange(v),y.extend(o.node,o.offset)):(v.setEnd(o.node,o.offset),y.addRange(v)))))),v=[],y=h;y=y.parentNode;)y.nodeType===1&&v.push({element:y,left:y.scrollLeft,top:y.scrollTop});for(typeof h.focus=="function"&&h.focus(),h=0;h<v.length;h++)y=v[h],y.element.scrollLeft=y.left,y.element.scrollTop=y.top}yr=!!Dl,Tl=Dl=null,e.current=n,T=r;do try{for(h=e;T!==null;){var C=T.flags;if(C&36&&qf(h,T.alternate,T),C&128){v=void 0;var O=T.ref;if(O!==null){var P=T.stateNode;switch(T.tag){case 5:v=P;break;default:v=P}typeof O=="function"?O(v):O.current=v}}T=T.nextEffect}}catch(x){if(T===null)throw Error(_(330));Ze(T,x),T=T.nextEffect}while(T!==null);T=null,Wf(),M=l}else e.current=n;if(et)et=!1,On=e,kn=t;else for(T=r;T!==null;)t=T.nextEffect,T.nextEffect=null,T.flags&8&&(C=T,C.sibling=null,C.stateNode=null),T=t;if(r=e.pendingLanes,r===0&&(Te=null),r===1?e===xo?Mn++:(Mn=0,xo=e):Mn=0,n=n.stateNode,mt&&typeof mt.onCommitFiberRoot=="function")try{mt.onCommitFiberRoot(ni,n,void 0,(n.current.flags&64)===64)}catch{}if(we(e,le()),Gr)throw Gr=!1,e=Eo,Eo=null,e;return M&8||Le(),null}function od(){for(;T!==null;){var e=T.alternate;xr||Rn===null||(T.flags&8?Vi(T,Rn)&&(xr=!0):T.tag===13&&bf(e,T)&&Vi(T,Rn)&&(xr=!0));var t=T.flags;t&256&&Jf(e,T),!(t&512)||et||(et=!0,Hn(97,function(){return ot(),null})),T=T.nextEffect}}function ot(){if(kn!==90){var e=97<kn?97:kn;return kn=90,vt(e,ud)}return!1}function id(e,t){_o.push(t,e),et||(et=!0,Hn(97,function(){return ot(),null}))}function Ua(e,t){Co.push(t,e),et||(et=!0,Hn(97,function(){return ot(),null}))}function ud(){if(On===null)return!1;var e=On;if(On=null,M&48)throw Error(_(331));var t=M;M|=32;var n=Co;Co=[];for(var r=0;r<n.length;r+=2){var l=n[r],o=n[r+1],i=l.destroy;if(l.destroy=void 0,typeof i=="function")try{i()}catch(s){if(o===null)throw Error(_(330));Ze(o,s)}}for(n=_o,_o=[],r=0;r<n.length;r+=2){l=n[r],o=n[r+1];try{var u=l.create;l.destroy=u()}catch(s){if(o===null)throw Error(_(330));Ze(o,s)}}for(u=e.current.firstEffect;u!==null;)e=u.nextEffect,u.nextEffect=null,u.flags&8&&(u.sibling=null,u.stateNode=null),u=e;return M=t,Le(),!0}function Bu(e,t,n){t=hi(n,t),t=Na(e,t,1),Ke(e,t),t=pe(),e=al(e,1),e!==null&&(tl(e,1,t),we(e,t))}function Ze(e,t){if(e.tag===3)Bu(e,e,t);else for(var n=e.return;n!==null;){if(n.tag===3){Bu(n,e,t);break}else if(n.tag===1){var r=n.stateNode;if(typeof n.type.getDerivedStateFromError=="function"||typeof r.componentDidCatch=="function"&&(Te===null||!Te.has(r))){e=hi(t,e);var l=La(n,e,1);if(Ke(n,l),l=pe(),n=al(n,1),n!==null)tl(n,1,l),we(n,l);else if(typeof r.componentDidCatch=="function"&&(Te===null||!Te.has(r)))try{r.componentDidCatch(t,e)}catch{}break}}n=n.return}}function sd(e,t,n){var r=e.pingCache;r!==null&&r.delete(t),t=pe(),e.pingedLanes|=e.suspendedLanes&n,ue===e&&(oe&n)===n&&(ee===4||ee===3&&(oe&62914560)===oe&&500>le()-vi?Vt(e,0):gi|=n),we(e,t)}function ad(e,t){var n=e.stateNode;n!==null&&n.delete(t),t=0,t===0&&(t=e.mode,t&2?t&4?(Me===0&&(Me=qt),t=Dt(62914560&~Me),t===0&&(t=4194304)):t=Qt()===99?1:2:t=1),n=pe(),e=al(e,t),e!==null&&(tl(e,t,n),we(e,n))}var Wa;Wa=function(e,t,n){var r=t.lanes;if(e!==null)if(e.memoizedProps!==t.pendingProps||fe.current)_e=!0;else if(n&r)_e=!!(e.flags&16384);else{switch(_e=!1,t.tag){case 3:Nu(t),Ol();break;case 5:ku(t);break;case 1:de(t.type)&&Sr(t);break;case 4:ao(t,t.stateNode.containerInfo);break;case 10:r=t.memoizedProps.value;var l=t.type._context;Q(zr,l._currentValue),l._currentValue=r;break;case 13:if(t.memoizedState!==null)return n&t.child.childLanes?Lu(e,t,n):(Q(H,H.current&1),t=je(e,t,n),t!==null?t.sibling:null);Q(H,H.current&1);break;case 19:if(r=(n&t.childLanes)!==0,e.flags&64){if(r)return Iu(e,t,n);t.flags|=64}if(l=t.memoizedState,l!==null&&(l.rendering=null,l.tail=null,l.lastEffect=null),Q(H,H.current),r)break;return null;case 23:case 24:return t.lanes=0,Ml(e,t,n)}return je(e,t,n)}else _e=!1;switch(t.lanes=0,t.tag){case 2:if(r=t.type,e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),e=t.pendingProps,l=Ht(t,ie.current),$t(t,n),l=ci(null,t,r,e,l,n),t.flags|=1,typeof l=="object"&&l!==null&&typeof l.render=="function"&&l.$$typeof===void 0){if(t.tag=1,t.memoizedState=null,t.updateQueue=null,de(r)){var o=!0;Sr(t)}else o=!1;t.memoizedState=l.state!==null&&l.state!==void 0?l.state:null,ii(t);var i=r.getDerivedStateFromProps;typeof i=="function"&&Ur(t,r,i,e),l.updater=ul,t.stateNode=l,l._reactInternals=t,so(t,r,e,n),t=ho(null,t,r,!0,o,n)}else t.tag=0,ce(null,t,l,n),t=t.child;return t;case 16:l=t.elementType;e:{switch(e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),e=t.pendingProps,o=l._init,l=o(l._payload),t.type=l,o=t.tag=fd(l),e=Ee(l,e),o){case 0:t=po(null,t,l,e,n);break e;case 1:t=Pu(null,t,l,e,n);break e;case 11:t=Du(null,t,l,e,n);break e;case 14:t=Tu(null,t,l,Ee(l.type,e),r,n);break e}throw Error(_(306,l,""))}return t;case 0:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),po(e,t,r,l,n);case 1:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),Pu(e,t,r,l,n);case 3:if(Nu(t),r=t.updateQueue,e===null||r===null)throw Error(_(282));if(r=t.pendingProps,l=t.memoizedState,l=l!==null?l.element:null,fa(e,t),Qn(t,r,null,n),r=t.memoizedState.element,r===l)Ol(),t=je(e,t,n);else{if(l=t.stateNode,(o=l.hydrate)&&(Ae=Ft(t.stateNode.containerInfo.firstChild),Re=t,o=Ne=!0),o){if(e=l.mutableSourceEagerHydrationData,e!=null)for(l=0;l<e.length;l+=2)o=e[l],o._workInProgressVersionPrimary=e[l+1],Ut.push(o);for(n=ma(t,null,r,n),t.child=n;n;)n.flags=n.flags&-3|1024,n=n.sibling}else ce(e,t,r,n),Ol();t=t.child}return t;case 5:return ku(t),e===null&&co(t),r=t.type,l=t.pendingProps,o=e!==null?e.memoizedProps:null,i=l.children,lo(r,l)?i=null:o!==null&&lo(r,o)&&(t.flags|=16),xa(e,t),ce(e,t,i,n),t.child;case 6:return e===null&&co(t),null;case 13:return Lu(e,t,n);case 4:return ao(t,t.stateNode.containerInfo),r=t.pendingProps,e===null?t.child=Wr(t,null,r,n):ce(e,t,r,n),t.child;case 11:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),Du(e,t,r,l,n);case 7:return ce(e,t,t.pendingProps,n),t.child;case 8:return ce(e,t,t.pendingProps.children,n),t.child;case 12:return ce(e,t,t.pendingProps.children,n),t.child;case 10:e:{r=t.type._context,l=t.pendingProps,i=t.memoizedProps,o=l.value;var u=t.type._context;if(Q(zr,u._currentValue),u._currentValue=o,i!==null)if(u=i.value,o=me(u,o)?0:(typeof r._calculateChangedBits=="function"?r._calculateChangedBits(u,o):1073741823)|0,o===0){if(i.children===l.children&&!fe.current){t=je(e,t,n);break e}}else for(u=t.child,u!==null&&(u.return=t);u!==null;){var s=u.dependencies;if(s!==null){i=u.child;for(var a=s.firstContext;a!==null;){if(a.context===r&&a.observedBits&o){u.tag===1&&(a=Ye(-1,n&-n),a.tag=2,Ke(u,a)),u.lanes|=n,a=u.alternate,a!==null&&(a.lanes|=n),ca(u.return,n),s.lanes|=n;break}a=a.next}}else i=u.tag===10&&u.type===t.type?null:u.child;if(i!==null)i.return=u;else for(i=u;i!==null;){if(i===t){i=null;break}if(u=i.sibling,u!==null){u.return=i.return,i=u;break}i=i.return}u=i}ce(e,t,l.children,n),t=t.child}return t;case 9:return l=t.type,o=t.pendingProps,r=o.children,$t(t,n),l=ye(l,o.unstable_observedBits),r=r(l),t.flags|=1,ce(e,t,r,n),t.child;case 14:return l=t.type,o=Ee(l,t.pendingProps),o=Ee(l.type,o),Tu(e,t,l,o,r,n);case 15:return Ca(e,t,t.type,t.pendingProps,r,n);case 17:return r=t.type,l=t.pendingProps,l=t.elementType===r?l:Ee(r,l),e!==null&&(e.alternate=null,t.alternate=null,t.flags|=2),t.tag=1,de(r)?(e=!0,Sr(t)):e=!1,$t(t,n),pa(t,r,l),so(t,r,l,n),ho(null,t,r,!0,e,n);case 19:return Iu(e,t,n);case 23:return Ml(e,t,n);case 24:return Ml(e,t,n)}throw Error(_(156,t.tag))};function cd(e,t,n,r){this.tag=e,this.key=n,this.sibling=this.child=this.return=this.stateNode=this.type=this.elementType=null,this.index=0,this.ref=null,this.pendingProps=t,this.dependencies=this.memoizedState=this.updateQueue=this.memoizedProps=null,this.mode=r,this.flags=0,this.lastEffect=this.firstEffect=this.nextEffect=null,this.childLanes=this.lanes=0,this.alternate=null}function ge(e,t,n,r){return new cd(e,t,n,r)}function wi(e){return e=e.prototype,!(!e||!e.isReactComponent)}function fd(e){if(typeof e=="function")return wi(e)?1:0;if(e!=null){if(e=e.$$typeof,e===qr)return 11;if(e===br)return 14}return 2}function tt(e,t){var n=e.alternate;return n===null?(n=ge(e.tag,t,e.key,e.mode),n.elementType=e.elementType,n.type=e.type,n.stateNode=e.stateNode,n.alternate=e,e.alternate=n):(n.pendingProps=t,n.type=e.type,n.flags=0,n.nextEffect=null,n.firstEffect=null,n.lastEffect=null),n.childLanes=e.childLanes,n.lanes=e.lanes,n.child=e.child,n.memoizedProps=e.memoizedProps,n.memoizedState=e.memoizedState,n.updateQueue=e.updateQueue,t=e.dependencies,n.dependencies=t===null?null:{lanes:t.lanes,firstContext:t.firstContext},n.sibling=e.sibling,n.index=e.index,n.ref=e.ref,n}function Dr(e,t,n,r,l,o){var i=2;if(r=e,typeof e=="function")wi(e)&&(i=1);else if(typeof e=="string")i=5;else e:switch(e){case Ue:return At(n.children,l,o,t);case gs:i=8,l|=16;break;case Io:i=8,l|=1;break;case En:return e=ge(12,n,t,l|8),e.elementType=En,e.type=En,e.lanes=o,e;case _n:return e=ge(13,n,t,l),e.type=_n,e.elementType=_n,e.lanes=o,e;case Tr:return e=ge(19,n,t,l),e.elementType=Tr,e.lanes=o,e;case Vo:return ki(n,l,o,t);case Wl:return e=ge(24,n,t,l),e.elementType=Wl,e.lanes=o,e;default:if(typeof e=="object"&&e!==null)switch(e.$$typeof){case zo:i=10;break e;case Fo:i=9;break e;case qr:i=11;break e;case br:i=14;break e;case $o:i=16,r=null;break e;case Uo:i=22;break e}throw Error(_(130,e==null?e:typeof e,""))}return t=ge(i,n,t,l),t.elementType=e,t.type=r,t.lanes=o,t}function At(e,t,n,r){return e=ge(7,e,r,t),e.lanes=n,e}function ki(e,t,n,r){return e=ge(23,e,r,t),e.elementType=Vo,e.lanes=n,e}function Il(e,t,n){return e=ge(6,e,null,t),e.lanes=n,e}function zl(e,t,n){return t=ge(4,e.children!==null?e.children:[],e.key,t),t.lanes=n,t.stateNode={containerInfo:e.containerInfo,pendingChildren:null,implementation:e.implementation},t}function dd(e,t,n){this.tag=t,this.containerInfo=e,this.finishedWork=this.pingCache=this.current=this.pendingChildren=null,this.timeoutHandle=-1,this.pendingContext=this.context=null,this.hydrate=n,this.callbackNode=null,this.callbackPriority=0,this.eventTimes=wl(0),this.expirationTimes=wl(-1),this.entangledLanes=this.finishedLanes=this.mutableReadLanes=this.expiredLanes=this.pingedLanes=this.suspendedLanes=this.pendingLanes=0,this.entanglements=wl(0),this.mutableSourceEagerHydrationData=null}function pd(e,t,n){var r=3<arguments.length&&arguments[3]!==void 0?arguments[3]:null;return{$$typeof:ct,key:r==null?null:""+r,children:e,containerInfo:t,implementation:n}}function Xr(e,t,n,r){var l=t.current,o=pe(),i=Ge(l);e:if(n){n=n._reactInternals;t:{if(St(n)!==n||n.tag!==1)throw Error(_(170));var u=n;do{switch(u.tag){case 3:u=u.stateNode.context;break t;case 1:if(de(u.type)){u=u.stateNode.__reactInternalMemoizedMergedChildContext;break t}}u=u.return}while(u!==null);throw Error(_(171))}if(n.tag===1){var s=n.type;if(de(s)){n=ra(n,s,u);break e}}n=u}else n=be;return t.context===null?t.context=n:t.pendingContext=n,t=Ye(o,i),t.payload={element:e},r=r===void 0?null:r,r!==null&&(t.callback=r),Ke(l,t),Xe(l,i,o),i}function Fl(e){if(e=e.current,!e.child)return null;switch(e.child.tag){case 5:return e.child.stateNode;default:return e.child.stateNode}}function Hu(e,t){if(e=e.memoizedState,e!==null&&e.dehydrated!==null){var n=e.retryLane;e.retryLane=n!==0&&n<t?n:t}}function Si(e,t){Hu(e,t),(e=e.alternate)&&Hu(e,t)}function hd(){return null}function Ei(e,t,n){var r=n!=null&&n.hydrationOptions!=null&&n.hydrationOptions.mutableSources||null;if(n=new dd(e,t,n!=null&&n.hydrate===!0),t=ge(3,null,null,t===2?7:t===1?3:0),n.current=t,t.stateNode=n,ii(t),e[Jt]=n.current,qs(e.nodeType===8?e.parentNode:e),r)for(e=0;e<r.length;e++){t=r[e];var l=t._getVersion;l=l(t._source),n.mutableSourceEagerHydrationData==null?n.mutableSourceEagerHydrationData=[t,l]:n.mutableSourceEagerHydrationData.push(t,l)}this._internalRoot=n}Ei.prototype.render=function(e){Xr(e,this._internalRoot,null,null)};Ei.prototype.unmount=function(){var e=this._internalRoot,t=e.containerInfo;Xr(null,e,null,function(){t[Jt]=null})};function nr(e){return!(!e||e.nodeType!==1&&e.nodeType!==9&&e.nodeType!==11&&(e.nodeType!==8||e.nodeValue!==" react-mount-point-unstable "))}function md(e,t){if(t||(t=e?e.nodeType===9?e.documentElement:e.firstChild:null,t=!(!t||t.nodeType!==1||!t.hasAttribute("data-reactroot"))),!t)for(var n;n=e.lastChild;)e.removeChild(n);return new Ei(e,0,t?{hydrate:!0}:void 0)}function cl(e,t,n,r,l){var o=n._reactRootContainer;if(o){var i=o._internalRoot;if(typeof l=="function"){var u=l;l=function(){var a=Fl(i);u.call(a)}}Xr(t,i,e,l)}else{if(o=n._reactRootContainer=md(n,r),i=o._internalRoot,typeof l=="function"){var s=l;l=function(){var a=Fl(i);s.call(a)}}ja(function(){Xr(t,i,e,l)})}return Fl(i)}Os=function(e){if(e.tag===13){var t=pe();Xe(e,4,t),Si(e,4)}};Yo=function(e){if(e.tag===13){var t=pe();Xe(e,67108864,t),Si(e,67108864)}};Ms=function(e){if(e.tag===13){var t=pe(),n=Ge(e);Xe(e,n,t),Si(e,n)}};Rs=function(e,t){return t()};Zl=function(e,t,n){switch(t){case"input":if(Al(e,n),t=n.name,n.type==="radio"&&t!=null){for(n=e;n.parentNode;)n=n.parentNode;for(n=n.querySelectorAll("input[name="+JSON.stringify(""+t)+'][type="radio"]'),t=0;t<n.length;t++){var r=n[t];if(r!==e&&r.form===e.form){var l=ol(r);if(!l)throw Error(_(90));ys(r),Al(r,l)}}}break;case"textarea":ks(e,n);break;case"select":t=n.value,t!=null&&jt(e,!!n.multiple,t,!1)}};Bo=Ra;Ts=function(e,t,n,r,l){var o=M;M|=4;try{return vt(98,e.bind(null,t,n,r,l))}finally{M=o,M===0&&(en(),Le())}};Ho=function(){!(M&49)&&(td(),ot())};Ps=function(e,t){var n=M;M|=2;try{return e(t)}finally{M=n,M===0&&(en(),Le())}};function Va(e,t){var n=2<arguments.length&&arguments[2]!==void 0?arguments[2]:null;if(!nr(t))throw Error(_(200));return pd(e,t,null,n)}var gd={Events:[bn,Lt,ol,xs,Ds,ot,{current:!1}]},gn={findFiberByHostInstance:dt,bundleType:0,version:"17.0.2",rendererPackageName:"react-dom"},vd={bundleType:gn.bundleType,version:gn.version,rendererPackageName:gn.rendererPackageName,rendererConfig:gn.rendererConfig,overrideHookState:null,overrideHookStateDeletePath:null,overrideHookStateRenamePath:null,overrideProps:null,overridePropsDeletePath:null,overridePropsRenamePath:null,setSuspenseHandler:null,scheduleUpdate:null,currentDispatcherRef:kt.ReactCurrentDispatcher,findHostInstanceByFiber:function(e){return e=Ls(e),e===null?null:e.stateNode},findFiberByHostInstance:gn.findFiberByHostInstance||hd,findHostInstancesForRefresh:null,scheduleRefresh:null,scheduleRoot:null,setRefreshHandler:null,getCurrentFiber:null};if(typeof __REACT_DEVTOOLS_GLOBAL_HOOK__<"u"){var mr=__REACT_DEVTOOLS_GLOBAL_HOOK__;if(!mr.isDisabled&&mr.supportsFiber)try{ni=mr.inject(vd),mt=mr}catch{}}ke.__SECRET_INTERNALS_DO_NOT_USE_OR_YOU_WILL_BE_FIRED=gd;ke.createPortal=Va;ke.findDOMNode=function(e){if(e==null)return null;if(e.nodeType===1)return e;var t=e._reactInternals;if(t===void 0)throw typeof e.render=="function"?Error(_(188)):Error(_(268,Object.keys(e)));return e=Ls(t),e=e===null?null:e.stateNode,e};ke.flushSync=function(e,t){var n=M;if(n&48)return e(t);M|=1;try{if(e)return vt(99,e.bind(null,t))}finally{M=n,Le()}};ke.hydrate=function(e,t,n){if(!nr(t))throw Error(_(200));return cl(null,e,t,!0,n)};ke.render=function(e,t,n){if(!nr(t))throw Error(_(200));return cl(null,e,t,!1,n)};ke.unmountComponentAtNode=function(e){if(!nr(e))throw Error(_(40));return e._reactRootContainer?(ja(function(){cl(null,null,e,!1,function(){e._reactRootContainer=null,e[Jt]=null})}),!0):!1};ke.unstable_batchedUpdates=Ra;ke.unstable_createPortal=function(e,t){return Va(e,t,2<arguments.length&&arguments[2]!==void 0?arguments[2]:null)};ke.unstable_renderSubtreeIntoContainer=function(e,t,n,r){if(!nr(n))throw Error(_(200));if(e==null||e._reactInternals===void 0)throw Error(_(38));return cl(e,t,n,!1,r)};ke.version="17.0.2";(function(e){function t(){if(!(typeof __REACT_DEVTOOLS_GLOBAL_HOOK__>"u"||typeof __REACT_DEVTOOLS_GLOBAL_HOOK__.checkDCE!="function"))try{__REACT_DEVTOOLS_GLOBAL_HOOK__.checkDCE(t)}catch(n){console.error(n)}}t(),e.exports=ke})(Sc);const Aa=["monday","tuesday","wednesday","thursday","friday","saturday","sunday"],_i=k.createContext({}),Kt=k.createContext({});function yd(e){let t=null;if(document.cookie&&document.cookie!==""){const n=document.cookie.split(";");for(let r=0;r<n.length;r++){const l=n[r].trim();if(l.substring(0,e.length+1)===e+"="){t=decodeURIComponent(l.substring(e.length+1));break}}}return t}const nt=(e,t,r)=>{const n=yd("csrftoken")||"";return window.fetch(e,{method:"POST",body:JSON.stringify(t),headers:{"X-CSRFToken":n,"Idempotency-Key":r||(window.crypto&&window.crypto.randomUUID?window.crypto.randomUUID():Math.random().toString(36).slice(2)+Date.now().toString(36))}})},Xn=()=>{const[e,t]=k.useState(0),[n,r]=k.useState(0),l=k.useRef([]);k.useEffect(()=>{(async()=>e!==n&&(await l.current[e](),t(e+1)))()},[e===n,e===n?n:e]);const o=k.useCallback(i=>{l.current.push(i),r(l.current.length)},[]);return[e>0&&e===n,o]},rt=()=>{const e=k.useRef({data:null}),t=k.useCallback(async n=>{const r=await n;e.current.data=await r.json()},[]);return[e.current.data,t]},wd=e=>{const t={};for(const n of e)t[n.id+""]=n;return t},Ba=e=>{const t=k.useRef({}).current;return k.useEffect(()=>{for(const r of Object.keys(t))delete t[r];const n=wd(e==null?[]:e.rows);for(const r of Object.keys(n))t[r]=n[r]},[e]),t};function kd(e,t){const[n,r]=k.useState(e);return k.useEffect(()=>{if(!e&&n){const l=setTimeout(()=>r(!1),t);return()=>void clearTimeout(l)}return e&&!n&&r(!0),()=>{}},[e,n]),n}const Sd=e=>{const[t,n]=k.useState("");return k.useState(()=>{let r=!1;return(async()=>{const l=await window.fetch("/api/v0/workplace/");if(r)return;const i=(await l.json()).rows[0];i&&i.settings&&i.settings.message_of_the_day&&n(i.settings.message_of_the_day)})(),()=>void(r=!0)}),t?c("div",{className:"sp_message_of_the_day",children:t}):c($,{})},Ed=e=>N("ul",{className:"sp_nav",children:[c("li",{className:e.current==="schedule"?"sp_current":"",children:c("a",{href:"/admin/",children:"Vagtbooking"})}),c("li",{className:e.current==="shifts"?"sp_current":"",children:c("a",{href:"/admin/shifts/",children:"Vagter"})}),c("li",{className:e.current==="workers"?"sp_current":"",children:c("a",{href:"/admin/workers/",children:"Vagttagere"})}),c("li",{className:e.current==="settings"?"sp_current":"",children:c("a",{href:"/admin/settings/",children:"Indstillinger"})}),c("li",{children:c("a",{href:"/adminlogout/",children:"Log ud"})})]}),tn=e=>N($,{children:[c(Sd,{}),c(Ed,{current:e.current})]}),_d=e=>{const[t,n]=rt();k.useEffect(()=>e.enqueue(()=>n(window.fetch("/api/v0/worker/"))),[]);const r=Ba(t);return c(_i.Provider,{value:r,children:e.children})},Cd=e=>{const[t,n]=k.useState(null),r=k.useContext(_i),l=[...Object.values(r)],o=N("select",{value:t==null?0:t.id,onChange:i=>n(i.target.selectedIndex===0?null:l[i.target.selectedIndex-1]),children:[c("option",{value:0,children:l.length===0&&!e?"Loading...":"---"}),l.map((i,u)=>c("option",{value:i.id,children:i.name},u))]});return[t,o]},xd={register:"Tilmeld",unregister:"Afmeld",worker_login:"Log ind",comment:"Bemærkning",edit_worker:"(Admin) Redigér vagttager",edit:"(Admin) Redigér vagtplan",import_workers:"(Admin) Importér vagttagere",edit_workplace_settings:"(Admin) Redigér indstillinger"},Dd=e=>{const t=k.useContext(_i),{data:{time:n,worker_id:r,user_id:l,kind:o,data:i}}=e,u=new Date(n*1e3),s={...i};t[s.worker]&&(s.worker=t[s.worker].name),o==="edit_worker"&&t[s.id]&&(s.id=t[s.id].name);const a=JSON.stringify(s)+"";return N("tr",{children:[c("td",{children:u+""}),c("td",{children:r==null?"-":t[r]?t[r].name:r+""}),c("td",{children:l==null?"-":l+""}),c("td",{children:xd[o]||o}),c("td",{title:a,children:a.substring(0,50)})]})},Td=e=>{const[t,n]=Xn(),[r,l]=rt();k.useEffect(()=>{let i="/api/v0/changelog/";e!=null&&(i+="?"+new URLSearchParams({worker:e.id+""})),n(()=>l(window.fetch(i)))},[e]);const o=r==null?[]:r.rows;return t?c("table",{children:c("tbody",{children:o.slice(0,1e3).map((i,u)=>c(Dd,{data:i},u))})}):c($,{children:"Loading..."})},Pd=e=>{const[t,n]=Cd(e.loaded),r=Td(t);return N($,{children:[n,r]})},Nd=e=>{const[t,n]=Xn();return N(_d,{enqueue:n,children:[c(tn,{current:"changelog"}),c(Pd,{loaded:t})]})},Ci=e=>{const[t,n,r]=e.split("-").map(l=>parseInt(l));return new Date(t,n-1,r)},Ha=["mandag","tirsdag","onsdag","torsdag","fredag","lørdag","søndag"],Ld=["januar","februar","marts","april","maj","juni","juli","august","september","oktober","november","december"],Qa=e=>Ha[(e.getDay()+6)%7],Ya=e=>`${e.getDate()}. ${Ld[e.getMonth()]} ${e.getFullYear()}`,Ka=e=>{const t="0"+(e.getMonth()+1),n="0"+e.getDate();return e.getFullYear()+"-"+t.slice(-2)+"-"+n.slice(-2)},Z=e=>{const t=e.state[0].split(`
+`).length;if(e.multiline)return c("textarea",{value:e.state[0],onChange:l=>e.state[1](l.target.value),placeholder:e.placeholder,style:{font:"inherit",flex:"1 0 auto"},rows:t});const n=e.onCancel==null?void 0:l=>{l.code==="Escape"&&e.onCancel!=null&&e.onCancel()},r=l=>{l.code==="Enter"&&(l.preventDefault(),e.save())};return c("input",{value:e.state[0],onChange:l=>e.state[1](l.target.value),onKeyPress:r,onKeyDown:n,placeholder:e.placeholder,style:{flex:"1 0 auto",...e.style||{}},className:e.className,ref:e.inputRef})},Zr=({value:e,onSave:t,onCancel:n,style:r,className:l,inputRef:o})=>{const i=k.useState(e),u=e!==i[0];return c(Z,{state:i,save:()=>t(i[0]),onCancel:n,style:{...r,background:u?"white":"transparent"},className:l,inputRef:o})},Ga=e=>{const t=e.map(l=>k.useState(l)),n=t.some(([l],o)=>l!==e[o]),r=t.map(([l])=>l);return[n,r,t]},xi=e=>{const[t,n]=k.useState(null),[r,l]=k.useState(null);return{onDragLeave:o=>i=>n(u=>u===o?null:u),onDragEnter:o=>i=>n(o),onDragOver:o=>i=>{r!=null&&i.preventDefault()},onDrop:o=>i=>{r==null||t!==o||(i.preventDefault(),e(r,t))},isDragging:o=>r!=null&&t===o,onDragStart:o=>i=>l(o),onDragEnd:o=>i=>l(u=>u===o?null:u)}},Di=(e,t,n)=>{if(t===n||t+1===n)return e;const r=[...e];return r.splice(t,1),r.splice(n<t?n:n-1,0,e[t]),r},Xa=k.createContext({}),Za=k.createContext(e=>e(async t=>{})),Od=e=>{const[t,n]=k.useState(""),[r,l]=k.useState(0),[o,i]=k.useState(!0),[u,s]=k.useState(!1),a=k.useRef(null);k.useLayoutEffect(()=>{a.current&&a.current.focus()},[]);const g=w=>{n(w),l(0)},S=t.trim().toLowerCase(),p=k.useMemo(()=>e.options.filter(({label:w})=>S===""||w.toLowerCase().indexOf(S)>=0),[S]),m=k.useCallback(w=>{w==="Enter"&&p.length>r?e.onSubmit(p[r].value):w==="Escape"?e.onCancel():w==="ArrowDown"?l(E=>Math.min(E+1,p.length-1)):w==="ArrowUp"&&l(E=>Math.max(0,E-1))},[S,r]);return c($,{children:N("div",{style:{display:"inline-block"},children:[c("input",{style:{display:"block"},ref:a,value:t,onKeyDown:w=>m(w.code),onChange:w=>g(w.target.value),onFocus:()=>i(!0),onBlur:()=>i(!1)}),(o||u)&&c("ul",{onMouseEnter:()=>s(!0),onMouseLeave:()=>s(!1),style:{position:"absolute",background:"white",border:"1px solid black",overflow:"auto",width:"200px",height:"200px"},children:p.map(({value:w,label:E},f)=>c("li",{children:c("a",{href:"#",onClick:d=>{d.preventDefault(),e.onSubmit(w)},style:{fontWeight:f===r?"bold":void 0},children:E})},w))})]})})},Md=e=>{const{row:t}=e,[n,r]=k.useState("hidden"),l=k.useContext(Za),o=S=>l(async p=>{const m={workers:S.map(({id:E})=>({id:E})),version:t.version},w=await nt(`/api/v0/shift/${t.date}/${t.slug}/`,m);return p(w.ok||w.status===409),w}),i=xi((S,p)=>{const m=Di(t.workers,S,p);m!==t.workers&&o(m)}),u=async S=>{r("loading");const p=await o([...t.workers,S]);p.ok||console.log(`HTTP ${p.status} when adding worker`),r("show")},s=async S=>{const p=t.workers.slice();p.splice(S,1);const m=await o(p);m.ok||console.log(`HTTP ${m.status} when adding worker`)},a={};for(const S of t.workers)a[S.id+""]=!0;const g={};for(const{id:S,comment:p}of t.comments||[])g[S]=p;return N("div",{className:"sp_shift",children:[c("h2",{children:t.name}),e.showTimes&&N($,{children:[N("p",{children:["Tilmelding åbner: ",t.settings.registration_starts]}),N("p",{children:["Tilmelding lukker: ",t.settings.registration_deadline]})]}),N("ol",{children:[t.workers.map(({id:S,name:p},m)=>N("li",{style:i.isDragging(m)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:i.onDragLeave(m),onDragEnter:i.onDragEnter(m),onDragOver:i.onDragOver(m),onDrop:i.onDrop(m),children:[c("span",{draggable:!0,onDragStart:i.onDragStart(m),onDragEnd:i.onDragEnd(m),children:p})," ",c("a",{href:"#",onClick:w=>{w.preventDefault(),s(m)},children:"×"}),g[S]&&N($,{children:[" ",c("span",{style:{fontStyle:"italic"},children:g[S]})]})]},m)),c("li",{style:{listStyle:"none",...i.isDragging(t.workers.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:i.onDragLeave(t.workers.length),onDragEnter:i.onDragEnter(t.workers.length),onDragOver:i.onDragOver(t.workers.length),onDrop:i.onDrop(t.workers.length),children:n==="hidden"?c("a",{href:"#",onClick:S=>{S.preventDefault(),r("show")},children:"Tilføj"}):c(Xa.Consumer,{children:S=>c(Od,{options:Object.entries(S).filter(([p,m])=>m.active&&!(p+""in a)).map(([p,m])=>({value:p+"",label:m.name})),onCancel:()=>r("hidden"),onSubmit:p=>u(S[p])},t.workers.length+"add")})})]})]})},Rd=e=>{const{date:t,rows:n}=e,r=Ci(t);return N("div",{className:"sp_weekday_shifts",children:[N("h1",{children:[c("div",{className:"sp_the_weekday",children:Qa(r)}),c("div",{className:"sp_the_fulldate",children:Ya(r)})]}),n.map(l=>c(Md,{row:l,showTimes:e.showTimes},l.order))]})};function Qu(e){for(const t of e)if(t!==e[0])return!1;return!0}const jd=e=>{const{data:t}=e,n={};for(const l of t)(n[l.date]||(n[l.date]=[])).push(l);const r=Qu(t.map(l=>l.settings.registration_starts))&&Qu(t.map(l=>l.settings.registration_deadline));return N($,{children:[N("div",{children:[r&&t.length>0&&N($,{children:["Tilmelding åbner: ",t[0].settings.registration_starts," ","Tilmelding lukker: ",t[0].settings.registration_deadline," "]}),c("a",{href:"print/",children:"Print"})]}),c("div",{className:"sp_days",children:Object.entries(n).map(([l,o])=>c(Rd,{date:l,rows:o,showTimes:!r},l))})]})};function Id(e){k.useEffect(()=>{const t=n=>{if(n.target.tagName!=="INPUT"){if(n.code in e)e[n.code]();else return;n.preventDefault()}};return window.addEventListener("keypress",t,!1),()=>window.removeEventListener("keypress",t,!1)})}const zd=()=>{const[e,t]=rt(),[n,r]=k.useState(!1);return k.useEffect(()=>{t(window.fetch("/api/v0/workplace/")).then(()=>r(!0))},[]),console.log({workplaceJson:e}),e==null?null:e.rows[0].settings},Fd=e=>{const[t,n]=k.useState(!1),[r,l]=rt();return k.useEffect(()=>{e&&l(window.fetch("/api/v0/shift_delete/")).then(()=>n(!0))},[e]),r},$d=e=>{const t=zd(),n=t==null?void 0:t.retain_weeks,r=n!=null,l=Fd(r);return console.log({workplaceSettings:t,retain:n,workerShiftDataDeleteStatus:l}),n==null||l==null?c("div",{}):l.shifts+l.comments===0?N("div",{children:["Persondata: Gemmer ingen vagtbookinger ældre end ",n," uger"]}):N("div",{children:["Persondata:"," ","Gemmer pt. ",l.shifts," vagter"," ","og ",l.comments," noter"," ","ældre end ",n," uger"," ","(mellem uge ",l.earliest," ","og uge ",l.latest,")."," ",c("button",{onClick:()=>nt("/api/v0/shift_delete/",l),children:"Slet gamle vagtbookinger nu"})]})},Ud=e=>{const[t,n]=k.useState(""),[r,l]=k.useState(0),[o,i]=k.useState(!1),[u,s]=k.useState({week:0,year:0,refreshCount:r}),[a,g]=k.useState({week:e.week||1,year:e.year||2022,relative:0}),S=!o&&u.week===a.week+a.relative&&u.year===a.year&&u.refreshCount===r,{week:p,year:m,relative:w}=a,E=k.useRef([]),f=k.useRef({}),d=k.useRef({}),h=k.useRef({loadCount:0,workers:{}});k.useEffect(()=>{(async()=>{const x=await(await window.fetch("/api/v0/worker/")).json();for(const j of x.rows)h.current.workers[j.id+""]=j;h.current.loadCount+=1})()},[]);const v=k.useCallback(async(P,x)=>{const j=await window.fetch(`/api/v0/shift/?week=${P}w${x}`);if(!j.ok)return{ok:!1,status:j.status};const ne=await j.json();return console.log({next:ne.next,prev:ne.prev}),f.current[`${P}w${x}`]=ne.next,d.current[`${P}w${x}`]=ne.prev,{ok:!0,status:j.status,rows:ne.rows}},[]);k.useEffect(()=>{if(S)return;let P=!1;return(async()=>{let x=p,j=m,ne=w,B=null;for(;ne!==0;){if(P)return;if(!f.current[`${j}w${x}`]){const F=await v(j,x);if(!F.ok){n(`HTTP ${F.status}`);return}B=F.rows}ne>0?([j,x]=f.current[`${j}w${x}`].split("w").map(F=>parseInt(F)),ne-=1):([j,x]=d.current[`${j}w${x}`].split("w").map(F=>parseInt(F)),ne+=1)}if(B==null){if(P)return;const F=await v(j,x);if(!F.ok){n(`HTTP ${F.status}`);return}B=F.rows}E.current.splice(0,E.current.length,...B),s({week:x,year:j,refreshCount:r}),window.history.replaceState({},document.title,`/admin/s/${j}w${x}/`),g({week:x,year:j,relative:0})})(),()=>{P=!0}},[p,m,w,r]);const y=k.useCallback(()=>{g(({week:P,year:x,relative:j})=>({week:P,year:x,relative:j-1}))},[]),L=k.useCallback(()=>{g(({week:P,year:x,relative:j})=>({week:P,year:x,relative:j+1}))},[]),C=k.useCallback(async P=>(i(!0),await P(async x=>{x&&l(j=>j+1),i(!1)})),[]);Id({KeyJ:L,KeyK:y});const O=!kd(S,500);return N(Xa.Provider,{value:h.current.workers,children:[c(tn,{current:"schedule"}),t!==""&&c("div",{className:"sp_error",children:t}),N("div",{className:"sp_weekheader",children:[c("div",{className:"sp_prev",children:c("a",{href:"#",onClick:P=>{P.preventDefault(),y()},children:"←"})}),N("div",{className:"sp_weekdisplay",children:["Uge ",p,", ",m]}),c("div",{className:"sp_next",children:c("a",{href:"#",onClick:P=>{P.preventDefault(),L()},children:"→"})})]}),c($d,{}),c("div",{style:{opacity:O?.7:void 0},children:c(Za.Provider,{value:C,children:c(jd,{data:E.current})})})]})},Ce=e=>N("div",{className:"sp_EditRow",children:[c("div",{children:e.title}),N("div",{children:[c("div",{children:e.children}),c("div",{children:e.help})]})]}),Yu=e=>[(e[0]??"")+"",t=>{t===""?e[1](void 0):isNaN(+t)||e[1](+t)}],Wd=e=>{const t=e.workplace.settings,[n,r]=k.useState(""),[l,o,[i,u,s,a,g,S,p,m,w]]=Ga([t.default_view_day||"",t.message_of_the_day||"",t.print_header_text||"",t.max_print_per_shift,t.login_email_template||"",t.login_email_subject||"",t.login_sms_template||"",t.country_code||"",t.retain_weeks]),E=!0;k.useEffect(()=>{!l&&E&&r("")},[n,l,E]);const f=k.useCallback(async()=>{if(!l){r("");return}const[v,y,L,C,O,P,x,j,ne]=o,B=await e.save({...e.workplace,settings:{default_view_day:v,message_of_the_day:y,print_header_text:L,max_print_per_shift:C,login_email_template:O,login_email_subject:P,login_sms_template:x,country_code:j,retain_weeks:ne}});B.ok?r(""):typeof B.error=="string"?r(B.error):r(`Fejl fra serveren: ${JSON.stringify(B)}`)},[l,E,a,...o]),d=Yu(a),h=Yu(w);return N("div",{children:[N(Ce,{title:"",help:"",children:[c("button",{className:"sp_settings_save",disabled:!l,onClick:()=>f(),children:"Gem"}),n&&c("div",{style:{marginLeft:"10px",color:"red",fontWeight:"bold"},children:n})]}),c(Ce,{title:"Standard ugevisning",help:`Antal dage ud i fremtiden for den uge der skal vises.
+			'9d'=Vis næste uge, undtaget lørdag og søndag hvor der skal vises ugen efter.`,children:c(Z,{state:i,save:f})}),c(Ce,{title:"Besked til alle",help:"Vis en besked til alle øverst på hver side",children:c(Z,{state:u,save:f})}),c("h2",{children:"Printvisning"}),c(Ce,{title:"Maks antal vagttagere",help:"Maks antal vagttagere der skal vises pr. vagt i printvisning.",children:c(Z,{state:d,save:f})}),c(Ce,{title:"Tekst",help:"Tekst der skal stå øverst på den printede vagtplan.",children:c(Z,{multiline:!0,state:s,save:f})}),c("h2",{children:"Vagttagere"}),c(Ce,{title:"Email-emne",help:"Standard emnefelt når man ønsker at sende login-link til vagttagere.",children:c(Z,{state:S,save:f})}),c(Ce,{title:"Email-tekst",help:"Standard-tekst når man ønsker at sende login-link til vagttagere.",children:c(Z,{multiline:!0,state:g,save:f})}),c(Ce,{title:"SMS-tekst",help:"Standard-tekst når man ønsker at sende login-link på SMS til vagttagere.",children:c(Z,{multiline:!0,state:p,save:f})}),c(Ce,{title:"Landekode",help:"Standard-landekode (f.eks. +45) når der skal sendes SMS til vagttagere.",children:c(Z,{state:m,save:f})}),c("h2",{children:"Sletning af persondata"}),c(Ce,{title:"Slet data efter (uger)",help:"Slet gamle vagtbookinger efter dette antal uger.",children:c(Z,{state:h,save:f})})]})},Vd=e=>{const[t,n]=k.useState(0),r=k.useRef({});k.useEffect(()=>{(async()=>{const i=await(await window.fetch("/api/v0/workplace/")).json();for(const u of i.rows)r.current[u.id+""]=u;n(u=>u+1)})()},[]);const l=k.useCallback(async o=>{const i=await nt("/api/v0/workplace/",o);return i.status===400?await i.json():i.ok?(r.current[o.id]={...r.current[o.id],settings:{...r.current[o.id].settings,...o.settings}},n(u=>u+1),await i.json()):{error:`HTTP ${i.status}`}},[]);return N($,{children:[c(tn,{current:"settings"}),t?c(Wd,{save:l,workplace:[...Object.values(r.current)][0]}):c("div",{children:"Indlæser..."})]})};function Ja(){const[e,t]=k.useState(null);return k.useEffect(()=>{fetch("/api/v0/worker_stats/").then(n=>n.json()).then(n=>t(n.workers))},[]),e}function Wsb(e,t){const[n,r]=k.useState(null);return k.useEffect(()=>{let l=!0;r(null);const o=new URLSearchParams({granularity:e,active:"1"});return t!=null&&o.set("fromdate",t),fetch("/api/v0/worker_stats/?"+o).then(i=>i.json()).then(i=>l&&r(i.workers)),()=>{l=!1}},[e,t]),n}const Gu=e=>Object.entries(e).map(([t,n])=>`${window.encodeURIComponent(t)}=${window.encodeURIComponent(n)}`).join("&"),Xu=e=>{const t={æ:"ae",Æ:"AE",ø:"oe",Ø:"OE",å:"aa",Å:"AA",ä:"ae",Ä:"AE",ö:"oe",Ö:"OE",ü:"ue",Ü:"UE"};return e.replace(new RegExp(Object.keys(t).join("|"),"g"),n=>t[n])},qa=e=>e===null?"... bookinger":e===void 0||e.last==null?"0 bookinger":`${e.count} bookinger, seneste i uge ${e.last.isoweek} ${e.last.isoyear}`,Ad=e=>{const t=e.worker,n=e.settings,r=t.phone||"",l=t.login_secret||"";if(r==="")return c($,{children:"(intet telefonnummer)"});if(l==="")return c($,{children:"(intet kodeord)"});const o=`${location.origin}/login/#`+new URLSearchParams({phone:r,password:l}),i=Xu(n.login_email_subject||""),u={name:t.name,link:o},s=Xu((n.login_email_template||"").replace(/\{(name|link)\}/g,(w,E)=>u[E])),a=(n.login_sms_template||"").replace(/\{(name|link)\}/g,(w,E)=>u[E]),g=`mailto:${window.encodeURIComponent(t.email||"")}?${Gu({subject:i,body:s})}`,p=`sms:${r.startsWith("+")||r.startsWith("0")?"":n.country_code||""}${r}?${Gu({body:a})}`,m=`/myshifts/?wid=${t.id}`;return N($,{children:[r===""?c("button",{disabled:!0,children:"Login kræver telefonnummer"}):l===""?c("button",{disabled:!0,children:"(kodeord mangler??)"}):c("button",{onClick:()=>{navigator.clipboard.writeText(o).catch(()=>window.prompt("Login-link",o))},children:"Kopiér login-link"})," · ",c("a",{href:g,target:"_blank",children:"Send email med login-link"}),e.settings.enable_sms&&N($,{children:[" · ",c("a",{href:p,target:"_blank",children:"Send SMS med login-link"})]})," · ",c("a",{href:m,target:"_blank",children:qa(e.stats)})]})},Zu=e=>{const t=e.worker,[n,r,[l,o,i,u,s]]=Ga([t.name,t.phone||"",t.email||"",t.note,t.active+""]),a=k.useCallback(async()=>{if(!n)return;const[g,S,p,m,w]=r;e.save({...e.worker,name:g,phone:S,email:p,note:m,active:w==="true"})},[n,...r]);return N("tr",{children:[c("td",{children:c(Z,{placeholder:"Navn",state:l,save:a})}),c("td",{children:c(Z,{placeholder:"Telefon",state:o,save:a})}),c(Kt.Consumer,{children:g=>g.enable_worker_email&&c("td",{children:c(Z,{placeholder:"Email",state:i,save:a})})}),c("td",{children:c(Z,{placeholder:"Note",state:u,save:a})}),c("td",{children:c("input",{type:"checkbox",checked:s[0]==="true",onChange:g=>s[1](g.target.checked+"")})}),c("td",{children:c("input",{type:"button",value:"Gem",onClick:()=>a(),disabled:!n})}),c("td",{children:c(Kt.Consumer,{children:g=>c(Ad,{worker:e.worker,settings:g,stats:e.stats})})})]})},Bd=e=>{const t=e.split(`
 `).map(g=>g.trimEnd()).filter(g=>g!=="").map(g=>g.split("	").map(S=>S.trim())),[n,r,...l]=t[0],o=[];let i=0;const u={},s={},a=[];for(const g of t.slice(1,t.length)){const[S,p,...m]=g;if(!S||!p){i+=1;continue}u[S]&&a.push(`Navn gentaget: '${S}'`),s[p]&&a.push(`Telefon gentaget: '${p}'`),u[S]=1,s[p]=1;const w=l.filter((E,f)=>m[f]).join(", ");o.push({name:S,phone:p,email:"",note:w})}return a.length>0?{errors:a}:i>0?{errors:[`${i} række(r) uden telefonnummer`]}:{workers:o,errors:null}},Hd=async(e,t)=>{const n={},r={},l={},o=[];for(const u of e)n[u.name]=1,u.phone&&(r[u.phone]=1),u.email&&(l[u.email]=1);for(const{name:u,phone:s,email:a}of t){if(u===""){o.push("Vagttager mangler navn");continue}n[u]&&o.push(`Navn findes allerede: '${u}'`),s!==""&&r[s]&&o.push(`Telefonnummer findes allerede: '${s}'`),a!==""&&l[a]&&o.push(`Emailadresse findes allerede: '${a}'`)}if(o.length>0)return{errors:o};if(t.length===0)return{errors:["Blank"]};const i=await nt("/api/v0/worker/",t);if(i.status===400){const u=await i.json();if(typeof u.error=="string")return{errors:[u.error]}}return i.ok?(await i.json(),{ok:!0,errors:null}):{errors:[`Serverfejl: HTTP ${i.status}`]}},Qd=e=>{const[t,n]=k.useState(""),[r,l]=k.useState([]),o=k.useCallback(()=>{const i=Bd(t);if(i.errors){l(i.errors);return}e.onSubmit(i.workers)},[t]);return N($,{children:[c("div",{children:c("textarea",{className:"sp_import_textarea",value:t,onChange:i=>n(i.target.value)})}),c("div",{children:c("button",{onClick:()=>o(),children:"Importér"})}),r.length>0&&c("ul",{className:"sp_error",children:r.map((i,u)=>c("li",{children:i},u))})]})},Yd=e=>{const[t,n]=k.useState([{name:"",phone:"",email:"",note:""}]),[r,l]=k.useState([]),o=k.useCallback(async()=>{const s=t.filter(g=>g.name!==""),a=await Hd(Object.values(e.workers),s);if(a.errors){l(a.errors);return}l([]),e.reload()},[e.workers,t]),[i,u]=k.useState(!1);return N("div",{children:[c("h2",{children:"Opret nye vagttagere"}),i?c($,{children:c(Qd,{onSubmit:s=>{n(s),u(!1)}})}):N($,{children:[c("div",{children:c("button",{onClick:()=>o(),children:"Opret vagttagere"})}),c("table",{children:c("tbody",{children:t.map((s,a)=>{const g=S=>{const p=a===t.length-1?[{name:"",phone:"",email:"",note:""}]:t.slice(a+1);n([...t.slice(0,a),S,...p])};return N("tr",{children:[c("td",{children:c(Z,{state:[s.name,S=>g({...t[a],name:S})],save:()=>{},placeholder:"Navn"})}),c("td",{children:c(Z,{state:[s.phone,S=>g({...t[a],phone:S})],save:()=>{},placeholder:"Telefon"})}),c(Kt.Consumer,{children:S=>S.enable_worker_email&&c("td",{children:c(Z,{state:[s.email,p=>g({...t[a],email:p})],save:()=>{},placeholder:"Email"})})}),c("td",{children:c(Z,{state:[s.note,S=>g({...t[a],note:S})],save:()=>{},placeholder:"Note"})})]},a)})})}),c("div",{children:c("a",{href:"#",onClick:s=>{s.preventDefault(),u(!0)},children:"Importér fra regneark"})})]}),r.length>0&&c("ul",{className:"sp_error",children:r.map((s,a)=>c("li",{children:s},a))})]})},Kd=e=>{if(e==null)return null;const t=(n,r)=>n.isoyear!==r.isoyear?n.isoyear<r.isoyear:n.isoweek<r.isoweek;return new Map(e.map(({stats:n,...r})=>[r.id,{count:n.reduce((l,o)=>l+o.count,0),last:n.length===0?null:n.reduce((l,o)=>t(l,o)?o:l)}]))},ba=e=>{const[t,n]=k.useState(""),r=[];for(const o of Object.values(e))`${o.name}
 ${o.note}
 ${o.phone}
-${o.email}`.indexOf(t)!==-1&&r.push(o);return r.sort((o,i)=>o.name.localeCompare(i.name)),[r,c("div",{children:c("input",{value:t,onChange:o=>n(o.target.value),placeholder:"Søg"})})]},Gd=e=>{const t=`SelectWorkerForDeletion${e.worker.id}`;return N("tr",{children:[c("td",{children:c("input",{id:t,type:"checkbox",checked:e.selected,onChange:n=>e.setSelected(e.worker,n.target.checked)})}),c("td",{children:c("label",{htmlFor:t,children:e.worker.name})}),c("td",{children:qa(e.workerStat)})]})},Xd=e=>{const[t,n]=k.useState({}),r=k.useCallback((s,a)=>n(g=>({...g,[s.id+""]:a})),[]),[l,o]=ba(Object.values(e.workers).filter(s=>!s.active)),i=l.filter(s=>t[s.id+""]),u=ec(e.workerStats);return N($,{children:[o,N("h2",{children:["Slet inaktive vagttagere (",e.loaded?l.length:"...",")"]}),c("p",{children:c("a",{href:"#",onClick:s=>{s.preventDefault(),e.goBack()},children:"Gå tilbage"})}),c("table",{children:c("tbody",{children:l.map(s=>c(Gd,{worker:s,workerStat:u(s),selected:!!t[s.id+""],setSelected:r},s.id))})}),c("p",{children:N("button",{disabled:i.length===0,onClick:s=>{s.preventDefault(),e.deleteWorkers(i)},children:["Slet ",i.length," inaktive vagttagere"]})})]})},ec=e=>{const t=k.useMemo(()=>Kd(e),[e]);return n=>t==null?null:t.get(n.id)},Zd=e=>{const[t,n]=ba(Object.values(e.workers)),r=ec(e.workerStats),l=t.filter(i=>i.active),o=t.filter(i=>!i.active);return N($,{children:[n,N("h2",{children:["Vagttagere (",e.loaded?l.length:"...",")"]}),c("div",{children:c("a",{href:"/admin/worker_stats/",children:"Vis opgørelse over bookinger"})}),c("table",{children:c("tbody",{children:l.map(i=>c(Zu,{worker:i,save:e.save,stats:r(i)},i.id))})}),N("h2",{children:["Inaktive (",e.loaded?o.length:"...",")"]}),c("p",{children:c("a",{href:"#",onClick:i=>{i.preventDefault(),e.goToDelete()},children:"Gå til sletning af vagttagere..."})}),c("table",{children:c("tbody",{children:o.map(i=>c(Zu,{worker:i,save:e.save,stats:r(i)},i.id))})})]})},Jd=e=>{const[t,n]=Xn(),[r,l]=rt(),o=k.useCallback(()=>n(()=>l(window.fetch("/api/v0/worker/"))),[]),i=Ba(r),[u,s]=rt(),a=u==null||!u.rows?{}:u.rows[0].settings;k.useEffect(()=>{o(),n(()=>s(window.fetch("/api/v0/workplace/")))},[]);const g=k.useCallback(async f=>{n(async()=>{(await nt(`/api/v0/worker/${f.id}/`,f)).ok&&(i[f.id+""]={...i[f.id+""],...f})})},[]),S=k.useCallback(async f=>{n(async()=>{if((await nt("/api/v0/worker_delete/",{workers:f})).ok)for(const h of f)delete i[h.id+""]})},[]),p=Ja(),[m,w]=k.useState("edit"),E=f=>{w(f),window.scrollTo(0,0)};return N($,{children:[c(tn,{current:"workers"}),c("div",{children:c(Kt.Provider,{value:a,children:m==="delete"?c(Xd,{loaded:t,workers:i,workerStats:p,deleteWorkers:S,goBack:()=>E("edit")}):N($,{children:[c(Zd,{loaded:t,workers:i,save:g,workerStats:p,goToDelete:()=>E("delete")}),c(Yd,{reload:o,workers:i})]})})})]})};function Ju(e){const t="00"+e;return t.substring(t.length-2)}const qd=(e,t)=>Ku(e==="month"?n=>`${n.year}-${Ju(n.month)}`:n=>`${n.isoyear}w${Ju(n.isoweek)}`,t);function bd(){const[e,t]=k.useState("month"),r=c("select",{onChange:l=>t(l.target.value),value:e,children:[["month","Måned"],["week","Uge"]].map(([l,o])=>c("option",{value:l,children:o},l))});return[e,r]}const ep=e=>{const[t,n]=bd(),r=e.data.map(i=>({...i,agg:Object.fromEntries(qd(t,i.stats).map(({name:u,count:s})=>[u,s]))})),l={};for(const{agg:i}of r)for(const u of Object.keys(i))l[u]=!0;const o=[...Object.keys(l)];return o.sort(),N("div",{children:[c("div",{children:n}),N("table",{className:"sp_worker_stats",cellSpacing:0,children:[c("thead",{children:N("tr",{children:[c("th",{children:"Navn"}),o.map(i=>c("th",{children:i},i))]})}),c("tbody",{children:r.map(({id:i,name:u,agg:s})=>N("tr",{children:[c("th",{children:u}),o.map(a=>c("td",{children:s[a]},a))]},i))})]})]})},tp=e=>{const t=Ja();return N($,{children:[c(tn,{current:"worker_stats"}),t==null?c($,{children:"Indlæser..."}):c(ep,{data:t.filter(n=>n.active)})]})},tc=({children:e})=>c("div",{style:{background:"rgba(255,255,255,0.5)",border:"1px solid #666",display:"flex",flexDirection:"row",margin:"10px"},children:e}),nc=({children:e,faded:t})=>c("div",{style:{flex:"0 1 200px",opacity:t?.7:void 0},children:e}),rc=e=>{k.useEffect(()=>{if(!e)return()=>{};const t=n=>{n.preventDefault()};return window.addEventListener("beforeunload",t),()=>{window.removeEventListener("beforeunload",t)}},[e])},np=({day:e,dayName:t,value:n,onSave:r})=>{const l=xi((s,a)=>{const g=Di(n.shifts,s,a);console.log({old:n.shifts,i:s,j:a,newShifts:g}),n.shifts!==g&&r(e,{...n,shifts:g})}),[o,i]=k.useState(null),u=k.useRef(null);return k.useLayoutEffect(()=>{o!=null&&u.current!=null&&u.current.focus()},[o]),c(nc,{children:N("ul",{children:[c("li",{style:{listStyleType:"none"},children:c("b",{children:t})}),n.shifts.map((s,a)=>c("li",{style:l.isDragging(a)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:l.onDragLeave(a),onDragEnter:l.onDragEnter(a),onDragOver:l.onDragOver(a),onDrop:l.onDrop(a),children:o===a?c(Zr,{value:s,onSave:async g=>{await r(e,{...n,shifts:[...n.shifts.slice(0,a),g,...n.shifts.slice(a+1)]}),i(null)},onCancel:()=>i(null),inputRef:u}):N($,{children:[c("span",{draggable:o==null?"true":void 0,onDragStart:l.onDragStart(a),onDragEnd:l.onDragEnd(a),onDoubleClick:()=>i(a),children:s})," ",c("a",{href:"#",onClick:g=>{g.preventDefault(),i(null),r(e,{...n,shifts:[...n.shifts.slice(0,a),...n.shifts.slice(a+1)]})},children:"×"})]})},a)),c("li",{style:{listStyleType:"none",...l.isDragging(n.shifts.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:l.onDragLeave(n.shifts.length),onDragEnter:l.onDragEnter(n.shifts.length),onDragOver:l.onDragOver(n.shifts.length),onDrop:l.onDrop(n.shifts.length),children:o===n.shifts.length?c(Zr,{value:"",onSave:async s=>{s&&await r(e,{...n,shifts:[...n.shifts,s]}),i(null)},onCancel:()=>i(null),inputRef:u}):c("a",{href:"#",onClick:s=>{s.preventDefault(),i(n.shifts.length)},children:"Tilføj"})})]})})},rp=({value:e,save:t})=>{const n=e.weekday_defaults||{},r=k.useCallback((l,o)=>t({...e,weekday_defaults:{...n,[l]:o}}),[e]);return c(tc,{children:Aa.map((l,o)=>{const i=n[l];if(i!=null)return c(np,{day:l,dayName:Ha[o],value:i,onSave:r},l)})})},lp=({outer:e,save:t})=>{const[[n,r,l],o]=k.useState([e,!1,!1]);k.useEffect(()=>{!r&&!l&&o([e,r,l])},[e,r,l]);const i=k.useCallback(async s=>{l||o([s,!0,!1])},[l]),u=k.useCallback(async()=>{l||(o([n,!0,!0]),await t(n),o([n,!1,!1]))},[n,l]);return rc(l||r),N($,{children:[c("input",{type:"button",value:l?"Gemmer...":"Gem standardopsætning",disabled:l||!r,onClick:()=>u()}),c(rp,{value:n,save:i})]})},op=({date:e,shifts:t,onSave:n,materialized:r,onMaterialize:l})=>{const o=Ci(e),i=xi((p,m)=>{const w=Di(t,p,m);console.log({old:t,i:p,j:m,newShifts:w}),t!==w&&n(e,w)}),[u,s]=k.useState(null),a=k.useRef(null);k.useLayoutEffect(()=>{u!=null&&a.current!=null&&a.current.focus()},[u]);const g=k.useContext(Kt).weekday_defaults||{},S=Aa[(o.getDay()+6)%7];return((g[S]||{}).shifts||[]).length,c(nc,{faded:!r,children:N("ul",{children:[c("li",{style:{listStyleType:"none"},children:c("b",{children:Qa(o)+(r?"":" (standard)")})}),c("li",{style:{listStyleType:"none"},children:c("b",{children:Ya(o)})}),t.map((p,m)=>c("li",{style:i.isDragging(m)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:i.onDragLeave(m),onDragEnter:i.onDragEnter(m),onDragOver:i.onDragOver(m),onDrop:i.onDrop(m),children:u===m?c(Zr,{value:p.name,onSave:async w=>{await n(e,[...t.slice(0,m),{...p,name:w},...t.slice(m+1)]),s(null)},onCancel:()=>s(null),inputRef:a}):N($,{children:[c("span",{draggable:r&&u==null?"true":void 0,onDragStart:r?i.onDragStart(m):void 0,onDragEnd:r?i.onDragEnd(m):void 0,onDoubleClick:r?()=>s(m):void 0,children:p.name}),p.workerCount==null||!r?" ":` (${p.workerCount} vagttagere) `,!p.workerCount&&r&&c("a",{href:"#",onClick:w=>{w.preventDefault(),s(null),n(e,[...t.slice(0,m),...t.slice(m+1)])},children:"×"})]})},m)),c("li",{style:{listStyleType:"none",...i.isDragging(t.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:i.onDragLeave(t.length),onDragEnter:i.onDragEnter(t.length),onDragOver:i.onDragOver(t.length),onDrop:i.onDrop(t.length),children:r?u===t.length?c(Zr,{value:"",onSave:async p=>{p&&await n(e,[...t,{id:null,name:p}]),s(null)},onCancel:()=>s(null),inputRef:a}):c("a",{href:"#",onClick:p=>{p.preventDefault(),s(t.length)},children:"Tilføj"}):c("a",{href:"#",onClick:p=>{p.preventDefault(),l(e)},children:"Redigér"})})]})})},ip=({days:e,...t})=>{const n=[];for(const r of e)n.push(c(op,{date:r.date,shifts:r.shifts,materialized:r.materialized,...t},r.date));return c(tc,{children:n})},lc=e=>{const t=new Date(e);return t.setDate(t.getDate()-(t.getDay()+6)%7),t},up=({shifts:e,onSave:t})=>{const[[n,r],l]=k.useState([{},!1]),i=Object.keys(n.modifiedDays||{}).length+(n.materializeDays||[]).length>0,u=k.useCallback(async(p,m)=>{l(([w,E])=>{if(E)return[w,E];const{modifiedDays:f={}}=w;return[{...w,modifiedDays:{...f,[p]:m}},E]})},[]),s=k.useCallback(()=>{l(([p,m])=>m?[p,!0]:(t(p).then(()=>l([{},!1])),[p,!0]))},[]),a=[];for(const p of e){const{id:m,name:w,workers:E,date:f}=p,d={id:m,name:w,workerCount:E.length},h=Ka(lc(Ci(f)));{const L=a[a.length-1];(L==null||L.monday!==h)&&a.push({monday:h,days:[]})}const v=a[a.length-1],y=v.days[v.days.length-1];if(y==null||y.date!==f){const L=n.materializeDays!=null&&n.materializeDays.includes(f);v.days.push({date:f,shifts:[],materialized:L})}m!=null&&(v.days[v.days.length-1].materialized=!0),v.days[v.days.length-1].shifts.push(d)}if(n.modifiedDays!=null)for(const p of a)for(let m=0;m<p.days.length;++m){const w=n.modifiedDays[p.days[m].date];w!=null&&(p.days[m].shifts=w)}const g=[],S=k.useCallback(p=>new Promise(m=>{l(([w,E])=>{const{materializeDays:f=[]}=w;return m(),E||f.includes(p)?[w,E]:[{...w,materializeDays:[...f,p]},E]})}),[]);for(const p of a)g.push(c(ip,{days:p.days,onSave:u,onMaterialize:S},p.monday));return rc(r||i),N("div",{children:[c("input",{type:"button",value:r?"Gemmer...":"Gem ændrede dage",disabled:r||!i,onClick:()=>s()}),g]})},sp=e=>{const[t]=k.useState(Ka(lc(new Date))),[n,r]=Xn(),[l,o]=Xn(),[i,u]=rt(),[s,a]=rt(),g=i==null||!i.rows?{}:i.rows[0].settings;k.useEffect(()=>{r(()=>u(window.fetch("/api/v0/workplace/"))),r(()=>a(window.fetch("/api/v0/shift/?fromdate="+t)))},[]);const S=k.useCallback(m=>new Promise(w=>{o(async()=>{i!=null&&(await nt("/api/v0/workplace/",{...i.rows[0],settings:m})).ok&&await u(window.fetch("/api/v0/workplace/")),w()})}),[i]),p=k.useCallback(m=>new Promise(w=>{o(async()=>{(await nt("/api/v0/shift/",m)).ok&&await a(window.fetch("/api/v0/shift/?fromdate="+t)),w()})}),[t]);return N($,{children:[c(tn,{current:"shifts"}),n?N("div",{children:[N("p",{children:[c("b",{children:"Træk og slip"})," for at ændre rækkefølgen af vagter."]}),N("p",{children:[c("b",{children:"Dobbeltklik"})," på en vagts navn for at ændre navnet."]}),c(lp,{outer:g,save:S}),c(Kt.Provider,{value:g,children:c(up,{shifts:(s||{}).rows||[],onSave:p})})]}):"Indlæser..."]})},ap=e=>{const{view:t}=e;switch(t){case"schedule":{const{week:n,year:r}=e;return c(Ud,{week:n,year:r})}case"workers":return c(Jd,{});case"settings":return c(Vd,{});case"workerStats":return c(tp,{});case"changelog":return c(Nd,{});case"shifts":return c(sp,{})}};$l.render(c(ap,{...window.shiftplannerOptions}),document.getElementById("shiftplanner_admin"));
+${o.email}`.indexOf(t)!==-1&&r.push(o);return r.sort((o,i)=>o.name.localeCompare(i.name)),[r,c("div",{children:c("input",{value:t,onChange:o=>n(o.target.value),placeholder:"Søg"})})]},Gd=e=>{const t=`SelectWorkerForDeletion${e.worker.id}`;return N("tr",{children:[c("td",{children:c("input",{id:t,type:"checkbox",checked:e.selected,onChange:n=>e.setSelected(e.worker,n.target.checked)})}),c("td",{children:c("label",{htmlFor:t,children:e.worker.name})}),c("td",{children:qa(e.workerStat)})]})},Xd=e=>{const[t,n]=k.useState({}),r=k.useCallback((s,a)=>n(g=>({...g,[s.id+""]:a})),[]),[l,o]=ba(Object.values(e.workers).filter(s=>!s.active)),i=l.filter(s=>t[s.id+""]),u=ec(e.workerStats);return N($,{children:[o,N("h2",{children:["Slet inaktive vagttagere (",e.loaded?l.length:"...",")"]}),c("p",{children:c("a",{href:"#",onClick:s=>{s.preventDefault(),e.goBack()},children:"Gå tilbage"})}),c("table",{children:c("tbody",{children:l.map(s=>c(Gd,{worker:s,workerStat:u(s),selected:!!t[s.id+""],setSelected:r},s.id))})}),c("p",{children:N("button",{disabled:i.length===0,onClick:s=>{s.preventDefault(),e.deleteWorkers(i)},children:["Slet ",i.length," inaktive vagttagere"]})})]})},ec=e=>{const t=k.useMemo(()=>Kd(e),[e]);return n=>t==null?null:t.get(n.id)},Zd=e=>{const[t,n]=ba(Object.values(e.workers)),r=ec(e.workerStats),l=t.filter(i=>i.active),o=t.filter(i=>!i.active);return N($,{children:[n,N("h2",{children:["Vagttagere (",e.loaded?l.length:"...",")"]}),c("div",{children:c("a",{href:"/admin/worker_stats/",children:"Vis opgørelse over bookinger"})}),c("table",{children:c("tbody",{children:l.map(i=>c(Zu,{worker:i,save:e.save,stats:r(i)},i.id))})}),N("h2",{children:["Inaktive (",e.loaded?o.length:"...",")"]}),c("p",{children:c("a",{href:"#",onClick:i=>{i.preventDefault(),e.goToDelete()},children:"Gå til sletning af vagttagere..."})}),c("table",{children:c("tbody",{children:o.map(i=>c(Zu,{worker:i,save:e.save,stats:r(i)},i.id))})})]})},Jd=e=>{const[t,n]=Xn(),[r,l]=rt(),o=k.useCallback(()=>n(()=>l(window.fetch("/api/v0/worker/"))),[]),i=Ba(r),[u,s]=rt(),a=u==null||!u.rows?{}:u.rows[0].settings;k.useEffect(()=>{o(),n(()=>s(window.fetch("/api/v0/workplace/")))},[]);const g=k.useCallback(async f=>{n(async()=>{(await nt(`/api/v0/worker/${f.id}/`,f)).ok&&(i[f.id+""]={...i[f.id+""],...f})})},[]),S=k.useCallback(async f=>{n(async()=>{if((await nt("/api/v0/worker_delete/",{workers:f})).ok)for(const h of f)delete i[h.id+""]})},[]),p=Ja(),[m,w]=k.useState("edit"),E=f=>{w(f),window.scrollTo(0,0)};return N($,{children:[c(tn,{current:"workers"}),c("div",{children:c(Kt.Provider,{value:a,children:m==="delete"?c(Xd,{loaded:t,workers:i,workerStats:p,deleteWorkers:S,goBack:()=>E("edit")}):N($,{children:[c(Zd,{loaded:t,workers:i,save:g,workerStats:p,goToDelete:()=>E("delete")}),c(Yd,{reload:o,workers:i})]})})})]})};function Wss(e,t){const[n,r]=k.useState(e),l=c("select",{onChange:o=>r(o.target.value),value:n,children:t.map(([o,i])=>c("option",{value:o,children:i},o))});return[n,l]}const Wsm=e=>{const t=new Date;t.setMonth(t.getMonth()-e);const n=r=>(r<10?"0":"")+r;return`${t.getFullYear()}-${n(t.getMonth()+1)}-${n(t.getDate())}`},ep=e=>{const t=e.data.map(i=>({...i,agg:Object.fromEntries(i.stats.map(({period:u,count:s})=>[u,s]))})),n={};for(const{agg:i}of t)for(const u of Object.keys(i))n[u]=!0;const r=[...Object.keys(n)];return r.sort(),N("table",{className:"sp_worker_stats",cellSpacing:0,children:[c("thead",{children:N("tr",{children:[c("th",{children:"Navn"}),r.map(i=>c("th",{children:i},i))]})}),c("tbody",{children:t.map(({id:i,name:u,agg:s})=>N("tr",{children:[c("th",{children:u}),r.map(a=>c("td",{children:s[a]},a))]},i))})]})},tp=e=>{const[t,n]=Wss("month",[["month","Måned"],["week","Uge"],["quarter","Kvartal"],["year","År"]]),[r,l]=Wss("12",[["3","Seneste 3 måneder"],["12","Seneste år"],["all","Alt"]]),o=k.useMemo(()=>r==="all"?null:Wsm(+r),[r]),i=Wsb(t,o);return N($,{children:[c(tn,{current:"worker_stats"}),N("div",{children:[n," ",l]}),i==null?c($,{children:"Indlæser..."}):c(ep,{data:i})]})},tc=({children:e})=>c("div",{style:{background:"rgba(255,255,255,0.5)",border:"1px solid #666",display:"flex",flexDirection:"row",margin:"10px"},children:e}),nc=({children:e,faded:t})=>c("div",{style:{flex:"0 1 200px",opacity:t?.7:void 0},children:e}),rc=e=>{k.useEffect(()=>{if(!e)return()=>{};const t=n=>{n.preventDefault()};return window.addEventListener("beforeunload",t),()=>{window.removeEventListener("beforeunload",t)}},[e])},np=({day:e,dayName:t,value:n,onSave:r})=>{const l=xi((s,a)=>{const g=Di(n.shifts,s,a);console.log({old:n.shifts,i:s,j:a,newShifts:g}),n.shifts!==g&&r(e,{...n,shifts:g})}),[o,i]=k.useState(null),u=k.useRef(null);return k.useLayoutEffect(()=>{o!=null&&u.current!=null&&u.current.focus()},[o]),c(nc,{children:N("ul",{children:[c("li",{style:{listStyleType:"none"},children:c("b",{children:t})}),n.shifts.map((s,a)=>c("li",{style:l.isDragging(a)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:l.onDragLeave(a),onDragEnter:l.onDragEnter(a),onDragOver:l.onDragOver(a),onDrop:l.onDrop(a),children:o===a?c(Zr,{value:s,onSave:async g=>{await r(e,{...n,shifts:[...n.shifts.slice(0,a),g,...n.shifts.slice(a+1)]}),i(null)},onCancel:()=>i(null),inputRef:u}):N($,{children:[c("span",{draggable:o==null?"true":void 0,onDragStart:l.onDragStart(a),onDragEnd:l.onDragEnd(a),onDoubleClick:()=>i(a),children:s})," ",c("a",{href:"#",onClick:g=>{g.preventDefault(),i(null),r(e,{...n,shifts:[...n.shifts.slice(0,a),...n.shifts.slice(a+1)]})},children:"×"})]})},a)),c("li",{style:{listStyleType:"none",...l.isDragging(n.shifts.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:l.onDragLeave(n.shifts.length),onDragEnter:l.onDragEnter(n.shifts.length),onDragOver:l.onDragOver(n.shifts.length),onDrop:l.onDrop(n.shifts.length),children:o===n.shifts.length?c(Zr,{value:"",onSave:async s=>{s&&await r(e,{...n,shifts:[...n.shifts,s]}),i(null)},onCancel:()=>i(null),inputRef:u}):c("a",{href:"#",onClick:s=>{s.preventDefault(),i(n.shifts.length)},children:"Tilføj"})})]})})},rp=({value:e,save:t})=>{const n=e.weekday_defaults||{},r=k.useCallback((l,o)=>t({...e,weekday_defaults:{...n,[l]:o}}),[e]);return c(tc,{children:Aa.map((l,o)=>{const i=n[l];if(i!=null)return c(np,{day:l,dayName:Ha[o],value:i,onSave:r},l)})})},lp=({outer:e,save:t})=>{const[[n,r,l],o]=k.useState([e,!1,!1]);k.useEffect(()=>{!r&&!l&&o([e,r,l])},[e,r,l]);const i=k.useCallback(async s=>{l||o([s,!0,!1])},[l]),u=k.useCallback(async()=>{l||(o([n,!0,!0]),await t(n),o([n,!1,!1]))},[n,l]);return rc(l||r),N($,{children:[c("input",{type:"button",value:l?"Gemmer...":"Gem standardopsætning",disabled:l||!r,onClick:()=>u()}),c(rp,{value:n,save:i})]})},op=({date:e,shifts:t,onSave:n,materialized:r,onMaterialize:l})=>{const o=Ci(e),i=xi((p,m)=>{const w=Di(t,p,m);console.log({old:t,i:p,j:m,newShifts:w}),t!==w&&n(e,w)}),[u,s]=k.useState(null),a=k.useRef(null);k.useLayoutEffect(()=>{u!=null&&a.current!=null&&a.current.focus()},[u]);const g=k.useContext(Kt).weekday_defaults||{},S=Aa[(o.getDay()+6)%7];return((g[S]||{}).shifts||[]).length,c(nc,{faded:!r,children:N("ul",{children:[c("li",{style:{listStyleType:"none"},children:c("b",{children:Qa(o)+(r?"":" (standard)")})}),c("li",{style:{listStyleType:"none"},children:c("b",{children:Ya(o)})}),t.map((p,m)=>c("li",{style:i.isDragging(m)?{borderTop:"3px solid green",marginTop:"-3px"}:{},onDragLeave:i.onDragLeave(m),onDragEnter:i.onDragEnter(m),onDragOver:i.onDragOver(m),onDrop:i.onDrop(m),children:u===m?c(Zr,{value:p.name,onSave:async w=>{await n(e,[...t.slice(0,m),{...p,name:w},...t.slice(m+1)]),s(null)},onCancel:()=>s(null),inputRef:a}):N($,{children:[c("span",{draggable:r&&u==null?"true":void 0,onDragStart:r?i.onDragStart(m):void 0,onDragEnd:r?i.onDragEnd(m):void 0,onDoubleClick:r?()=>s(m):void 0,children:p.name}),p.workerCount==null||!r?" ":` (${p.workerCount} vagttagere) `,!p.workerCount&&r&&c("a",{href:"#",onClick:w=>{w.preventDefault(),s(null),n(e,[...t.slice(0,m),...t.slice(m+1)])},children:"×"})]})},m)),c("li",{style:{listStyleType:"none",...i.isDragging(t.length)?{borderTop:"3px solid green",marginTop:"-3px"}:{}},onDragLeave:i.onDragLeave(t.length),onDragEnter:i.onDragEnter(t.length),onDragOver:i.onDragOver(t.length),onDrop:i.onDrop(t.length),children:r?u===t.length?c(Zr,{value:"",onSave:async p=>{p&&await n(e,[...t,{id:null,name:p}]),s(null)},onCancel:()=>s(null),inputRef:a}):c("a",{href:"#",onClick:p=>{p.preventDefault(),s(t.length)},children:"Tilføj"}):c("a",{href:"#",onClick:p=>{p.preventDefault(),l(e)},children:"Redigér"})})]})})},ip=({days:e,...t})=>{const n=[];for(const r of e)n.push(c(op,{date:r.date,shifts:r.shifts,materialized:r.materialized,...t},r.date));return c(tc,{children:n})},lc=e=>{const t=new Date(e);return t.setDate(t.getDate()-(t.getDay()+6)%7),t},up=({shifts:e,onSave:t})=>{const[[n,r],l]=k.useState([{},!1]),i=Object.keys(n.modifiedDays||{}).length+(n.materializeDays||[]).length>0,u=k.useCallback(async(p,m)=>{l(([w,E])=>{if(E)return[w,E];const{modifiedDays:f={}}=w;return[{...w,modifiedDays:{...f,[p]:m}},E]})},[]),s=k.useCallback(()=>{l(([p,m])=>m?[p,!0]:(t(p).then(()=>l([{},!1])),[p,!0]))},[]),a=[];for(const p of e){const{id:m,name:w,workers:E,date:f}=p,d={id:m,name:w,workerCount:E.length},h=Ka(lc(Ci(f)));{const L=a[a.length-1];(L==null||L.monday!==h)&&a.push({monday:h,days:[]})}const v=a[a.length-1],y=v.days[v.days.length-1];if(y==null||y.date!==f){const L=n.materializeDays!=null&&n.materializeDays.includes(f);v.days.push({date:f,shifts:[],materialized:L})}m!=null&&(v.days[v.days.length-1].materialized=!0),v.days[v.days.length-1].shifts.push(d)}if(n.modifiedDays!=null)for(const p of a)for(let m=0;m<p.days.length;++m){const w=n.modifiedDays[p.days[m].date];w!=null&&(p.days[m].shifts=w)}const g=[],S=k.useCallback(p=>new Promise(m=>{l(([w,E])=>{const{materializeDays:f=[]}=w;return m(),E||f.includes(p)?[w,E]:[{...w,materializeDays:[...f,p]},E]})}),[]);for(const p of a)g.push(c(ip,{days:p.days,onSave:u,onMaterialize:S},p.monday));return rc(r||i),N("div",{children:[c("input",{type:"button",value:r?"Gemmer...":"Gem ændrede dage",disabled:r||!i,onClick:()=>s()}),g]})},sp=e=>{const[t]=k.useState(Ka(lc(new Date))),[n,r]=Xn(),[l,o]=Xn(),[i,u]=rt(),[s,a]=rt(),g=i==null||!i.rows?{}:i.rows[0].settings;k.useEffect(()=>{r(()=>u(window.fetch("/api/v0/workplace/"))),r(()=>a(window.fetch("/api/v0/shift/?fromdate="+t)))},[]);const S=k.useCallback(m=>new Promise(w=>{o(async()=>{i!=null&&(await nt("/api/v0/workplace/",{...i.rows[0],settings:m})).ok&&await u(window.fetch("/api/v0/workplace/")),w()})}),[i]),p=k.useCallback(m=>new Promise(w=>{o(async()=>{(await nt("/api/v0/shift/",m)).ok&&await a(window.fetch("/api/v0/shift/?fromdate="+t)),w()})}),[t]);return N($,{children:[c(tn,{current:"shifts"}),n?N("div",{children:[N("p",{children:[c("b",{children:"Træk og slip"})," for at ændre rækkefølgen af vagter."]}),N("p",{children:[c("b",{children:"Dobbeltklik"})," på en vagts navn for at ændre navnet."]}),c(lp,{outer:g,save:S}),c(Kt.Provider,{value:g,children:c(up,{shifts:(s||{}).rows||[],onSave:p})})]}):"Indlæser..."]})},ap=e=>{const{view:t}=e;switch(t){case"schedule":{const{week:n,year:r}=e;return c(Ud,{week:n,year:r})}case"workers":return c(Jd,{});case"settings":return c(Vd,{});case"workerStats":return c(tp,{});case"changelog":return c(Nd,{});case"shifts":return c(sp,{})}};$l.render(c(ap,{...window.shiftplannerOptions}),document.getElementById("shiftplanner_admin"));
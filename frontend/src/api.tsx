@@ -23,21 +23,31 @@ export function useApiWorkerStats() {
     return data;
 }
 
-export interface AggregatedEntry {
-	name: string;
+export type Granularity = "week" | "month" | "quarter" | "year";
+
+export interface WorkerStatsPeriod {
+	period: string;
 	count: number;
 }
 
-export const aggregateEntriesBy = (fun: (entry: WorkerStatsEntry) => string, entries: WorkerStatsEntry[]) => {
-	const p: {[k: string]: AggregatedEntry} = {};
-	const res = [];
-	for (const entry of entries) {
-		const k = fun(entry);
-		if (!(k in p)) {
-			res.push({name: k, count: 0});
-			p[k] = res[res.length-1];
-		}
-		p[k].count += entry.count;
-	}
-	return res;
-};
+export interface WorkerStatsPeriodRow {
+	id: number;
+	name: string;
+	active: boolean;
+	stats: WorkerStatsPeriod[];
+}
+
+// Counts per period of the active workers since fromdate (YYYY-MM-DD),
+// grouped by the server.
+export function useApiWorkerStatsBy(granularity: Granularity, fromdate: string | null) {
+	const [data, setData] = React.useState<WorkerStatsPeriodRow[] | null>(null);
+	React.useEffect(() => {
+		let current = true;
+		setData(null);
+		const params = new URLSearchParams({granularity, active: "1"});
+		if (fromdate != null) params.set("fromdate", fromdate);
+		fetch("/api/v0/worker_stats/?" + params).then((r) => r.json()).then((o) => current && setData(o.workers));
+		return () => { current = false; };
+	}, [granularity, fromdate]);
+	return data;
+}
@@ -92,14 +92,24 @@ export function getCookie(name: string) {
     return cookieValue;
 }
 
-export const fetchPost = (url: string, body: any) => {
+export const newIdempotencyKey = () =>
+	window.crypto && window.crypto.randomUUID
+		? window.crypto.randomUUID()
+		: Math.random().toString(36).slice(2) + Date.now().toString(36);
+
+// Pass the same idempotencyKey when retrying a request,
+// so that the server replays its first response.
+export const fetchPost = (url: string, body: any, idempotencyKey?: string) => {
 	const csrftoken = getCookie('csrftoken') || "";
 	return window.fetch(
 		url,
 		{
 			method: "POST",
 			body: JSON.stringify(body),
-			headers: {'X-CSRFToken': csrftoken},
+			headers: {
+				'X-CSRFToken': csrftoken,
+				'Idempotency-Key': idempotencyKey || newIdempotencyKey(),
+			},
 		}
 	);
 };
@@ -80,12 +80,13 @@ const ShiftEdit: React.FC<{row: ApiShift, showTimes?: boolean}> = (props) => {
 
 	const setWorkers = (workers: {id: number}[]) => refreshTheWorld(
 		async (done) => {
-			const body = {workers: workers.map(({id}: {id: number}) => ({id}))};
+			const body = {workers: workers.map(({id}: {id: number}) => ({id})), version: row.version};
 			const res = await fetchPost(
 				`/api/v0/shift/${row.date}/${row.slug}/`,
 				body,
 			);
-			done(res.ok);
+			// On 409, someone else changed the shift: reload to show their change.
+			done(res.ok || res.status === 409);
 			return res;
 		}
 	);
@@ -217,6 +218,7 @@ interface ApiShift {
 	settings: ShiftSettings;
 	workers: ApiWorkerShift[];
 	comments: ApiWorkerShiftComment[];
+	version: number;
 }
 
 const ScheduleEdit: React.FC<{data: ApiShift[]}> = (props) => {
@@ -1,39 +1,44 @@
 import * as React from "react";
-import { aggregateEntriesBy, useApiWorkerStats, WorkerStatsRow, WorkerStatsEntry } from "./api";
+import { Granularity, useApiWorkerStatsBy, WorkerStatsPeriodRow } from "./api";
 import { Topbar } from "./base";
 
-function leftpad(n: number) {
-	const s = "00" + n;
-	return s.substring(s.length-2);
+function useSelect<T extends string>(initial: T, options: [T, string][]) {
+	const [value, setValue] = React.useState<T>(initial);
+	const component = <select onChange={(e) => setValue(e.target.value as T)} value={value}>
+		{options.map(([o, label]) => <option key={o} value={o}>{label}</option>)}
+	</select>
+	return [value, component] as [T, typeof component];
 }
 
-const aggregateEntries = (division: "month" | "week", entries: WorkerStatsEntry[]) => {
-	if (division === "month")
-		return aggregateEntriesBy((entry) => `${entry.year}-${leftpad(entry.month)}`, entries);
-	else
-		return aggregateEntriesBy((entry) => `${entry.isoyear}w${leftpad(entry.isoweek)}`, entries);
-};
-
 function useSelectDivision() {
-	const [division, setDivision] = React.useState<"month" | "week">("month");
-	const options = [
+	return useSelect<Granularity>("month", [
 		["month", "Måned"],
 		["week", "Uge"],
-	]
-	const component = <select onChange={(e) => setDivision(e.target.value as any)} value={division}>
-		{options.map(([o, label]) => <option key={o} value={o}>{label}</option>)}
-	</select>
-	return [division, component] as [typeof division, typeof component];
+		["quarter", "Kvartal"],
+		["year", "År"],
+	]);
 }
 
-const WorkerStats: React.FC<{data: WorkerStatsRow[]}> = (props) => {
-	const [division, selectDivision] = useSelectDivision();
+function useSelectRange() {
+	return useSelect<"3" | "12" | "all">("12", [
+		["3", "Seneste 3 måneder"],
+		["12", "Seneste år"],
+		["all", "Alt"],
+	]);
+}
+
+const monthsAgo = (months: number) => {
+	const d = new Date();
+	d.setMonth(d.getMonth() - months);
+	const pad = (n: number) => (n < 10 ? "0" : "") + n;
+	return `${d.getFullYear()}-${pad(d.getMonth() + 1)}-${pad(d.getDate())}`;
+};
+
+const WorkerStats: React.FC<{data: WorkerStatsPeriodRow[]}> = (props) => {
 	const aggregated = props.data.map(
 		(w) => ({
 			...w,
-			agg: Object.fromEntries(
-				aggregateEntries(division, w.stats).map(({name, count}) => [name, count])
-			)
+			agg: Object.fromEntries(w.stats.map(({period, count}) => [period, count]))
 		})
 	);
 	const keyMap: {[k: string]: true} = {};
@@ -42,29 +47,30 @@ const WorkerStats: React.FC<{data: WorkerStatsRow[]}> = (props) => {
 	}
 	const keys = [...Object.keys(keyMap)];
 	keys.sort();
-	return <div>
-		<div>{selectDivision}</div>
-		<table className="sp_worker_stats" cellSpacing={0}>
-			<thead>
-				<tr>
-					<th>Navn</th>
-					{keys.map((k) => <th key={k}>{k}</th>)}
-				</tr>
-			</thead>
-			<tbody>
-				{aggregated.map(({id, name, agg}) => <tr key={id}>
-					<th>{name}</th>
-					{keys.map((k) => <td key={k}>{agg[k]}</td>)}
-				</tr>)}
-			</tbody>
-		</table>
-	</div>;
+	return <table className="sp_worker_stats" cellSpacing={0}>
+		<thead>
+			<tr>
+				<th>Navn</th>
+				{keys.map((k) => <th key={k}>{k}</th>)}
+			</tr>
+		</thead>
+		<tbody>
+			{aggregated.map(({id, name, agg}) => <tr key={id}>
+				<th>{name}</th>
+				{keys.map((k) => <td key={k}>{agg[k]}</td>)}
+			</tr>)}
+		</tbody>
+	</table>;
 };
 
 export const WorkerStatsMain: React.FC<{}> = (_props) => {
-	const data = useApiWorkerStats();
+	const [division, selectDivision] = useSelectDivision();
+	const [range, selectRange] = useSelectRange();
+	const fromdate = React.useMemo(() => range === "all" ? null : monthsAgo(+range), [range]);
+	const data = useApiWorkerStatsBy(division, fromdate);
 	return <>
 		<Topbar current="worker_stats" />
-		{data == null ? <>Indlæser...</> : <WorkerStats data={data.filter((d) => d.active)} />}
+		<div>{selectDivision} {selectRange}</div>
+		{data == null ? <>Indlæser...</> : <WorkerStats data={data} />}
 	</>;
 };
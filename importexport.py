@@ -79,8 +79,8 @@ def import_data():
                 order=order,
                 slug=s.pop("slug", None),
                 name=s.pop("name", None),
-                settings=json.dumps(s),
             )
+            shift.set_settings(s)
             shifts.append(shift)
             for i, sw in enumerate(shift_workers):
                 worker_shifts.append(
@@ -101,6 +101,10 @@ def import_data():
         worker_shift.worker = worker_shift.worker
         worker_shift.shift = worker_shift.shift
         worker_shift.save()
+    models.add_worker_shift_counts(
+        (ws.worker_id, ws.shift.date, 1) for ws in worker_shifts
+    )
+    models.Workplace.invalidate_current()
 
 
 def export_all_data():
@@ -138,10 +142,14 @@ def clear_all_data():
     if workplace.name != "ACME & Sons":
         raise SystemExit("Refuse to clear data for %r" % (workplace.name,))
     models.WorkerShift.objects.all().delete()
+    models.WorkerShiftAggregateCount.objects.all().delete()
     models.Shift.objects.all().delete()
     models.Changelog.objects.all().delete()
+    worker_ids = list(models.Worker.objects.values_list("id", flat=True))
     models.Worker.objects.all().delete()
+    models.Worker.invalidate_sessions(worker_ids)
     models.Workplace.objects.all().delete()
+    models.Workplace.invalidate_current()
 
 
 def create_workplace():
@@ -165,6 +173,7 @@ def create_workplace():
         slug="acme", name="ACME & Sons", settings=json.dumps(workplace_settings)
     )
     workplace.save()
+    models.Workplace.invalidate_current()
 
 
 def create_workers():
@@ -208,7 +217,7 @@ def create_workers():
 
 
 def create_shifts():
-    from shifts import models
+    from shifts import caching, models
 
     if not models.Worker.objects.exists():
         create_workers()
@@ -229,11 +238,17 @@ def create_shifts():
     for i, s in enumerate(shifts):
         s.workplace = workplace
         s.save()
+        shift_workers = []
         for j in range(3):
             worker = workers[
                 ((3 * i + j) * 5839 + (3 * i + j) ** 2 * 5647) % len(workers)
             ]
-            models.WorkerShift.objects.create(worker=worker, shift=s, order=i + 1)
+            if worker not in shift_workers:
+                shift_workers.append(worker)
+        for order, worker in enumerate(shift_workers, 1):
+            models.WorkerShift.objects.create(worker=worker, shift=s, order=order)
+        models.add_worker_shift_counts((w.id, s.date, 1) for w in shift_workers)
+    caching.invalidate_all()
 
 
 if __name__ == "__main__":
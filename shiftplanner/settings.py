@@ -52,9 +52,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "shifts.instrumentation.RequestStatsMiddleware",
+    "shifts.changelog_buffer.ChangelogBufferMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
+    "shifts.idempotency.IdempotencyMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -93,6 +96,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The week snapshots and version tokens must be shared by all worker processes,
+# so use a file-based cache rather than the per-process default.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("DJANGO_CACHE_DIR", str(BASE_DIR / "cache")),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Runs the tests with their own cache directory.
+TEST_RUNNER = "shiftplanner.test_runner.TestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -142,3 +162,27 @@ STATICFILES_STORAGE = "django.contrib.staticfiles.storage.ManifestStaticFilesSto
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Registration admission queue (see shifts/admission.py), per worker process.
+
+REGISTRATION_CONCURRENCY = int(os.environ.get("DJANGO_REGISTRATION_CONCURRENCY", 2))
+
+REGISTRATION_QUEUE_SIZE = int(os.environ.get("DJANGO_REGISTRATION_QUEUE_SIZE", 200))
+
+REGISTRATION_QUEUE_TIMEOUT = float(
+    os.environ.get("DJANGO_REGISTRATION_QUEUE_TIMEOUT", 15)
+)
+
+# Changelog entries are spooled here until they are written to the database.
+CHANGELOG_SPOOL_DIR = os.environ.get(
+    "DJANGO_CHANGELOG_SPOOL_DIR", str(BASE_DIR / "changelog-spool")
+)
+
+# Responses to POSTs with an idempotency key are replayed for this long.
+IDEMPOTENCY_TIMEOUT = int(os.environ.get("DJANGO_IDEMPOTENCY_TIMEOUT", 600))
+
+# Lock files of the POSTs with an idempotency key that are being processed.
+IDEMPOTENCY_LOCK_DIR = os.environ.get(
+    "DJANGO_IDEMPOTENCY_LOCK_DIR", str(BASE_DIR / "idempotency-locks")
+)
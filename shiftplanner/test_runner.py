@@ -0,0 +1,33 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keep the shared file-based cache, the changelog spool and the idempotency
+    locks of the tests in a temporary directory, so that they do not clear or
+    fill the cache of the deployment, or leave changelog entries for it to
+    recover.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.tmpdir = tempfile.TemporaryDirectory(prefix="shiftplanner-test-")
+        self.settings_override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": "%s/cache" % self.tmpdir.name,
+                }
+            },
+            CHANGELOG_SPOOL_DIR="%s/changelog-spool" % self.tmpdir.name,
+            IDEMPOTENCY_LOCK_DIR="%s/idempotency-locks" % self.tmpdir.name,
+        )
+        self.settings_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.settings_override.disable()
+        self.tmpdir.cleanup()
+        super().teardown_test_environment(**kwargs)
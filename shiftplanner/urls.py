@@ -24,6 +24,7 @@ urlpatterns = [
     path("", shifts.views.HomeView.as_view()),
     path("s/<str:week>/", shifts.views.ScheduleView.as_view()),
     path("myshifts/", shifts.views.WorkerShiftListView.as_view()),
+    path("open/", shifts.views.OpenShiftListView.as_view()),
     path("admin/", shifts.views.AdminHomeView.as_view()),
     path("admin/s/<str:week>/", shifts.views.AdminScheduleView.as_view()),
     path("admin/s/<str:week>/print/", shifts.views.AdminPrintView.as_view()),
@@ -47,7 +48,15 @@ urlpatterns = [
     path("api/v0/shift/", shifts.views.ApiShiftList.as_view()),
     path("api/v0/shift_delete/", shifts.views.ApiWorkerShiftDataDelete.as_view()),
     path("api/v0/shift/<str:date>/<str:slug>/", shifts.views.ApiShift.as_view()),
+    path("api/v0/staffing/", shifts.views.ApiShiftStaffing.as_view()),
+    path("api/v0/materialize/", shifts.views.ApiMaterialize.as_view()),
     path("api/v0/export/", shifts.views.ApiExport.as_view()),
+    path("api/v0/registration/", shifts.views.ApiWorkerRegistration.as_view()),
+    path(
+        "api/v0/registration/<str:date>/<str:slug>/",
+        shifts.views.ApiWorkerShiftRegistration.as_view(),
+    ),
+    path("api/v0/instrumentation/", shifts.views.ApiInstrumentation.as_view()),
 ] + [
     path(p, shifts.views.silent_page_not_found)
     for p in """
@@ -1,9 +1,81 @@
 from django.contrib import admin
 
-from . import models
+from . import caching, models
+
+
+def changed_shifts(shift_ids, dates) -> None:
+    # What the views do after changing shifts, so that the schedule and
+    # optimistic version checks see edits made here.
+    models.Shift.bump_versions(shift_ids)
+    caching.invalidate_dates(dates)
+
+
+class WorkerShiftAdmin(admin.ModelAdmin):
+    # Keep WorkerShiftAggregateCount up to date with edits made here.
+
+    def save_model(self, request, obj, form, change):
+        counts = []
+        shifts = []
+        if change:
+            worker_id, shift_id, date = models.WorkerShift.objects.values_list(
+                "worker_id", "shift_id", "shift__date"
+            ).get(id=obj.id)
+            counts.append((worker_id, date, -1))
+            shifts.append((shift_id, date))
+        super().save_model(request, obj, form, change)
+        counts.append((obj.worker_id, obj.shift.date, 1))
+        shifts.append((obj.shift_id, obj.shift.date))
+        models.add_worker_shift_counts(counts)
+        changed_shifts(*zip(*shifts))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        models.add_worker_shift_counts([(obj.worker_id, obj.shift.date, -1)])
+        changed_shifts([obj.shift_id], [obj.shift.date])
+
+    def delete_queryset(self, request, queryset):
+        rows = list(queryset.values_list("worker_id", "shift_id", "shift__date"))
+        super().delete_queryset(request, queryset)
+        models.add_worker_shift_counts([(w, d, -1) for w, s, d in rows])
+        changed_shifts([s for w, s, d in rows], [d for w, s, d in rows])
+
+
+class ShiftAdmin(admin.ModelAdmin):
+    # Deleting a shift cascades to its WorkerShift rows, and moving it to
+    # another date moves them, so WorkerShiftAggregateCount has to follow.
+
+    def save_model(self, request, obj, form, change):
+        counts = []
+        dates = [obj.date]
+        if change and "date" in form.changed_data:
+            old_date = form.initial["date"]
+            dates.append(old_date)
+            for w in models.WorkerShift.objects.filter(shift_id=obj.id).values_list(
+                "worker_id", flat=True
+            ):
+                counts += [(w, old_date, -1), (w, obj.date, 1)]
+        super().save_model(request, obj, form, change)
+        models.add_worker_shift_counts(counts)
+        changed_shifts([obj.id], dates)
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, models.Shift.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        counts = [
+            (w, d, -1)
+            for w, d in models.WorkerShift.objects.filter(
+                shift__in=queryset
+            ).values_list("worker_id", "shift__date")
+        ]
+        dates = list(queryset.values_list("date", flat=True))
+        super().delete_queryset(request, queryset)
+        models.add_worker_shift_counts(counts)
+        caching.invalidate_dates(dates)
+
 
 admin.site.register(models.Workplace)
 admin.site.register(models.Worker)
-admin.site.register(models.Shift)
-admin.site.register(models.WorkerShift)
+admin.site.register(models.Shift, ShiftAdmin)
+admin.site.register(models.WorkerShift, WorkerShiftAdmin)
 admin.site.register(models.Changelog)
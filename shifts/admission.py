@@ -0,0 +1,103 @@
+"""
+Bounded FIFO admission of registration requests.
+
+When registration opens, many workers submit the registration form in the
+same second. Instead of letting every request contend for the (SQLite)
+write lock at once, requests take a ticket and are served in arrival order,
+a few at a time. Requests that would wait too long, or that arrive when the
+queue is full, are turned away at once so that they can be retried.
+The queue is per process.
+"""
+
+import collections
+import contextlib
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, List
+
+from django.conf import settings
+
+
+class QueueFull(Exception):
+    pass
+
+
+class AdmissionQueue:
+    def __init__(self, concurrency: int, max_waiting: int, timeout: float) -> None:
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.waiting: Deque[threading.Event] = collections.deque()
+        self.active = 0
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_depth = 0
+        self.wait_seconds: Deque[float] = collections.deque(maxlen=1000)
+
+    @contextlib.contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Wait for our turn, or raise QueueFull.
+        """
+        t = time.perf_counter()
+        with self.lock:
+            if self.active < self.concurrency and not self.waiting:
+                self.active += 1
+                ticket = None
+            elif len(self.waiting) >= self.max_waiting:
+                self.rejected += 1
+                raise QueueFull()
+            else:
+                ticket = threading.Event()
+                self.waiting.append(ticket)
+                self.max_depth = max(self.max_depth, len(self.waiting))
+        if ticket is not None and not ticket.wait(self.timeout):
+            with self.lock:
+                if not ticket.is_set():
+                    self.waiting.remove(ticket)
+                    self.timed_out += 1
+                    raise QueueFull()
+            # We were admitted just as we gave up.
+        with self.lock:
+            self.admitted += 1
+            self.wait_seconds.append(time.perf_counter() - t)
+        try:
+            yield
+        finally:
+            with self.lock:
+                if self.waiting:
+                    # Hand our place directly to the next in line.
+                    self.waiting.popleft().set()
+                else:
+                    self.active -= 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            waits: List[float] = sorted(self.wait_seconds)
+            result = {
+                "concurrency": self.concurrency,
+                "max_waiting": self.max_waiting,
+                "active": self.active,
+                "depth": len(self.waiting),
+                "max_depth": self.max_depth,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+        if waits:
+            result["wait_p50_ms"] = round(1000 * waits[len(waits) // 2], 3)
+            result["wait_p95_ms"] = round(1000 * waits[int(0.95 * len(waits))], 3)
+            result["wait_max_ms"] = round(1000 * waits[-1], 3)
+        return result
+
+
+registration_queue = AdmissionQueue(
+    settings.REGISTRATION_CONCURRENCY,
+    settings.REGISTRATION_QUEUE_SIZE,
+    settings.REGISTRATION_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,683 @@
+"""
+Time the main endpoints against synthetic datasets of different sizes.
+
+Run from the command line with ``python benchmark.py`` (see --help).
+Each dataset is generated in a throwaway test database, and every
+endpoint is requested a number of times while recording the wall clock
+time and the number of SQL queries of each request.
+"""
+
+import datetime
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from shifts import admission, caching, models, stats_arrays
+
+
+class DatasetSpec(NamedTuple):
+    workers: int
+    weeks: int
+    shifts_per_day: int
+    # Workers per shift when fully staffed, and the fraction of those
+    # positions that are filled.
+    staff_per_shift: int = 3
+    fill: float = 0.8
+    # Fraction of registrations that have a comment.
+    comments: float = 0.1
+    changelog: int = 1000
+
+
+SIZES = {
+    "small": DatasetSpec(workers=50, weeks=8, shifts_per_day=3, changelog=500),
+    "medium": DatasetSpec(workers=200, weeks=52, shifts_per_day=3, changelog=10000),
+    "large": DatasetSpec(workers=1000, weeks=260, shifts_per_day=4, changelog=100000),
+}
+
+SHIFT_NAMES = ["DV", "AV", "NV"]
+
+
+def shift_names(n: int) -> List[str]:
+    return (SHIFT_NAMES + ["V%s" % i for i in range(len(SHIFT_NAMES) + 1, n + 1)])[:n]
+
+
+def generate_dataset(
+    spec: DatasetSpec, *, seed: int = 0, today: Optional[datetime.date] = None
+) -> Dict[str, int]:
+    """
+    Fill the (empty) database with a workplace, spec.workers workers and
+    spec.weeks weeks of shifts centered on today, using bulk inserts.
+    """
+    assert not models.Workplace.objects.exists()
+    rng = random.Random(seed)
+    if today is None:
+        today = datetime.date.today()
+    first_monday = caching.week_monday(today) - datetime.timedelta(
+        7 * (spec.weeks // 2)
+    )
+    last_day = first_monday + datetime.timedelta(7 * spec.weeks - 1)
+
+    workplace_settings: models.WorkplaceSettings = {
+        "weekday_defaults": {
+            wd: {
+                "registration_starts": "%sdT18:00" % (-59 - i),
+                "registration_deadline": "%sdT18:00" % (-3 - i),
+                "shifts": shift_names(spec.shifts_per_day),
+            }
+            for i, wd in enumerate(models.DAYS_OF_THE_WEEK)
+        },
+        "default_view_day": "9d",
+    }
+    workplace = models.Workplace.objects.create(
+        slug="bench", name="Benchmark", settings=json.dumps(workplace_settings)
+    )
+    models.Worker.objects.bulk_create(
+        [
+            models.Worker(
+                name="Worker %s" % i,
+                phone="%08d" % (20000000 + i),
+                login_secret="%016X" % rng.getrandbits(64),
+            )
+            for i in range(spec.workers)
+        ],
+        batch_size=500,
+    )
+    worker_ids = list(models.Worker.objects.order_by("id").values_list("id", flat=True))
+
+    templates = models.WeekdayTemplates(workplace_settings)
+    models.Shift.objects.bulk_create(
+        [s.to_shift(workplace) for s in templates.range_shifts(first_monday, last_day)],
+        batch_size=500,
+    )
+    shifts = list(
+        models.Shift.objects.order_by("date", "order").values_list("id", "date")
+    )
+
+    worker_shifts = []
+    comments = []
+    changelog = []
+    for shift_id, date in shifts:
+        staff = sum(rng.random() < spec.fill for _ in range(spec.staff_per_shift))
+        for order, worker_id in enumerate(rng.sample(worker_ids, staff), 1):
+            worker_shifts.append(
+                models.WorkerShift(worker_id=worker_id, shift_id=shift_id, order=order)
+            )
+            if rng.random() < spec.comments:
+                comments.append(
+                    models.WorkerShiftComment(
+                        worker_id=worker_id,
+                        shift_id=shift_id,
+                        comment="Kommentar %s" % rng.getrandbits(16),
+                    )
+                )
+    models.WorkerShift.objects.bulk_create(worker_shifts, batch_size=500)
+    shift_dates = dict(shifts)
+    models.add_worker_shift_counts(
+        (ws.worker_id, shift_dates[ws.shift_id], 1) for ws in worker_shifts
+    )
+    models.WorkerShiftComment.objects.bulk_create(comments, batch_size=500)
+
+    span = (last_day - first_monday).days + 1
+    now = timezone.now()
+    for i in range(spec.changelog):
+        worker_id = rng.choice(worker_ids)
+        date = first_monday + datetime.timedelta(rng.randrange(span))
+        changelog.append(
+            models.Changelog(
+                time=now - datetime.timedelta(seconds=rng.randrange(86400 * span)),
+                worker_id=worker_id,
+                kind="register",
+                data=json.dumps(
+                    {
+                        "workplace": workplace.slug,
+                        "date": str(date),
+                        "shift": SHIFT_NAMES[0],
+                        "old": [],
+                        "new": ["Worker %s" % worker_id],
+                    }
+                ),
+            )
+        )
+    models.Changelog.objects.bulk_create(changelog, batch_size=500)
+
+    models.Workplace.invalidate_current()
+    return {
+        "shifts": len(shifts),
+        "worker_shifts": len(worker_shifts),
+        "comments": len(comments),
+        "changelog": len(changelog),
+    }
+
+
+def percentile(samples: List[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(p * len(s)))]
+
+
+def measure(
+    fn: Callable[[int], Any], repeat: int, *, cold: bool = False
+) -> Dict[str, Any]:
+    """
+    Call fn(i) repeat times and summarize the latency and query counts.
+    With cold=True, the cache is cleared (untimed) before every call,
+    and otherwise one untimed call warms it up first.
+    """
+    if not cold:
+        fn(-1)
+    times: List[float] = []
+    queries: List[int] = []
+    for i in range(repeat):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            t = time.perf_counter()
+            response = fn(i)
+            times.append(time.perf_counter() - t)
+        assert response.status_code < 400, (response.status_code, response)
+        queries.append(len(ctx))
+    return {
+        "n": repeat,
+        "p50_ms": round(1000 * percentile(times, 0.5), 3),
+        "p95_ms": round(1000 * percentile(times, 0.95), 3),
+        "max_ms": round(1000 * max(times), 3),
+        "queries_p50": statistics.median_low(queries),
+        "queries_max": max(queries),
+    }
+
+
+def week_string(date: datetime.date) -> str:
+    iso = date.isocalendar()
+    return f"{iso.year}w{iso.week}"
+
+
+def run_endpoints(repeat: int) -> Dict[str, Any]:
+    today = datetime.date.today()
+    week = week_string(today)
+    # A day whose registration window is open, so that the POSTs succeed.
+    open_day = today + datetime.timedelta(10)
+    open_week = week_string(open_day)
+    slug = SHIFT_NAMES[0]
+
+    worker = models.Worker.objects.order_by("id")[0]
+    worker_client = Client()
+    worker_client.cookies["shiftplannerlogin"] = worker.get_session_cookie()
+    admin = User.objects.create_superuser("bench", "", "bench")
+    admin_client = Client()
+    admin_client.force_login(admin)
+    other_ids = list(
+        models.Worker.objects.order_by("id").values_list("id", flat=True)[1:4]
+    )
+
+    def schedule_post(i: int):
+        action = "unregister" if i % 2 else "register"
+        return worker_client.post(
+            f"/s/{open_week}/", {f"{action}_{open_day}_{slug}": "1"}
+        )
+
+    shift_version = [0]
+
+    def api_shift_post(i: int):
+        if i < 0:
+            # The untimed warm-up call: schedule_post changed the version.
+            version = models.Shift.objects.filter(date=open_day, slug=slug).values_list(
+                "version", flat=True
+            )
+            shift_version[0] = version[0] if version else 0
+        ids = other_ids[: 1 + i % len(other_ids)]
+        response = admin_client.post(
+            f"/api/v0/shift/{open_day}/{slug}/",
+            json.dumps(
+                {"workers": [{"id": w} for w in ids], "version": shift_version[0]}
+            ),
+            content_type="application/json",
+        )
+        shift_version[0] = response.json()["version"]
+        return response
+
+    gets = {
+        "schedule_get": lambda i: worker_client.get(f"/s/{week}/"),
+        "api_shift_list": lambda i: admin_client.get(f"/api/v0/shift/?week={week}"),
+        "api_worker_stats": lambda i: admin_client.get("/api/v0/worker_stats/"),
+        "api_changelog": lambda i: admin_client.get("/api/v0/changelog/"),
+        "api_export": lambda i: admin_client.get("/api/v0/export/"),
+        "admin_print": lambda i: admin_client.get(f"/admin/s/{week}/print/"),
+    }
+    results: Dict[str, Any] = {}
+    for name, fn in gets.items():
+        results[name] = measure(fn, repeat)
+        results[name + "_cold"] = measure(fn, repeat, cold=True)
+    results["schedule_post"] = measure(schedule_post, repeat)
+    results["api_shift_post"] = measure(api_shift_post, repeat)
+    return results
+
+
+def run_long_shifts(lengths: List[int], repeat: int) -> Dict[str, Any]:
+    """
+    Staff a shift with each given number of workers, and time moving the
+    last worker to the top of the shift and back through ApiShift.
+    """
+    day = datetime.date.today() + datetime.timedelta(12)
+    admin_client = Client()
+    admin_client.force_login(User.objects.get(username="bench"))
+    worker_ids = list(models.Worker.objects.order_by("id").values_list("id", flat=True))
+    results: Dict[str, Any] = {}
+    for slug, length in zip(shift_names(len(lengths)), lengths):
+        ids = worker_ids[:length]
+        url = f"/api/v0/shift/{day}/{slug}/"
+        version = [
+            admin_client.post(
+                url,
+                json.dumps({"workers": [{"id": w} for w in ids], "version": 0}),
+                content_type="application/json",
+            ).json()["version"]
+        ]
+        rows_written: List[int] = []
+
+        def move(i: int):
+            workers = ids[-1:] + ids[:-1] if i % 2 == 0 else ids
+            response = admin_client.post(
+                url,
+                json.dumps(
+                    {"workers": [{"id": w} for w in workers], "version": version[0]}
+                ),
+                content_type="application/json",
+            )
+            data = response.json()
+            version[0] = data["version"]
+            rows_written.append(
+                len(data["debug"]["to_delete"]) + len(data["debug"]["to_insert"])
+            )
+            return response
+
+        results[str(length)] = measure(move, repeat)
+        results[str(length)]["rows_written_max"] = max(rows_written)
+    return results
+
+
+# The aggregate keys of run_aggregate_flush are in years before this one,
+# to keep them apart from the dataset's own.
+SYNTHETIC_YEAR = 1000
+
+
+def synthetic_aggregate_keys(
+    worker_ids: List[int], n: int
+) -> List[Tuple[int, int, int]]:
+    keys = []
+    for i in range(n):
+        week = i // len(worker_ids)
+        year = SYNTHETIC_YEAR + week // 52
+        keys.append(
+            (
+                worker_ids[i % len(worker_ids)],
+                100 * year + week % 52 + 1,
+                100 * year + week % 52 // 5 + 1,
+            )
+        )
+    return keys
+
+
+def per_key_aggregate_flush(add_counts) -> None:
+    # How do_update_worker_shift_aggregate_count used to work,
+    # with one or two statements per key.
+    for (worker, isoyearweek, yearmonth), count in add_counts:
+        qs = models.WorkerShiftAggregateCount.objects.filter(
+            worker_id=worker, isoyearweek=isoyearweek, yearmonth=yearmonth
+        )
+        if not qs.update(count=F("count") + count):
+            models.WorkerShiftAggregateCount.objects.create(
+                worker_id=worker,
+                isoyearweek=isoyearweek,
+                yearmonth=yearmonth,
+                count=count,
+            )
+
+
+def run_aggregate_flush(key_counts: List[int]) -> Dict[str, Any]:
+    """
+    Time adding a count to each of the given numbers of aggregate keys,
+    first when none of the keys exist ("insert") and again when they all do
+    ("update"), in one transaction, one statement per key versus the
+    chunked upsert of do_update_worker_shift_aggregate_count.
+    """
+    worker_ids = list(models.Worker.objects.order_by("id").values_list("id", flat=True))
+    flushes = {
+        "per_key": per_key_aggregate_flush,
+        "upsert": models.do_update_worker_shift_aggregate_count,
+    }
+    results: Dict[str, Any] = {}
+    for n in key_counts:
+        add_counts = [(k, 1) for k in synthetic_aggregate_keys(worker_ids, n)]
+        result = results[str(n)] = {}
+        for name, flush in flushes.items():
+            for phase in ("insert", "update"):
+                statements = [0]
+
+                def count_statements(execute, sql, params, many, context):
+                    statements[0] += 1
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count_statements):
+                    t = time.perf_counter()
+                    with transaction.atomic():
+                        flush(add_counts)
+                    seconds = time.perf_counter() - t
+                result["%s_%s" % (name, phase)] = {
+                    "ms": round(1000 * seconds, 3),
+                    "statements": statements[0],
+                }
+            models.WorkerShiftAggregateCount.objects.filter(
+                isoyearweek__lt=100 * (SYNTHETIC_YEAR + 1000)
+            ).delete()
+    return results
+
+
+def synthetic_stats_history(
+    workers: int, years: int, seed: int
+) -> Tuple[List[Tuple[int, int, int, int]], List[Tuple[int, int, int, int]]]:
+    """
+    Aggregate count rows of the given number of workers over the given
+    number of years, half of the workers taking a shift in a given week,
+    and the rows of the last year, as the current counts.
+    """
+    rng = random.Random(seed)
+    first_monday = datetime.date(2020, 1, 6)
+    weeks = 52 * years
+    history = []
+    for week in range(weeks):
+        monday = first_monday + datetime.timedelta(7 * week)
+        days = [monday + datetime.timedelta(d) for d in range(7)]
+        keys = sorted(set(map(models.isoyearweek_yearmonth, days)))
+        for worker_id in range(1, workers + 1):
+            if rng.random() < 0.5:
+                key = rng.choice(keys)
+                history.append((worker_id, *key, rng.randint(1, 3)))
+    first_current = models.isoyearweek_yearmonth(
+        first_monday + datetime.timedelta(7 * (weeks - 52))
+    )[0]
+    current = [row for row in history if row[1] >= first_current]
+    return history, current
+
+
+def legacy_current_worker_stats(rows, workers) -> List[Any]:
+    # How get_current_worker_stats built its result from the query rows.
+    result: List[Any] = []
+    by_id = {}
+    for worker_id, name, active in workers:
+        by_id[worker_id] = {"id": worker_id, "name": name, "active": active}
+        by_id[worker_id]["stats"] = []
+        result.append(by_id[worker_id])
+    for worker_id, isoyearweek, yearmonth, count in sorted(rows):
+        by_id[worker_id]["stats"].append(
+            {
+                "isoyear": isoyearweek // 100,
+                "isoweek": isoyearweek % 100,
+                "year": yearmonth // 100,
+                "month": yearmonth % 100,
+                "count": count,
+            }
+        )
+    return result
+
+
+def legacy_compute_worker_stats(qsvals, res):
+    # compute_worker_stats before the counts were kept in arrays.
+    prev_counts = {}
+    for worker, isoyearweek, yearmonth, count in qsvals:
+        x = prev_counts.setdefault(worker, {})
+        k = isoyearweek, yearmonth
+        x[k] = x.get(k, 0) + count
+    for w in res:
+        try:
+            x = prev_counts[w["id"]]
+        except KeyError:
+            continue
+        for s in w["stats"]:
+            k = 100 * s["isoyear"] + s["isoweek"], 100 * s["year"] + s["month"]
+            x.pop(k, None)
+        for (isoyearweek, yearmonth), count in x.items():
+            isoyear, isoweek = divmod(isoyearweek, 100)
+            year, month = divmod(yearmonth, 100)
+            w["stats"].append(
+                {
+                    "isoyear": isoyear,
+                    "isoweek": isoweek,
+                    "year": year,
+                    "month": month,
+                    "count": count,
+                }
+            )
+    return res
+
+
+def legacy_diff(res, qsvals):
+    # The comparison in prepare_update_worker_shift_aggregate_count
+    # before the counts were kept in arrays.
+    current_counts = {}
+    for w in res:
+        for s in w["stats"]:
+            k = w["id"], 100 * s["isoyear"] + s["isoweek"], 100 * s["year"] + s["month"]
+            current_counts[k] = current_counts.get(k, 0) + s["count"]
+    minisoyearweek = min(k[1] for k in current_counts)
+    prev_counts = {}
+    for worker, isoyearweek, yearmonth, count in qsvals:
+        k = worker, isoyearweek, yearmonth
+        if k not in current_counts:
+            if isoyearweek <= minisoyearweek:
+                continue
+            current_counts[k] = 0
+        prev_counts[k] = prev_counts.get(k, 0) + count
+    return [
+        (k, c - prev_counts.get(k, 0))
+        for k, c in current_counts.items()
+        if c != prev_counts.get(k, 0)
+    ]
+
+
+def run_stats_engine(
+    workers: int, years: int, repeat: int, seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Time merging the current and historical counts of a synthetic history
+    into the worker stats JSON, and comparing them as the verification of
+    the aggregate does, with dicts per row as before and with stats_arrays.
+    The query time is not included; each pipeline starts from the rows
+    its queries return, packed and sorted in the database for stats_arrays.
+    """
+    history, current = synthetic_stats_history(workers, years, seed)
+    worker_rows = [(w, "Worker %s" % w, True) for w in range(1, workers + 1)]
+    min_isoyearweek = min(row[1] for row in current)
+    stored = [row for row in history if row[1] >= min_isoyearweek]
+
+    def packed(rows):
+        return sorted((stats_arrays.pack(w, i, y), c) for w, i, y, c in rows)
+
+    current_packed = packed(current)
+    history_packed = packed(history)
+    stored_packed = packed(stored)
+
+    def legacy_stats():
+        res = legacy_current_worker_stats(current, worker_rows)
+        return legacy_compute_worker_stats(history, res)
+
+    def array_stats():
+        counts = stats_arrays.override(
+            stats_arrays.CountArrays.from_sorted(current_packed),
+            stats_arrays.CountArrays.from_sorted(history_packed),
+        )
+        return stats_arrays.to_json(counts, worker_rows)
+
+    def legacy_verify():
+        return legacy_diff(legacy_current_worker_stats(current, worker_rows), stored)
+
+    def array_verify():
+        return stats_arrays.diff(
+            stats_arrays.CountArrays.from_sorted(current_packed),
+            stats_arrays.CountArrays.from_sorted(stored_packed),
+            min_isoyearweek,
+        )[3]
+
+    def total(stats):
+        return sorted((w["id"], sum(s["count"] for s in w["stats"])) for w in stats)
+
+    assert total(legacy_stats()) == total(array_stats())
+    assert legacy_verify() == array_verify() == []
+    results: Dict[str, Any] = {
+        "workers": workers,
+        "years": years,
+        "history_rows": len(history),
+        "current_rows": len(current),
+    }
+    for name, fn in (
+        ("legacy_stats", legacy_stats),
+        ("array_stats", array_stats),
+        ("legacy_verify", legacy_verify),
+        ("array_verify", array_verify),
+    ):
+        times = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t)
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {
+            "p50_ms": round(1000 * percentile(times, 0.5), 3),
+            "peak_kib": round(peak / 1024),
+        }
+    return results
+
+
+def run_stampede(clients: int) -> Dict[str, Any]:
+    """
+    Let the given number of workers register for the same shift at the same
+    moment, each from its own thread and database connection, and check that
+    every registration got a distinct position.
+    """
+    day = datetime.date.today() + datetime.timedelta(11)
+    slug = SHIFT_NAMES[0]
+    url = f"/s/{week_string(day)}/"
+    cookies = [
+        w.get_session_cookie() for w in models.Worker.objects.order_by("id")[:clients]
+    ]
+    barrier = threading.Barrier(len(cookies))
+    statuses: List[Any] = []
+
+    def register(cookie: str) -> None:
+        client = Client()
+        client.cookies["shiftplannerlogin"] = cookie
+        barrier.wait()
+        try:
+            statuses.append(
+                client.post(url, {f"register_{day}_{slug}": "1"}).status_code
+            )
+        except Exception as e:
+            statuses.append(type(e).__name__)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=register, args=(c,)) for c in cookies]
+    admission.registration_queue.reset_stats()
+    t = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - t
+    orders = list(
+        models.WorkerShift.objects.filter(
+            shift__date=day, shift__slug=slug
+        ).values_list("order", flat=True)
+    )
+    return {
+        "clients": len(cookies),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(cookies) / seconds, 1),
+        "registered": statuses.count(302),
+        # 200 means that the worker was already registered for the shift.
+        "failed": len([s for s in statuses if s not in (200, 302)]),
+        "registrations": len(orders),
+        "distinct_orders": len(set(orders)),
+        "queue": admission.registration_queue.as_dict(),
+    }
+
+
+def run(
+    sizes: List[str],
+    repeat: int,
+    seed: int = 0,
+    stampede: int = 0,
+    aggregate_keys: Optional[List[int]] = None,
+    stats_years: int = 0,
+) -> Dict[str, Any]:
+    """
+    Run the benchmark for each named size in a fresh test database and
+    return the results in a JSON-serializable dict.
+    """
+    result: Dict[str, Any] = {
+        "code_version": caching.code_version(),
+        "time": timezone.now().isoformat(),
+        "repeat": repeat,
+        "datasets": [],
+    }
+    if stats_years:
+        result["stats_engine"] = run_stats_engine(300, stats_years, repeat, seed)
+    test_settings = connection.settings_dict["TEST"]
+    for size in sizes:
+        spec = SIZES[size]
+        with tempfile.TemporaryDirectory() as tmpdir, override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": os.path.join(tmpdir, "cache"),
+                }
+            },
+            STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage",
+        ):
+            old_name = connection.settings_dict["NAME"]
+            old_test_name = test_settings.get("NAME")
+            if connection.vendor == "sqlite":
+                # Use a file so that the stampede threads share the database.
+                test_settings["NAME"] = os.path.join(tmpdir, "db.sqlite3")
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                t = time.perf_counter()
+                rows = generate_dataset(spec, seed=seed)
+                generate_seconds = time.perf_counter() - t
+                endpoints = run_endpoints(repeat)
+                long_shifts = run_long_shifts(
+                    sorted({min(10, spec.workers), spec.workers}), repeat
+                )
+                stampede_result = run_stampede(stampede) if stampede else None
+                aggregate_flush = run_aggregate_flush(aggregate_keys or [])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings["NAME"] = old_test_name
+        result["datasets"].append(
+            {
+                "size": size,
+                "spec": spec._asdict(),
+                "rows": rows,
+                "generate_seconds": round(generate_seconds, 3),
+                "endpoints": endpoints,
+                "long_shifts": long_shifts,
+                "stampede": stampede_result,
+                "aggregate_flush": aggregate_flush,
+            }
+        )
+    return result
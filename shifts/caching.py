@@ -0,0 +1,100 @@
+"""
+Generational cache keys for data derived from the schedule.
+
+Every week (identified by the date of its Monday) has a version token in the
+Django cache, and so does the global state that every week depends on
+(workplace settings, and worker names and contact details). Derived data is
+cached under a key that includes the versions it was computed from, so
+invalidation is a matter of bumping a version: stale entries are never read
+again and simply expire.
+
+Versions are bumped after the writing transaction commits, and readers must
+fetch the versions *before* querying the database. That way a reader can at
+worst store fresh data under an old version, never stale data under a new one.
+"""
+
+import datetime
+import functools
+import hashlib
+import os
+import secrets
+from typing import Any, Dict, Iterable, List
+
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_VERSION_KEY = "shifts:v:global"
+
+
+def week_monday(date: datetime.date) -> datetime.date:
+    return date - datetime.timedelta(date.weekday())
+
+
+def week_version_key(monday: datetime.date) -> str:
+    assert monday.weekday() == 0
+    return "shifts:v:week:%s" % monday.strftime("%Y-%m-%d")
+
+
+def new_version() -> str:
+    return secrets.token_hex(8)
+
+
+def get_versions(keys: List[str]) -> Dict[str, str]:
+    versions = cache.get_many(keys)
+    for k in keys:
+        if k in versions:
+            continue
+        # A missing version (never set, or evicted) gets a fresh token,
+        # which can only cause a cache miss, never a stale hit.
+        v = new_version()
+        if not cache.add(k, v, None):
+            v = cache.get(k) or v
+        versions[k] = v
+    return versions
+
+
+def get_week_versions(mondays: Iterable[datetime.date]) -> List[str]:
+    """
+    Return the global version followed by the version of each given week.
+    """
+    keys = [GLOBAL_VERSION_KEY, *(week_version_key(m) for m in mondays)]
+    versions = get_versions(keys)
+    return [versions[k] for k in keys]
+
+
+def bump_versions(keys: Iterable[str]) -> None:
+    new = {k: new_version() for k in keys}
+    if new:
+        transaction.on_commit(lambda: cache.set_many(new, None))
+
+
+def invalidate_dates(dates: Iterable[datetime.date]) -> None:
+    bump_versions(sorted(set(week_version_key(week_monday(d)) for d in dates)))
+
+
+def invalidate_all() -> None:
+    bump_versions([GLOBAL_VERSION_KEY])
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Identify the deployed code, so that ETags change when the templates
+    or views change even if the data does not.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha1()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for f in sorted(filenames):
+            if f.endswith((".py", ".html")):
+                st = os.stat(os.path.join(dirpath, f))
+                h.update(b"%s %d %d\n" % (f.encode(), st.st_size, st.st_mtime_ns))
+    return h.hexdigest()[:16]
+
+
+def make_etag(*parts: Any) -> str:
+    h = hashlib.sha1(code_version().encode())
+    for p in parts:
+        h.update(b"\0" + str(p).encode())
+    return '"%s"' % h.hexdigest()
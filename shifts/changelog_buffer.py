@@ -0,0 +1,225 @@
+"""
+Write-behind buffer for Changelog entries.
+
+Entries are added when the transaction that produced them commits, and are
+appended to a spool file in CHANGELOG_SPOOL_DIR before they are kept in
+memory. ChangelogBufferMiddleware flushes the buffer with one bulk INSERT
+when a request is done, outside of the request's own transaction, so the
+changelog no longer takes the database write lock while the request holds
+it. Concurrent requests share a flush (group commit). Entries added outside
+of a request are flushed right away.
+
+Each process owns a spool file that it keeps locked; a spool file that is
+not locked was left behind by a process that crashed, and its entries are
+taken over by the next process that uses the buffer. An entry that was
+inserted just before a crash may be inserted again, but none are lost,
+except entries that the database rejects, e.g. because their worker was
+deleted before the flush: those are logged and dropped.
+"""
+
+import collections
+import datetime
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, TextIO
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class ChangelogBuffer:
+    def __init__(self, spool_dir: Optional[str] = None) -> None:
+        # Defaults to CHANGELOG_SPOOL_DIR, read when the spool is first
+        # opened, so that the tests can override the setting.
+        self._spool_dir = spool_dir
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending: List[Dict[str, Any]] = []
+        self.spool: Optional[TextIO] = None
+        self.local = threading.local()
+        self.reset_stats()
+
+    @property
+    def spool_dir(self) -> str:
+        if self._spool_dir is None:
+            return settings.CHANGELOG_SPOOL_DIR
+        return self._spool_dir
+
+    def reset_stats(self) -> None:
+        self.max_depth = 0
+        self.flushes = 0
+        self.flushed = 0
+        self.errors = 0
+        self.dropped = 0
+        self.recovered = 0
+        self.flush_seconds: Deque[float] = collections.deque(maxlen=1000)
+
+    def open_spool(self) -> TextIO:
+        # Called with self.lock held.
+        if self.spool is not None:
+            return self.spool
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, "changelog-%s.jsonl" % os.getpid())
+        spool = open(path, "a+")
+        fcntl.flock(spool, fcntl.LOCK_EX)
+        spool.seek(0)
+        # Left behind by an earlier process with the same PID.
+        self.pending += [json.loads(line) for line in spool if line.strip()]
+        self.spool = spool
+        self.recover()
+        return spool
+
+    def recover(self) -> None:
+        # Called with self.lock held, after opening our own spool file.
+        assert self.spool is not None
+        for path in glob.glob(os.path.join(self.spool_dir, "changelog-*.jsonl")):
+            if path == self.spool.name:
+                continue
+            try:
+                orphan = open(path)
+            except FileNotFoundError:
+                continue
+            with orphan:
+                try:
+                    fcntl.flock(orphan, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Its process is alive.
+                    continue
+                entries = [json.loads(line) for line in orphan if line.strip()]
+                self.write_spool(entries)
+                self.pending += entries
+                self.recovered += len(entries)
+                os.unlink(path)
+
+    def write_spool(self, entries: List[Dict[str, Any]]) -> None:
+        assert self.spool is not None
+        self.spool.write("".join(json.dumps(e) + "\n" for e in entries))
+        self.spool.flush()
+        os.fsync(self.spool.fileno())
+
+    def add(self, entries: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.open_spool()
+            self.write_spool(entries)
+            self.pending += entries
+            self.max_depth = max(self.max_depth, len(self.pending))
+        if not getattr(self.local, "in_request", False):
+            self.flush()
+
+    def add_on_commit(self, entries: List[Dict[str, Any]]) -> None:
+        transaction.on_commit(lambda: self.add(entries))
+
+    def insert(self, batch: List[Dict[str, Any]]) -> int:
+        """
+        Insert the entries, leaving out those that violate a constraint,
+        e.g. because their worker was deleted before the flush, so that
+        they do not hold back the rest. Return how many were left out.
+        """
+        from . import models
+
+        try:
+            with transaction.atomic():
+                models.Changelog.objects.bulk_create(
+                    [
+                        models.Changelog(
+                            time=datetime.datetime.fromisoformat(e["time"]),
+                            worker_id=e["worker"],
+                            user_id=e["user"],
+                            kind=e["kind"],
+                            data=e["data"],
+                        )
+                        for e in batch
+                    ],
+                    batch_size=500,
+                )
+        except IntegrityError:
+            if len(batch) == 1:
+                logger.exception("Dropping changelog entry %r", batch[0])
+                return 1
+            half = len(batch) // 2
+            return self.insert(batch[:half]) + self.insert(batch[half:])
+        return 0
+
+    def flush(self) -> None:
+        with self.flush_lock:
+            with self.lock:
+                batch = self.pending
+                self.pending = []
+            if not batch:
+                return
+            t = time.perf_counter()
+            try:
+                dropped = self.insert(batch)
+            except Exception:
+                # Transient, e.g. the database is locked; try again later.
+                logger.exception("Could not flush %s changelog entries", len(batch))
+                with self.lock:
+                    self.pending[:0] = batch
+                    self.errors += 1
+                return
+            with self.lock:
+                # Keep only the entries that were added during the insert.
+                assert self.spool is not None
+                self.spool.truncate(0)
+                self.write_spool(self.pending)
+                self.flushes += 1
+                self.flushed += len(batch) - dropped
+                self.dropped += dropped
+                self.flush_seconds.append(time.perf_counter() - t)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            times: List[float] = sorted(self.flush_seconds)
+            result = {
+                "depth": len(self.pending),
+                "max_depth": self.max_depth,
+                "flushes": self.flushes,
+                "flushed": self.flushed,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "recovered": self.recovered,
+            }
+        if times:
+            result["flush_p50_ms"] = round(1000 * times[len(times) // 2], 3)
+            result["flush_p95_ms"] = round(1000 * times[int(0.95 * len(times))], 3)
+            result["flush_max_ms"] = round(1000 * times[-1], 3)
+        return result
+
+
+def changelog_entry(
+    now: datetime.datetime,
+    kind: str,
+    data: Dict[str, Any],
+    worker_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    return {
+        "time": now.isoformat(),
+        "worker": worker_id,
+        "user": user_id,
+        "kind": kind,
+        "data": json.dumps(data),
+    }
+
+
+buffer = ChangelogBuffer()
+
+
+class ChangelogBufferMiddleware:
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        buffer.local.in_request = True
+        try:
+            return self.get_response(request)
+        finally:
+            buffer.local.in_request = False
+            buffer.flush()
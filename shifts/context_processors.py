@@ -3,7 +3,7 @@ from . import models
 
 def workplace(request):
     try:
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
     except Exception:
         return {}
     return {"WORKPLACE": workplace.get_settings()}
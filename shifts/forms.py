@@ -70,3 +70,47 @@ class RegisterForm(forms.Form):
             self.add_error("date", "Date must be YYYY-MM-DD")
             return
         return date
+
+
+class BatchRegisterForm(forms.Form):
+    MAX_SHIFTS = 100
+
+    action = forms.CharField()
+
+    def __init__(self, **kwargs):
+        try:
+            data = kwargs["data"]
+        except KeyError:
+            pass
+        else:
+            if data.get("batchregister") and data.get("batchunregister"):
+                kwargs["data"] = {**data, "action": "register_and_unregister"}
+            elif data.get("batchregister"):
+                kwargs["data"] = {**data, "action": "register"}
+            elif data.get("batchunregister"):
+                kwargs["data"] = {**data, "action": "unregister"}
+        super().__init__(**kwargs)
+
+    def clean_action(self):
+        action_str = self.cleaned_data.pop("action", None)
+        if action_str not in ("register", "unregister"):
+            self.add_error("action", "Must register or unregister")
+        return action_str
+
+    def clean(self):
+        shifts = []
+        for k in self.data:
+            if not k.startswith("select_") or k.count("_") != 2:
+                continue
+            _, date_str, shift = k.split("_")
+            try:
+                date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            except ValueError:
+                raise forms.ValidationError("Date must be YYYY-MM-DD")
+            shifts.append((date, shift))
+        if not shifts:
+            raise forms.ValidationError("Vælg mindst én vagt")
+        if len(shifts) > self.MAX_SHIFTS:
+            raise forms.ValidationError("Vælg højst %s vagter" % self.MAX_SHIFTS)
+        self.cleaned_data["shifts"] = shifts
+        return self.cleaned_data
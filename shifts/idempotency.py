@@ -0,0 +1,205 @@
+"""
+Replay the response to a POST that is submitted again with the same
+idempotency key.
+
+Clients send a key with the Idempotency-Key header (the admin frontend) or
+the idempotency_key form field (the schedule page). The first response to
+a POST with a key is kept in the Django cache for IDEMPOTENCY_TIMEOUT
+seconds, under a cache key made from the key, the path, the body and the
+login and session cookies. A retry of the same request gets the stored
+response without the view being run again. A retry that arrives while the
+first request is still running waits for it.
+
+The request that runs the view holds an exclusive flock on a lock file for
+the key in IDEMPOTENCY_LOCK_DIR. The lock is taken atomically, also across
+processes, and is released by the operating system if the process dies, so
+a crashed request does not keep its retries waiting. The holder removes the
+lock file before it releases the lock; a request that gets the lock on a
+file that was removed in the meantime tries again.
+
+Server errors, conflicts and "busy" responses are not stored, since
+retrying those should run the view again.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+HEADER = "HTTP_IDEMPOTENCY_KEY"
+FORM_FIELD = "idempotency_key"
+# How long a retry waits for the first request to finish.
+WAIT_SECONDS = 5.0
+REPLAYED_HEADERS = ("Content-Type", "Location", "ETag")
+NOT_STORED = (409, 429, 503)
+
+
+class IdempotencyStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stored = 0
+            self.replayed = 0
+            self.in_progress = 0
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "stored": self.stored,
+                "replayed": self.replayed,
+                "in_progress": self.in_progress,
+            }
+
+
+stats = IdempotencyStats()
+
+
+def get_key(request) -> Optional[str]:
+    key = request.META.get(HEADER)
+    if not key and request.content_type in (
+        "application/x-www-form-urlencoded",
+        "multipart/form-data",
+    ):
+        key = request.POST.get(FORM_FIELD)
+    if not key or len(key) > 200:
+        return None
+    h = hashlib.sha256()
+    for part in (
+        key,
+        request.path,
+        request.COOKIES.get("shiftplannerlogin", ""),
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME, ""),
+    ):
+        h.update(part.encode())
+        h.update(b"\0")
+    if request.content_type == "multipart/form-data":
+        # The body cannot be read once request.POST has parsed the stream.
+        fields = sorted(request.POST.lists())
+        files = sorted(
+            (name, [(f.name, f.size) for f in files])
+            for name, files in request.FILES.lists()
+        )
+        h.update(json.dumps([fields, files]).encode())
+    else:
+        h.update(request.body)
+    return "shifts:idempotency:%s" % h.hexdigest()
+
+
+def lock_path(key: str) -> str:
+    return os.path.join(settings.IDEMPOTENCY_LOCK_DIR, key.rpartition(":")[2])
+
+
+def try_lock(key: str) -> Optional[int]:
+    """
+    Take the lock for the key without waiting, and return the file
+    descriptor that holds it, or None if another request holds it.
+    """
+    os.makedirs(settings.IDEMPOTENCY_LOCK_DIR, exist_ok=True)
+    path = lock_path(key)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # The previous holder may have removed the file before we got the lock.
+        if os.fstat(fd).st_ino == os.stat(path).st_ino:
+            return fd
+    except (BlockingIOError, FileNotFoundError):
+        pass
+    os.close(fd)
+    return None
+
+
+def unlock(key: str, fd: int) -> None:
+    os.unlink(lock_path(key))
+    os.close(fd)
+
+
+def replay(stored: Dict[str, Any]) -> HttpResponse:
+    stats.count("replayed")
+    response = HttpResponse(stored["content"], status=stored["status"])
+    for k, v in stored["headers"].items():
+        response[k] = v
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+class IdempotencyMiddleware:
+    """
+    Must come after CsrfViewMiddleware, so that a stored response is only
+    replayed to a request that passes the CSRF check.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.release(request)
+            raise
+        key = getattr(request, "_idempotency_key", None)
+        if key is not None:
+            if response.status_code < 500 and response.status_code not in NOT_STORED:
+                stored = {
+                    "status": response.status_code,
+                    "content": response.content,
+                    "headers": {
+                        k: response[k]
+                        for k in REPLAYED_HEADERS
+                        if response.has_header(k)
+                    },
+                }
+                cache.set(key, stored, settings.IDEMPOTENCY_TIMEOUT)
+                stats.count("stored")
+            self.release(request)
+        return response
+
+    def release(self, request) -> None:
+        fd = getattr(request, "_idempotency_lock", None)
+        if fd is not None:
+            request._idempotency_lock = None
+            unlock(request._idempotency_key, fd)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != "POST":
+            return None
+        key = get_key(request)
+        if key is None:
+            return None
+        deadline = time.monotonic() + WAIT_SECONDS
+        while True:
+            stored = cache.get(key)
+            if stored is not None:
+                return replay(stored)
+            fd = try_lock(key)
+            if fd is not None:
+                break
+            if time.monotonic() > deadline:
+                stats.count("in_progress")
+                return JsonResponse(
+                    {"error": "the same request is still being processed"},
+                    status=409,
+                )
+            time.sleep(0.05)
+        # The response may have been stored after we looked.
+        stored = cache.get(key)
+        if stored is not None:
+            unlock(key, fd)
+            return replay(stored)
+        request._idempotency_key = key
+        request._idempotency_lock = fd
+        return None
@@ -0,0 +1,150 @@
+"""
+Per-view request timing and SQL statistics, kept in memory.
+
+RequestStatsMiddleware records, for every view, the number of requests,
+a latency histogram, the number of SQL queries and the time spent in them,
+and keeps the slowest SQL statements seen in a bounded heap.
+The statistics are per process and are lost on restart; they are exposed
+to planners by ApiInstrumentation.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection
+
+# Upper bounds in milliseconds of the latency histogram buckets.
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+SLOW_SQL_KEEP = 50
+SQL_MAX_LENGTH = 2000
+
+
+class ViewStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def add(self, seconds: float, queries: int, db_seconds: float) -> None:
+        self.requests += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        ms = 1000 * seconds
+        i = 0
+        while i < len(LATENCY_BUCKETS_MS) and ms > LATENCY_BUCKETS_MS[i]:
+            i += 1
+        self.histogram[i] += 1
+        self.queries += queries
+        self.db_seconds += db_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "total_ms": round(1000 * self.seconds, 3),
+            "mean_ms": round(1000 * self.seconds / self.requests, 3),
+            "max_ms": round(1000 * self.max_seconds, 3),
+            "histogram": [
+                {"le_ms": le, "count": c}
+                for le, c in zip([*LATENCY_BUCKETS_MS, None], self.histogram)
+            ],
+            "queries": self.queries,
+            "db_ms": round(1000 * self.db_seconds, 3),
+        }
+
+
+class RequestStats:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.since = time.time()
+            self.views: Dict[str, ViewStats] = {}
+            # Min-heap of (seconds, seq, view, sql) holding the slowest
+            # statements; seq breaks ties without comparing the strings.
+            self.slow_sql: List[Tuple[float, int, str, str]] = []
+            self.seq = itertools.count()
+
+    def add_request(
+        self,
+        view: str,
+        seconds: float,
+        queries: List[Tuple[float, str]],
+    ) -> None:
+        with self.lock:
+            try:
+                stats = self.views[view]
+            except KeyError:
+                stats = self.views[view] = ViewStats()
+            stats.add(seconds, len(queries), sum(q[0] for q in queries))
+            for duration, sql in queries:
+                if (
+                    len(self.slow_sql) >= SLOW_SQL_KEEP
+                    and duration <= self.slow_sql[0][0]
+                ):
+                    continue
+                item = (duration, next(self.seq), view, sql[:SQL_MAX_LENGTH])
+                if len(self.slow_sql) < SLOW_SQL_KEEP:
+                    heapq.heappush(self.slow_sql, item)
+                else:
+                    heapq.heapreplace(self.slow_sql, item)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            views = {k: v.as_dict() for k, v in self.views.items()}
+            slow_sql = sorted(self.slow_sql, reverse=True)
+            since = self.since
+        return {
+            "since": since,
+            "views": dict(
+                sorted(views.items(), key=lambda kv: kv[1]["db_ms"], reverse=True)
+            ),
+            "slow_sql": [
+                {"ms": round(1000 * duration, 3), "view": view, "sql": sql}
+                for duration, seq, view, sql in slow_sql
+            ],
+        }
+
+
+request_stats = RequestStats()
+
+
+def get_view_name(request) -> Optional[str]:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None
+    view_class = getattr(match.func, "view_class", None)
+    if view_class is None:
+        return match._func_path
+    return "%s.%s" % (view_class.__name__, request.method.lower())
+
+
+class RequestStatsMiddleware:
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries: List[Tuple[float, str]] = []
+
+        def record_query(execute, sql, params, many, context):
+            t = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append((time.perf_counter() - t, sql))
+
+        t = time.perf_counter()
+        with connection.execute_wrapper(record_query):
+            response = self.get_response(request)
+        seconds = time.perf_counter() - t
+        view = get_view_name(request)
+        if view is not None:
+            request_stats.add_request(view, seconds, queries)
+        return response
@@ -0,0 +1,23 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from shifts import views
+
+
+def parse_date(s: str) -> datetime.date:
+    return datetime.datetime.strptime(s, "%Y-%m-%d").date()
+
+
+class Command(BaseCommand):
+    help = "Save the default shifts of a range of days as Shift rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("fromdate", type=parse_date, help="First day, YYYY-MM-DD")
+        parser.add_argument("untildate", type=parse_date, help="Last day, YYYY-MM-DD")
+
+    def handle(self, *args, fromdate, untildate, **options):
+        if untildate < fromdate:
+            raise CommandError("untildate is before fromdate")
+        n = views.materialize_range(fromdate, untildate)
+        self.stdout.write("Materialized %s day(s)" % n)
@@ -0,0 +1,50 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from shifts import views
+
+
+class Command(BaseCommand):
+    help = "Cache the week pages of the shifts whose registration opens soon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=60,
+            help="Warm the weeks whose registration opens within this many minutes",
+        )
+        parser.add_argument(
+            "--wait",
+            action="store_true",
+            help="Keep running and warm each week again just before it opens",
+        )
+        parser.add_argument(
+            "--lead",
+            type=int,
+            default=30,
+            help="With --wait, warm this many seconds before each opening",
+        )
+
+    def handle(self, *args, minutes: int, wait: bool, lead: int, **options):
+        now = timezone.now()
+        end = now + datetime.timedelta(minutes=minutes)
+        self.report(views.prewarm_week_snapshots(now, end))
+        if not wait:
+            return
+        second = datetime.timedelta(seconds=1)
+        for opening in views.get_registration_openings(now, end):
+            delay = opening - datetime.timedelta(seconds=lead) - timezone.now()
+            if delay.total_seconds() > 0:
+                # Don't hold on to the database connection while sleeping.
+                connection.close()
+                time.sleep(delay.total_seconds())
+            self.report(views.prewarm_week_snapshots(opening, opening + second))
+
+    def report(self, mondays):
+        weeks = ", ".join("%sw%s" % m.isocalendar()[:2] for m in mondays)
+        self.stdout.write("Warmed %s week(s) %s" % (len(mondays), weeks))
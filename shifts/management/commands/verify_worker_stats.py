@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from shifts import models
+
+
+class Command(BaseCommand):
+    help = "Check the aggregate worker shift counts against a full recount."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Bring the aggregate counts up to date instead of failing",
+        )
+
+    def handle(self, *args, fix: bool, **options):
+        with transaction.atomic():
+            (
+                stat_pos,
+                stat_nul,
+                stat_neg,
+                add_counts,
+            ) = models.prepare_update_worker_shift_aggregate_count()
+            for (worker, isoyearweek, yearmonth), count in add_counts:
+                self.stdout.write(
+                    "Worker %s, week %s, month %s: off by %+d"
+                    % (worker, isoyearweek, yearmonth, -count)
+                )
+            self.stdout.write(
+                "%s count(s) match, %s too low, %s too high"
+                % (stat_nul, stat_pos, stat_neg)
+            )
+            if not add_counts:
+                return
+            if not fix:
+                raise CommandError("The aggregate counts are out of date")
+            models.do_update_worker_shift_aggregate_count(add_counts)
+            self.stdout.write("Fixed %s count(s)" % len(add_counts))
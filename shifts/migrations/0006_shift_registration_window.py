@@ -0,0 +1,57 @@
+import datetime
+import json
+
+from django.db import migrations, models
+from django.utils import timezone
+
+DATETIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
+WINDOW_KEYS = ("registration_starts", "registration_deadline")
+
+
+def settings_to_columns(apps, schema_editor):
+    Shift = apps.get_model("shifts", "Shift")
+    shifts = []
+    for shift in Shift.objects.all().iterator():
+        settings = json.loads(shift.settings)
+        for k in WINDOW_KEYS:
+            v = settings.pop(k, None)
+            if v is not None:
+                setattr(shift, k, datetime.datetime.strptime(v, DATETIME_FMT))
+        shift.settings = json.dumps(settings)
+        shifts.append(shift)
+    Shift.objects.bulk_update(shifts, ["settings", *WINDOW_KEYS], batch_size=500)
+
+
+def columns_to_settings(apps, schema_editor):
+    Shift = apps.get_model("shifts", "Shift")
+    shifts = []
+    for shift in Shift.objects.all().iterator():
+        settings = json.loads(shift.settings)
+        for k in WINDOW_KEYS:
+            v = getattr(shift, k)
+            if v is not None:
+                settings[k] = timezone.localtime(v).strftime(DATETIME_FMT)
+        shift.settings = json.dumps(settings)
+        shifts.append(shift)
+    Shift.objects.bulk_update(shifts, ["settings"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0005_worker_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shift",
+            name="registration_starts",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="shift",
+            name="registration_deadline",
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(settings_to_columns, columns_to_settings),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+def dedupe_worker_shifts(apps, schema_editor):
+    """
+    Remove double registrations and renumber the registrations of each
+    shift 1, 2, 3, ... so that the unique constraints can be added.
+    """
+    WorkerShift = apps.get_model("shifts", "WorkerShift")
+    seen = set()
+    delete = []
+    renumber = []
+    prev_shift = None
+    order = 0
+    for ws in WorkerShift.objects.order_by("shift_id", "order", "id").iterator():
+        if (ws.worker_id, ws.shift_id) in seen:
+            delete.append(ws.id)
+            continue
+        seen.add((ws.worker_id, ws.shift_id))
+        if ws.shift_id != prev_shift:
+            prev_shift = ws.shift_id
+            order = 0
+        order += 1
+        if ws.order != order:
+            ws.order = order
+            renumber.append(ws)
+    WorkerShift.objects.filter(id__in=delete).delete()
+    WorkerShift.objects.bulk_update(renumber, ["order"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0006_shift_registration_window"),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_worker_shifts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="workershift",
+            constraint=models.UniqueConstraint(
+                fields=("worker", "shift"), name="workershift_unique_worker"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="workershift",
+            constraint=models.UniqueConstraint(
+                fields=("shift", "order"), name="workershift_unique_order"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def rename_duplicate_shifts(apps, schema_editor):
+    """
+    Give every shift but the first of each (workplace, date, slug) a new
+    slug, so that the unique constraint can be added without losing the
+    registrations of the duplicates.
+    """
+    Shift = apps.get_model("shifts", "Shift")
+    seen = set()
+    renamed = []
+    for shift in Shift.objects.order_by("workplace_id", "date", "id").iterator():
+        key = (shift.workplace_id, shift.date, shift.slug)
+        if key in seen:
+            shift.slug = "%s-%s" % (shift.slug, shift.id)
+            renamed.append(shift)
+        seen.add(key)
+    Shift.objects.bulk_update(renamed, ["slug"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0007_workershift_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_shifts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="shift",
+            constraint=models.UniqueConstraint(
+                fields=("workplace", "date", "slug"), name="shift_unique_slug"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0008_shift_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shift",
+            name="version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0009_shift_version"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="shift",
+            name="order",
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name="workershift",
+            name="order",
+            field=models.PositiveIntegerField(),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+
+def sync_aggregate_count(apps, schema_editor):
+    # Until now, the aggregate counts were only brought up to date just before
+    # rows were deleted. From now on they are updated on every insert and
+    # delete, so they must start out equal to the current counts.
+    WorkerShift = apps.get_model("shifts", "WorkerShift")
+    WorkerShiftAggregateCount = apps.get_model("shifts", "WorkerShiftAggregateCount")
+    current = {}
+    for worker_id, date in WorkerShift.objects.values_list(
+        "worker_id", "shift__date"
+    ).iterator():
+        isoyear, isoweek, _ = date.isocalendar()
+        k = worker_id, 100 * isoyear + isoweek, 100 * date.year + date.month
+        current[k] = current.get(k, 0) + 1
+    if not current:
+        return
+    minisoyearweek = min(k[1] for k in current)
+    rows = {}
+    prev = {}
+    for row_id, worker_id, isoyearweek, yearmonth, count in (
+        WorkerShiftAggregateCount.objects.exclude(worker=None)
+        .order_by("id")
+        .values_list("id", "worker_id", "isoyearweek", "yearmonth", "count")
+    ):
+        k = worker_id, isoyearweek, yearmonth
+        if k not in current and isoyearweek <= minisoyearweek:
+            # History of pruned rows.
+            continue
+        rows.setdefault(k, row_id)
+        prev[k] = prev.get(k, 0) + count
+    for k in current.keys() | prev.keys():
+        delta = current.get(k, 0) - prev.get(k, 0)
+        if not delta:
+            continue
+        if k in rows:
+            row = WorkerShiftAggregateCount.objects.get(id=rows[k])
+            row.count += delta
+            row.save(update_fields=["count"])
+        else:
+            worker_id, isoyearweek, yearmonth = k
+            WorkerShiftAggregateCount.objects.create(
+                worker_id=worker_id,
+                isoyearweek=isoyearweek,
+                yearmonth=yearmonth,
+                count=delta,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0010_sparse_order"),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_aggregate_count, migrations.RunPython.noop),
+    ]
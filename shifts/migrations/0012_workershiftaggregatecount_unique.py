@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_counts(apps, schema_editor):
+    """
+    Add the count of every row but the first of each (worker, isoyearweek,
+    yearmonth) to the first row and delete it, so that the unique
+    constraint can be added.
+    """
+    WorkerShiftAggregateCount = apps.get_model("shifts", "WorkerShiftAggregateCount")
+    first = {}
+    merged = {}
+    duplicates = []
+    for row in (
+        WorkerShiftAggregateCount.objects.exclude(worker=None).order_by("id").iterator()
+    ):
+        key = (row.worker_id, row.isoyearweek, row.yearmonth)
+        if key in first:
+            first[key].count += row.count
+            merged[key] = first[key]
+            duplicates.append(row.id)
+        else:
+            first[key] = row
+    WorkerShiftAggregateCount.objects.bulk_update(
+        list(merged.values()), ["count"], batch_size=500
+    )
+    for i in range(0, len(duplicates), 500):
+        WorkerShiftAggregateCount.objects.filter(
+            id__in=duplicates[i : i + 500]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0011_sync_aggregate_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_counts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="workershiftaggregatecount",
+            constraint=models.UniqueConstraint(
+                fields=("worker", "isoyearweek", "yearmonth"),
+                name="workershiftaggregatecount_unique_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+def fill_isoyearweek_yearmonth(apps, schema_editor):
+    Shift = apps.get_model("shifts", "Shift")
+    shifts = []
+    for shift in Shift.objects.only("id", "date").iterator():
+        isoyear, isoweek, _ = shift.date.isocalendar()
+        shift.isoyearweek = 100 * isoyear + isoweek
+        shift.yearmonth = 100 * shift.date.year + shift.date.month
+        shifts.append(shift)
+    Shift.objects.bulk_update(shifts, ["isoyearweek", "yearmonth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shifts", "0012_workershiftaggregatecount_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shift",
+            name="isoyearweek",
+            field=models.PositiveIntegerField(db_index=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="shift",
+            name="yearmonth",
+            field=models.PositiveIntegerField(db_index=True, default=0),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_isoyearweek_yearmonth, migrations.RunPython.noop),
+        # 202401 does not fit in a PostgreSQL smallint.
+        migrations.AlterField(
+            model_name="workershiftaggregatecount",
+            name="isoyearweek",
+            field=models.PositiveIntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="workershiftaggregatecount",
+            name="yearmonth",
+            field=models.PositiveIntegerField(db_index=True),
+        ),
+    ]
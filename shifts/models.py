@@ -1,14 +1,38 @@
+import bisect
 import datetime
 import json
 import random
 import string
+import typing
 from contextlib import contextmanager
-from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict
+from typing import (
+    Any,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    TypeVar,
+    Union,
+)
 
 from django.contrib.auth.models import User
-from django.db import connection, models
+from django.core import signing
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
+from django.utils.crypto import salted_hmac
 
+from shifts import caching, changelog_buffer, stats_arrays
 from shifts.django_datetime_utc import DateTimeUTCField
 
 
@@ -35,18 +59,29 @@ class WorkplaceSettings(TypedDict, total=False):
     retain_weeks: int
 
 
-def add_string_duration(date: datetime.date, duration: str) -> datetime.datetime:
+def parse_string_duration(duration: str) -> Tuple[int, datetime.time]:
     assert duration.count("dT") == 1
     days_str, time = duration.split("dT")
     assert time.count(":") == 1
     days = int(days_str)
     assert days < 0
     h, m = map(int, time.split(":"))
+    return days, datetime.time(h, m)
+
+
+def apply_duration(
+    date: datetime.date, duration: Tuple[int, datetime.time]
+) -> datetime.datetime:
+    days, time = duration
     return timezone.make_aware(
-        datetime.datetime.combine(date + datetime.timedelta(days), datetime.time(h, m))
+        datetime.datetime.combine(date + datetime.timedelta(days), time)
     )
 
 
+def add_string_duration(date: datetime.date, duration: str) -> datetime.datetime:
+    return apply_duration(date, parse_string_duration(duration))
+
+
 def validate_string_duration(duration: str) -> str:
     if duration.count("dT") != 1:
         raise ValueError("duration must contain 'dT'")
@@ -193,17 +228,66 @@ class Workplace(models.Model):
     name = models.CharField(max_length=150)
     settings = models.TextField(default="{}")
 
+    _parsed_settings: Optional[WorkplaceSettings] = None
+    _weekday_templates: "Optional[WeekdayTemplates]" = None
+
     def __str__(self) -> str:
         return self.name
 
     def get_settings(self) -> WorkplaceSettings:
-        return json.loads(self.settings)
+        """
+        Return the parsed settings. The result is shared by every caller
+        (and, for the workplace returned by get_current, by every request),
+        so it must not be modified.
+        """
+        if self._parsed_settings is None:
+            self._parsed_settings = json.loads(self.settings)
+        return self._parsed_settings
+
+    def get_weekday_templates(self) -> "WeekdayTemplates":
+        if self._weekday_templates is None:
+            self._weekday_templates = WeekdayTemplates(self.get_settings())
+        return self._weekday_templates
 
     @contextmanager
     def update_settings(self) -> Iterator[WorkplaceSettings]:
         s = json.loads(self.settings)
         yield s
         self.settings = json.dumps(s)
+        self._parsed_settings = None
+        self._weekday_templates = None
+        if self.pk is not None:
+            Workplace.objects.filter(pk=self.pk).update(settings=self.settings)
+            Workplace.invalidate_current()
+
+    @classmethod
+    def get_current(cls) -> "Workplace":
+        """
+        Return the workplace with its settings already parsed and validated.
+
+        The workplace is kept in memory for the lifetime of the process and
+        only reloaded from the database when the workplace version token in
+        the shared cache changes, which invalidate_current arranges for.
+        """
+        global _current_workplace
+        version = caching.get_versions([WORKPLACE_VERSION_KEY])[WORKPLACE_VERSION_KEY]
+        current = _current_workplace
+        if current is not None and current[0] == version:
+            return current[1]
+        workplace = cls.objects.order_by("id")[:1][0]
+        raw_settings = json.loads(workplace.settings)
+        workplace._parsed_settings = typing.cast(
+            WorkplaceSettings,
+            {**raw_settings, **validate_workplace_settings(raw_settings)},
+        )
+        _current_workplace = (version, workplace)
+        return workplace
+
+    @classmethod
+    def invalidate_current(cls) -> None:
+        # Everything derived from the settings (e.g. week snapshots)
+        # depends on the global version, so bump that too.
+        caching.bump_versions([WORKPLACE_VERSION_KEY, caching.GLOBAL_VERSION_KEY])
 
     class Meta:
         permissions = [
@@ -211,10 +295,23 @@ class Workplace(models.Model):
         ]
 
 
+WORKPLACE_VERSION_KEY = "shifts:v:workplace"
+_current_workplace: Optional[Tuple[str, Workplace]] = None
+
+
 def random_secret(n: int) -> str:
     return "".join(random.choice(string.ascii_letters) for _ in range(n))
 
 
+WORKER_SESSION_SALT = "shifts.worker_session"
+WORKER_SESSION_MAX_AGE = 60 * 24 * 3600
+WORKER_SESSION_STATE_TIMEOUT = 24 * 3600
+
+
+def session_generation(cookie_secret: str) -> str:
+    return salted_hmac(WORKER_SESSION_SALT, cookie_secret).hexdigest()[:16]
+
+
 class Worker(models.Model):
     name = models.CharField(max_length=150)
     phone = models.CharField(max_length=40, null=True, blank=True, db_index=True)
@@ -227,13 +324,96 @@ class Worker(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        Worker.invalidate_sessions([self.id])
+
+    def delete(self, *args, **kwargs) -> Tuple[int, Dict[str, int]]:
+        worker_id = self.id
+        result = super().delete(*args, **kwargs)
+        Worker.invalidate_sessions([worker_id])
+        return result
+
     def get_or_save_cookie_secret(self) -> str:
         assert self.id is not None
         if self.cookie_secret is None:
             self.cookie_secret = random_secret(40)
             Worker.objects.filter(id=self.id).update(cookie_secret=self.cookie_secret)
+            Worker.invalidate_sessions([self.id])
         return f"{self.id}:{self.cookie_secret}"
 
+    def get_session_cookie(self) -> str:
+        """
+        Return a signed, expiring login cookie that can be checked without
+        a database query. It carries the worker id and name and the session
+        generation, which is derived from cookie_secret, so rotating the
+        cookie_secret (or deactivating the worker) revokes every session.
+        """
+        self.get_or_save_cookie_secret()
+        assert self.cookie_secret is not None
+        return signing.dumps(
+            {
+                "id": self.id,
+                "name": self.name,
+                "gen": session_generation(self.cookie_secret),
+            },
+            salt=WORKER_SESSION_SALT,
+            compress=True,
+        )
+
+    @classmethod
+    def get_by_cookie(cls, s: str) -> "Optional[SessionWorker]":
+        if s.count(":") == 1:
+            # Cookie from before signed sessions.
+            worker = cls.get_by_cookie_secret(s)
+            if worker is None:
+                return None
+            return SessionWorker(worker.id, worker.name)
+        try:
+            payload = signing.loads(
+                s, salt=WORKER_SESSION_SALT, max_age=WORKER_SESSION_MAX_AGE
+            )
+            worker_id = payload["id"]
+            gen = payload["gen"]
+        except (signing.BadSignature, TypeError, KeyError):
+            return None
+        state = cls.get_session_state(worker_id)
+        if state is None or state["gen"] is None or state["gen"] != gen:
+            return None
+        return SessionWorker(worker_id, state["name"])
+
+    @classmethod
+    def get_session_state(cls, worker_id: int) -> Optional[Dict[str, Any]]:
+        key = "shifts:worker_session:%s" % worker_id
+        state = cache.get(key)
+        if state is None:
+            try:
+                name, cookie_secret, active = cls.objects.values_list(
+                    "name", "cookie_secret", "active"
+                ).get(id=worker_id)
+            except cls.DoesNotExist:
+                return None
+            state = {
+                "name": name,
+                "gen": (
+                    session_generation(cookie_secret)
+                    if cookie_secret and active
+                    else None
+                ),
+            }
+            cache.set(key, state, WORKER_SESSION_STATE_TIMEOUT)
+        return state
+
+    @classmethod
+    def invalidate_sessions(cls, worker_ids: Iterable[int]) -> None:
+        """
+        Forget the cached session state of the given workers, e.g. after
+        they were renamed, deactivated, deleted or got a new cookie_secret.
+        """
+        keys = ["shifts:worker_session:%s" % i for i in worker_ids]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
     @classmethod
     def get_by_cookie_secret(self, s: str) -> "Optional[Worker]":
         if s.count(":") != 1:
@@ -249,6 +429,17 @@ class Worker(models.Model):
             return None
 
 
+@receiver(post_delete, sender=Worker)
+def worker_deleted(sender, instance: Worker, **kwargs) -> None:
+    # Worker.delete() is not called for queryset deletes.
+    Worker.invalidate_sessions([instance.id])
+
+
+def isoyearweek_yearmonth(date: datetime.date) -> Tuple[int, int]:
+    isoyear, isoweek, _ = date.isocalendar()
+    return 100 * isoyear + isoweek, 100 * date.year + date.month
+
+
 class ShiftSettings(TypedDict, total=False):
     registration_starts: str
     registration_deadline: str
@@ -257,14 +448,38 @@ class ShiftSettings(TypedDict, total=False):
 class Shift(models.Model):
     workplace = models.ForeignKey(Workplace, models.CASCADE)
     date = models.DateField(db_index=True)
-    order = models.PositiveSmallIntegerField()
+    order = models.PositiveIntegerField()
     slug = models.SlugField(max_length=150)
     name = models.CharField(max_length=150)
     settings = models.TextField(default="{}")
+    registration_starts = models.DateTimeField(null=True, blank=True, db_index=True)
+    registration_deadline = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Incremented whenever the workers or comments of the shift change.
+    version = models.PositiveIntegerField(default=0)
+    # Computed from date by isoyearweek_yearmonth, for get_current_worker_stats.
+    isoyearweek = models.PositiveIntegerField(db_index=True)
+    yearmonth = models.PositiveIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["workplace", "date", "slug"], name="shift_unique_slug"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.date} {self.name}"
 
+    def save(self, *args, **kwargs) -> None:
+        self.isoyearweek, self.yearmonth = isoyearweek_yearmonth(self.date)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bump_versions(cls, shift_ids: Iterable[int]) -> None:
+        if not isinstance(shift_ids, models.QuerySet):
+            shift_ids = list(shift_ids)
+        cls.objects.filter(id__in=shift_ids).update(version=models.F("version") + 1)
+
     def as_dict(self) -> Any:
         return {
             "date": self.date.strftime("%Y-%m-%d"),
@@ -274,49 +489,49 @@ class Shift(models.Model):
         }
 
     def get_settings(self) -> ShiftSettings:
-        return json.loads(self.settings)
+        return shift_settings(
+            self.settings, self.registration_starts, self.registration_deadline
+        )
+
+    def set_settings(self, s: Dict[str, Any]) -> None:
+        """
+        Store settings in the format returned by get_settings, moving the
+        registration window into its own columns.
+        """
+        s = dict(s)
+        for k in ("registration_starts", "registration_deadline"):
+            v = s.pop(k, None)
+            setattr(
+                self,
+                k,
+                None if v is None else datetime.datetime.strptime(v, self.DATETIME_FMT),
+            )
+        self.settings = json.dumps(s)
 
     @contextmanager
     def update_settings(self) -> Iterator[ShiftSettings]:
-        s = json.loads(self.settings)
+        s = self.get_settings()
         yield s
-        self.settings = json.dumps(s)
+        self.set_settings(typing.cast(Dict[str, Any], s))
 
     DATETIME_FMT = "%Y-%m-%dT%H:%M:%S%z"
 
-    @property
-    def registration_starts(self) -> Optional[datetime.datetime]:
-        try:
-            v = self.get_settings()["registration_starts"]
-        except KeyError:
-            return None
-        return datetime.datetime.strptime(v, Shift.DATETIME_FMT)
-
-    @registration_starts.setter
-    def registration_starts(self, v: Optional[datetime.datetime]) -> None:
-        with self.update_settings() as s:
-            if v is None:
-                s.pop("registration_starts", None)
-            else:
-                assert v.tzinfo is not None
-                s["registration_starts"] = v.strftime(Shift.DATETIME_FMT)
-
-    @property
-    def registration_deadline(self) -> Optional[datetime.datetime]:
-        try:
-            v = self.get_settings()["registration_deadline"]
-        except KeyError:
-            return None
-        return datetime.datetime.strptime(v, Shift.DATETIME_FMT)
 
-    @registration_deadline.setter
-    def registration_deadline(self, v: Optional[datetime.datetime]) -> None:
-        with self.update_settings() as s:
-            if v is None:
-                s.pop("registration_deadline", None)
-            else:
-                assert v.tzinfo is not None
-                s["registration_deadline"] = v.strftime(Shift.DATETIME_FMT)
+def format_shift_datetime(v: datetime.datetime) -> str:
+    return timezone.localtime(v).strftime(Shift.DATETIME_FMT)
+
+
+def shift_settings(
+    settings: str,
+    registration_starts: Optional[datetime.datetime],
+    registration_deadline: Optional[datetime.datetime],
+) -> ShiftSettings:
+    s: ShiftSettings = json.loads(settings)
+    if registration_starts is not None:
+        s["registration_starts"] = format_shift_datetime(registration_starts)
+    if registration_deadline is not None:
+        s["registration_deadline"] = format_shift_datetime(registration_deadline)
+    return s
 
 
 DAYS_OF_THE_WEEK = [
@@ -330,43 +545,262 @@ DAYS_OF_THE_WEEK = [
 ]
 
 
+class SessionWorker(NamedTuple):
+    """
+    The worker logged in with a cookie. Only the id and name are known
+    without a database query, so this is not a Worker that could be saved.
+    """
+
+    id: int
+    name: str
+
+
+class VirtualShift(NamedTuple):
+    """
+    A shift given by the weekday defaults for a day that has not been
+    materialized into Shift rows.
+    """
+
+    date: datetime.date
+    order: int
+    slug: str
+    name: str
+    registration_starts: datetime.datetime
+    registration_deadline: datetime.datetime
+    # Shared by all shifts of the day - must not be modified.
+    settings: ShiftSettings
+
+    def to_shift(self, workplace: Optional[Workplace] = None) -> Shift:
+        isoyearweek, yearmonth = isoyearweek_yearmonth(self.date)
+        return Shift(
+            workplace=workplace,
+            date=self.date,
+            isoyearweek=isoyearweek,
+            yearmonth=yearmonth,
+            order=self.order,
+            slug=self.slug,
+            name=self.name,
+            registration_starts=self.registration_starts,
+            registration_deadline=self.registration_deadline,
+        )
+
+
+class DayTemplate(NamedTuple):
+    registration_starts: Tuple[int, datetime.time]
+    registration_deadline: Tuple[int, datetime.time]
+    shifts: Tuple[str, ...]
+
+
+class WeekdayTemplates:
+    """
+    The weekday_defaults of the workplace settings, parsed once, producing
+    the default shifts of any date without touching the database.
+    """
+
+    MAX_CACHED_DAYS = 4096
+
+    def __init__(self, settings: WorkplaceSettings) -> None:
+        weekday_defaults = settings.get("weekday_defaults") or {}
+        self.days: List[Optional[DayTemplate]] = []
+        for wd in DAYS_OF_THE_WEEK:
+            try:
+                day_settings = weekday_defaults[wd]
+            except KeyError:
+                self.days.append(None)
+                continue
+            self.days.append(
+                DayTemplate(
+                    parse_string_duration(day_settings["registration_starts"]),
+                    parse_string_duration(day_settings["registration_deadline"]),
+                    tuple(day_settings["shifts"]),
+                )
+            )
+        self._day_shifts: Dict[datetime.date, List[VirtualShift]] = {}
+
+    def day_shifts(self, date: datetime.date) -> List[VirtualShift]:
+        try:
+            return self._day_shifts[date]
+        except KeyError:
+            pass
+        day = self.days[date.weekday()]
+        if day is None:
+            shifts: List[VirtualShift] = []
+        else:
+            registration_starts = apply_duration(date, day.registration_starts)
+            registration_deadline = apply_duration(date, day.registration_deadline)
+            shift_settings: ShiftSettings = {
+                "registration_starts": registration_starts.strftime(Shift.DATETIME_FMT),
+                "registration_deadline": registration_deadline.strftime(
+                    Shift.DATETIME_FMT
+                ),
+            }
+            shifts = [
+                VirtualShift(
+                    date,
+                    i + 1,
+                    n,
+                    n,
+                    registration_starts,
+                    registration_deadline,
+                    shift_settings,
+                )
+                for i, n in enumerate(day.shifts)
+            ]
+        if len(self._day_shifts) >= self.MAX_CACHED_DAYS:
+            self._day_shifts.clear()
+        self._day_shifts[date] = shifts
+        return shifts
+
+    def range_shifts(
+        self,
+        fromdate: datetime.date,
+        untildate: datetime.date,
+        skip: Container[datetime.date] = (),
+    ) -> Iterator[VirtualShift]:
+        """
+        Yield the default shifts of every day from fromdate to untildate
+        (inclusive) except the days in skip.
+        """
+        for i in range(1 + (untildate - fromdate).days):
+            d = fromdate + datetime.timedelta(i)
+            if d not in skip:
+                yield from self.day_shifts(d)
+
+    def open_date_range(
+        self, now: datetime.datetime
+    ) -> Optional[Tuple[datetime.date, datetime.date]]:
+        """
+        Return the range of dates whose default shifts may have a
+        registration window that contains now.
+        """
+        days = [d for d in self.days if d is not None]
+        if not days:
+            return None
+        today = timezone.localdate(now)
+        # Allow a day of slack on either side for the time of day.
+        fromdate = today - datetime.timedelta(
+            max(d.registration_deadline[0] for d in days) + 1
+        )
+        untildate = today - datetime.timedelta(
+            min(d.registration_starts[0] for d in days) - 1
+        )
+        return fromdate, untildate
+
+    def open_shifts(
+        self, now: datetime.datetime, skip: Container[datetime.date] = ()
+    ) -> Iterator[VirtualShift]:
+        date_range = self.open_date_range(now)
+        if date_range is None:
+            return
+        for s in self.range_shifts(*date_range, skip):
+            if s.registration_starts < now < s.registration_deadline:
+                yield s
+
+    def opening_shifts(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[VirtualShift]:
+        """
+        Yield the default shifts whose registration opens in [start, end).
+        """
+        days = [d for d in self.days if d is not None]
+        if not days:
+            return
+        max_starts = max(d.registration_starts[0] for d in days)
+        min_starts = min(d.registration_starts[0] for d in days)
+        fromdate = timezone.localdate(start) - datetime.timedelta(max_starts + 1)
+        untildate = timezone.localdate(end) - datetime.timedelta(min_starts - 1)
+        for s in self.range_shifts(fromdate, untildate):
+            if start <= s.registration_starts < end:
+                yield s
+
+
 def day_shifts_for_settings(
     date: datetime.date,
     settings: WorkplaceSettings,
     workplace: Optional[Workplace] = None,
 ) -> List[Shift]:
-    wd = DAYS_OF_THE_WEEK[date.weekday()]
-    try:
-        day_settings = settings["weekday_defaults"][wd]
-    except KeyError:
-        return []
-    registration_starts = add_string_duration(date, day_settings["registration_starts"])
-    registration_deadline = add_string_duration(
-        date, day_settings["registration_deadline"]
-    )
-    shifts: List[Shift] = []
-    for i, n in enumerate(day_settings["shifts"]):
-        shift_settings = {
-            "registration_starts": registration_starts.strftime(Shift.DATETIME_FMT),
-            "registration_deadline": registration_deadline.strftime(Shift.DATETIME_FMT),
-        }
-        shifts.append(
-            Shift(
-                workplace=workplace,
-                date=date,
-                order=i + 1,
-                slug=n,
-                name=n,
-                settings=json.dumps(shift_settings),
-            )
-        )
-    return shifts
+    return [s.to_shift(workplace) for s in WeekdayTemplates(settings).day_shifts(date)]
+
+
+# Shift.order and WorkerShift.order are sparse: new rows are placed in the
+# gaps between the existing ones, and only when a gap is used up is the
+# whole list renumbered ORDER_GAP apart.
+ORDER_GAP = 1024
+MAX_ORDER = 2**31 - 1
+
+K = TypeVar("K")
+
+
+def next_order(orders: Iterable[int]) -> int:
+    return max(orders, default=0) + ORDER_GAP
+
+
+def sparse_orders(old: Sequence[Tuple[K, int]], new: Sequence[K]) -> Dict[K, int]:
+    """
+    Assign an order to each key in new, where old lists the current keys
+    and orders. The longest run of keys that keep their relative order
+    keep their orders too; the others get orders in the gaps between them.
+    If a gap is too small, all keys are renumbered.
+    """
+    old_order = dict(old)
+    # Longest subsequence of new with increasing old orders (patience sort).
+    tails: List[int] = []
+    tail_index: List[int] = []
+    prev_index: List[Optional[int]] = [None] * len(new)
+    for i, k in enumerate(new):
+        if k not in old_order:
+            continue
+        j = bisect.bisect_left(tails, old_order[k])
+        prev_index[i] = tail_index[j - 1] if j else None
+        if j == len(tails):
+            tails.append(old_order[k])
+            tail_index.append(i)
+        else:
+            tails[j] = old_order[k]
+            tail_index[j] = i
+    keep = set()
+    i_keep = tail_index[-1] if tail_index else None
+    while i_keep is not None:
+        keep.add(i_keep)
+        i_keep = prev_index[i_keep]
+
+    result: Dict[K, int] = {}
+    lo = 0
+    pending: List[K] = []
+    for i in range(len(new) + 1):
+        if i < len(new) and i not in keep:
+            pending.append(new[i])
+            continue
+        if i < len(new):
+            hi = old_order[new[i]]
+            step = (hi - lo) // (len(pending) + 1)
+        else:
+            hi = lo + ORDER_GAP * (len(pending) + 1)
+            step = ORDER_GAP
+        if step < 1 or hi > MAX_ORDER:
+            return {k: ORDER_GAP * (j + 1) for j, k in enumerate(new)}
+        for j, k in enumerate(pending):
+            result[k] = lo + step * (j + 1)
+        pending = []
+        if i < len(new):
+            result[new[i]] = lo = hi
+    return result
 
 
 class WorkerShift(models.Model):
     worker = models.ForeignKey(Worker, models.CASCADE)
     shift = models.ForeignKey(Shift, models.CASCADE)
-    order = models.PositiveSmallIntegerField()
+    order = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "shift"], name="workershift_unique_worker"
+            ),
+            models.UniqueConstraint(
+                fields=["shift", "order"], name="workershift_unique_order"
+            ),
+        ]
 
 
 class WorkerShiftComment(models.Model):
@@ -375,158 +809,176 @@ class WorkerShiftComment(models.Model):
     comment = models.TextField()
 
 
+def get_workers_for_stats() -> List[Tuple[int, str, bool]]:
+    return list(
+        Worker.objects.order_by("name", "id").values_list("id", "name", "active")
+    )
+
+
+def packed_key(worker: str, isoyearweek: str, yearmonth: str) -> Any:
+    # stats_arrays.pack() in the database.
+    return models.ExpressionWrapper(
+        F(worker) * 2 ** (2 * stats_arrays.BITS)
+        + F(isoyearweek) * 2**stats_arrays.BITS
+        + F(yearmonth),
+        output_field=models.BigIntegerField(),
+    )
+
+
+def get_current_counts() -> stats_arrays.CountArrays:
+    qs = WorkerShift.objects.annotate(
+        key=packed_key("worker_id", "shift__isoyearweek", "shift__yearmonth")
+    )
+    qs = qs.values_list("key").annotate(models.Count("id")).order_by("key")
+    return stats_arrays.CountArrays.from_sorted(qs.iterator())
+
+
 def get_current_worker_stats():
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT
-            `w`.`id`,
-            `w`.`name`,
-            `w`.`active`,
-            (STRFTIME('%j', DATE(`s`.`date`, '-3 days', 'weekday 4')) - 1) / 7 + 1 AS `the_week`,
-            STRFTIME('%Y%m', `s`.`date`) AS `the_month`,
-            COUNT(`ws`.`id`)
-            FROM `shifts_worker` AS `w`
-            LEFT JOIN `shifts_workershift` AS `ws`
-            ON `ws`.`worker_id` = `w`.`id`
-            LEFT JOIN `shifts_shift` AS `s`
-            ON `ws`.`shift_id` = `s`.`id`
-            GROUP BY
-            `w`.`id`, `the_week`, `the_month`
-            ORDER BY `w`.`id`
-            """
-        )
-        rows = sorted(cursor.fetchall())
-    result: List[Any] = []
-    for worker_id, worker_name, active, isoweek, yyyymm, count in rows:
-        if not result or result[-1]["id"] != worker_id:
-            result.append(
-                {"id": worker_id, "name": worker_name, "active": active, "stats": []}
-            )
-        if not count:
-            continue
-        year = int(yyyymm[:4])
-        month = int(yyyymm[4:])
-        if isoweek > 50 and month == 1:
-            isoyear = year - 1
-        elif isoweek < 5 and month == 12:
-            isoyear = year + 1
-        else:
-            isoyear = year
-        result[-1]["stats"].append(
-            {
-                "isoyear": isoyear,
-                "isoweek": isoweek,
-                "year": year,
-                "month": month,
-                "count": count,
-            }
-        )
-    result.sort(key=lambda r: r["name"])
-    return result
+    return stats_arrays.to_json(get_current_counts(), get_workers_for_stats())
 
 
 class WorkerShiftAggregateCount(models.Model):
+    # The number of WorkerShift rows per worker, ISO week and month, kept up
+    # to date by add_worker_shift_counts. The counts stay when the rows are
+    # pruned or their worker is deleted (worker=None), to keep the history.
     worker = models.ForeignKey(Worker, models.SET_NULL, blank=True, null=True)
-    isoyearweek = models.PositiveSmallIntegerField(db_index=True)
-    yearmonth = models.PositiveSmallIntegerField(db_index=True)
+    isoyearweek = models.PositiveIntegerField(db_index=True)
+    yearmonth = models.PositiveIntegerField(db_index=True)
     count = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "isoyearweek", "yearmonth"],
+                name="workershiftaggregatecount_unique_key",
+            ),
+        ]
+
 
 def get_worker_stats():
-    qs = WorkerShiftAggregateCount.objects.exclude(worker=None)
-    qsvals = qs.values_list("worker_id", "isoyearweek", "yearmonth", "count")
-    res = get_current_worker_stats()
-    return compute_worker_stats(qsvals, res)
-
-
-def compute_worker_stats(qsvals, res):
-    prev_counts = {}
-    for worker, isoyearweek, yearmonth, count in qsvals:
-        x = prev_counts.setdefault(worker, {})
-        k = isoyearweek, yearmonth
-        x[k] = x.get(k, 0) + count
-    for w in res:
-        try:
-            x = prev_counts[w["id"]]
-        except KeyError:
-            continue
-        for s in w["stats"]:
-            k = 100 * s["isoyear"] + s["isoweek"], 100 * s["year"] + s["month"]
-            x.pop(k, None)
-        for (isoyearweek, yearmonth), count in x.items():
-            isoyear, isoweek = divmod(isoyearweek, 100)
-            year, month = divmod(yearmonth, 100)
-            w["stats"].append(
-                {
-                    "isoyear": isoyear,
-                    "isoweek": isoweek,
-                    "year": year,
-                    "month": month,
-                    "count": count,
-                }
-            )
-    return res
+    qs = WorkerShiftAggregateCount.objects.exclude(worker=None).exclude(count=0)
+    qs = qs.annotate(key=packed_key("worker_id", "isoyearweek", "yearmonth"))
+    history = stats_arrays.CountArrays.from_sorted(
+        qs.values_list("key", "count").order_by("key").iterator()
+    )
+    counts = stats_arrays.override(get_current_counts(), history)
+    return stats_arrays.to_json(counts, get_workers_for_stats())
+
+
+# The period of an aggregate count as an integer expression,
+# and how to present it.
+STATS_PERIODS: Dict[str, Tuple[Any, Callable[[int], str]]] = {
+    "week": (F("isoyearweek"), lambda p: "%sw%02d" % divmod(p, 100)),
+    "month": (F("yearmonth"), lambda p: "%s-%02d" % divmod(p, 100)),
+    "quarter": (
+        # Mod() gives a float on SQLite.
+        F("yearmonth") / 100 * 10
+        + (F("yearmonth") - F("yearmonth") / 100 * 100 + 2) / 3,
+        lambda p: "%sQ%s" % divmod(p, 10),
+    ),
+    "year": (F("yearmonth") / 100, str),
+}
+
+
+def get_worker_period_stats(
+    granularity: str,
+    fromdate: Optional[datetime.date] = None,
+    untildate: Optional[datetime.date] = None,
+    worker_ids: Optional[List[int]] = None,
+    active_only: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Count the shifts of the given workers per week, month, quarter or year
+    in the database. The aggregate counts are kept up to date on every
+    write, so they include both current and pruned shifts. The dates are
+    rounded out to the start and end of their weeks, but not past the
+    start or end of their months.
+    """
+    expression, label = STATS_PERIODS[granularity]
+    workers = Worker.objects.order_by("name", "id")
+    if worker_ids is not None:
+        workers = workers.filter(id__in=worker_ids)
+    if active_only:
+        workers = workers.filter(active=True)
+    result: List[Dict[str, Any]] = []
+    by_id: Dict[int, Dict[str, Any]] = {}
+    for worker_id, name, active in workers.values_list("id", "name", "active"):
+        by_id[worker_id] = {
+            "id": worker_id,
+            "name": name,
+            "active": active,
+            "stats": [],
+        }
+        result.append(by_id[worker_id])
+    qs = WorkerShiftAggregateCount.objects.filter(worker__in=workers)
+    if fromdate is not None:
+        isoyearweek, yearmonth = isoyearweek_yearmonth(fromdate)
+        qs = qs.filter(isoyearweek__gte=isoyearweek, yearmonth__gte=yearmonth)
+    if untildate is not None:
+        isoyearweek, yearmonth = isoyearweek_yearmonth(untildate)
+        qs = qs.filter(isoyearweek__lte=isoyearweek, yearmonth__lte=yearmonth)
+    qs = qs.annotate(period=expression).values_list("worker_id", "period")
+    qs = qs.annotate(total=models.Sum("count")).order_by("worker_id", "period")
+    for worker_id, p, total in qs:
+        if total and worker_id in by_id:
+            by_id[worker_id]["stats"].append({"period": label(p), "count": total})
+    return result
 
 
 def prepare_update_worker_shift_aggregate_count():
-    current_counts = {}
-    for w in get_current_worker_stats():
-        for s in w["stats"]:
-            k = w["id"], 100 * s["isoyear"] + s["isoweek"], 100 * s["year"] + s["month"]
-            current_counts[k] = current_counts.get(k, 0) + s["count"]
-    minisoyearweek = min(
-        isoyearweek for worker, isoyearweek, yearmonth in current_counts
+    current = get_current_counts()
+    if not len(current):
+        return (0, 0, 0, [])
+    min_isoyearweek = min(current.isoyearweek)
+    qs = WorkerShiftAggregateCount.objects.exclude(worker=None)
+    qs = qs.filter(isoyearweek__gte=min_isoyearweek)
+    qs = qs.annotate(key=packed_key("worker_id", "isoyearweek", "yearmonth"))
+    stored = stats_arrays.CountArrays.from_sorted(
+        qs.values_list("key", "count").order_by("key").iterator()
     )
-    minyearmonth = min(yearmonth for worker, isoyearweek, yearmonth in current_counts)
-    qs = WorkerShiftAggregateCount.objects.filter(
-        isoyearweek__gte=minisoyearweek
-    ) | WorkerShiftAggregateCount.objects.filter(yearmonth__gte=minyearmonth)
-    qs = qs.exclude(worker=None)
-    prev_counts = {}
-    prev_count_id = {}
-    qsvals = qs.values_list("id", "worker_id", "isoyearweek", "yearmonth", "count")
-    for i, worker, isoyearweek, yearmonth, count in qsvals:
-        k = worker, isoyearweek, yearmonth
-        if k not in current_counts:
-            continue
-        prev_counts[k] = prev_counts.get(k, 0) + count
-        prev_count_id[k] = i
-    add_counts = []
-    stat_pos = 0
-    stat_nul = 0
-    stat_neg = 0
-    for k, c in current_counts.items():
-        d = c - prev_counts.get(k, 0)
-        if not d:
-            stat_nul += 1
-            continue
-        if d < 0:
-            stat_neg += 1
-        else:
-            stat_pos += 1
-        add_counts.append((k, prev_count_id.get(k), d))
-    return (stat_pos, stat_nul, stat_neg, add_counts)
+    return stats_arrays.diff(current, stored, min_isoyearweek)
+
+
+# Rows per INSERT statement, below SQLite's old limit of 999 parameters.
+AGGREGATE_UPSERT_CHUNK = 200
 
 
 def do_update_worker_shift_aggregate_count(add_counts):
-    for k, row_id, count in add_counts:
-        worker, isoyearweek, yearmonth = k
-        if row_id is None:
-            WorkerShiftAggregateCount.objects.create(
-                worker_id=worker,
-                isoyearweek=isoyearweek,
-                yearmonth=yearmonth,
-                count=count,
+    """
+    Add the ((worker_id, isoyearweek, yearmonth), count) pairs to
+    WorkerShiftAggregateCount, with one INSERT ... ON CONFLICT DO UPDATE
+    per chunk of keys. Each key must occur only once in add_counts.
+    """
+    rows = [(*k, count) for k, count in add_counts]
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(WorkerShiftAggregateCount._meta.db_table)
+    key = ", ".join(map(qn, ("worker_id", "isoyearweek", "yearmonth")))
+    count = qn("count")
+    with transaction.atomic(), connection.cursor() as cursor:
+        for i in range(0, len(rows), AGGREGATE_UPSERT_CHUNK):
+            chunk = rows[i : i + AGGREGATE_UPSERT_CHUNK]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} ({key}, {count}) VALUES {values} "
+                f"ON CONFLICT ({key}) "
+                f"DO UPDATE SET {count} = {table}.{count} + excluded.{count}",
+                [v for row in chunk for v in row],
             )
-        else:
-            qs = WorkerShiftAggregateCount.objects.filter(id=row_id)
-            # assert qs.values_list("worker_id", "isoyearweek", "yearmonth").get() == (
-            #     worker,
-            #     isoyearweek,
-            #     yearmonth,
-            # )
-            qs.update(count=F("count") + count)
+
+
+def add_worker_shift_counts(deltas: Iterable[Tuple[int, datetime.date, int]]) -> None:
+    """
+    Add the given (worker_id, date, +1 or -1) changes in the number of
+    WorkerShift rows to WorkerShiftAggregateCount. Must be called in the
+    transaction that inserts or deletes the rows.
+    """
+    add: Dict[Tuple[int, int, int], int] = {}
+    for worker_id, date, delta in deltas:
+        k = (worker_id, *isoyearweek_yearmonth(date))
+        add[k] = add.get(k, 0) + delta
+    do_update_worker_shift_aggregate_count([(k, d) for k, d in add.items() if d])
 
 
 class Changelog(models.Model):
@@ -542,13 +994,17 @@ class Changelog(models.Model):
         kind: str,
         data: Dict[str, Any],
         *,
-        worker: Optional[Worker] = None,
+        worker: Optional[Union[Worker, SessionWorker]] = None,
         user: Optional[User] = None,
     ) -> None:
-        cls.objects.create(
-            time=timezone.now(),
-            worker=worker,
-            user=user,
-            kind=kind,
-            data=json.dumps(data),
+        changelog_buffer.buffer.add_on_commit(
+            [
+                changelog_buffer.changelog_entry(
+                    timezone.now(),
+                    kind,
+                    data,
+                    worker_id=worker.id if worker is not None else None,
+                    user_id=user.id if user is not None else None,
+                )
+            ]
         )
@@ -15,7 +15,7 @@ def prepare_prune_worker_shift(before):
         stat_neg,
         add_counts,
     ) = models.prepare_update_worker_shift_aggregate_count()
-    for (worker, isoyearweek, yearmonth), rowid, count in add_counts:
+    for (worker, isoyearweek, yearmonth), count in add_counts:
         if isoyearweek < beforeisoyearweek:
             raise Exception(
                 "Going to prune everything before week %s but there is a pending update for week %s"
@@ -0,0 +1,169 @@
+"""
+Worker shift counts in columnar form.
+
+Each (worker id, isoyearweek, yearmonth) is packed into one integer key,
+and counts are kept as two parallel integer arrays of keys in increasing
+order and counts. Merging current and historical counts then comes down to
+bisection and slicing of the arrays, done by builtins, instead of a dict of
+dicts keyed by tuples. JSON is only built for the response.
+"""
+
+import array
+import bisect
+import itertools
+import operator
+from typing import Any, Iterable, List, Tuple
+
+# isoyearweek and yearmonth are below 2**20 until the year 10485.
+BITS = 20
+MASK = (1 << BITS) - 1
+
+
+def pack(worker: int, isoyearweek: int, yearmonth: int) -> int:
+    return (worker << 2 * BITS) | (isoyearweek << BITS) | yearmonth
+
+
+class CountArrays:
+    # Packed keys in increasing order and the count of each.
+
+    def __init__(self, keys: Iterable[int] = (), count: Iterable[int] = ()) -> None:
+        self.keys = array.array("q", keys)
+        self.count = array.array("q", count)
+
+    @classmethod
+    def from_sorted(cls, rows: Iterable[Tuple[int, int]]) -> "CountArrays":
+        """
+        Make arrays of (key, count) rows in increasing order of key.
+        """
+        counts = cls()
+        add_key = counts.keys.append
+        add_count = counts.count.append
+        for key, count in rows:
+            add_key(key)
+            add_count(count)
+        return counts
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, int, int, int]]) -> "CountArrays":
+        """
+        Make arrays of (worker, isoyearweek, yearmonth, count) rows with
+        distinct keys.
+        """
+        return cls.from_sorted(sorted((pack(w, i, y), c) for w, i, y, c in rows))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def isoyearweek(self) -> array.array:
+        return array.array("q", [k >> BITS & MASK for k in self.keys])
+
+    def compress(self, selectors: Iterable[Any]) -> "CountArrays":
+        selectors = list(selectors)
+        return CountArrays(
+            itertools.compress(self.keys, selectors),
+            itertools.compress(self.count, selectors),
+        )
+
+    def without(self, other: "CountArrays") -> "CountArrays":
+        """
+        The counts whose keys are not in other.
+        """
+        present = set(other.keys)
+        return self.compress(map(operator.not_, map(present.__contains__, self.keys)))
+
+    def worker_range(self, worker: int) -> Tuple[int, int]:
+        return (
+            bisect.bisect_left(self.keys, worker << 2 * BITS),
+            bisect.bisect_left(self.keys, (worker + 1) << 2 * BITS),
+        )
+
+
+def override(current: CountArrays, history: CountArrays) -> CountArrays:
+    """
+    The counts of current, and those of history whose keys are not in current.
+
+    Both are sorted, so this is a merge: the position of each current key in
+    history is found by bisection, and the arrays are copied in slices, one
+    per run of current keys that has no history keys between them. Current
+    counts mostly are the latest weeks of each worker's history, so there
+    are about as many runs as workers.
+    """
+    hk, hc = history.keys, history.count
+    ck, cc = current.keys, current.count
+    if not ck:
+        return CountArrays(hk, hc)
+    # Where each current key is, or would be, in history, and where the
+    # history after it starts. -1 is not a key.
+    lo = list(map(bisect.bisect_left, itertools.repeat(hk), ck))
+    probe = hk + array.array("q", [-1])
+    found = map(operator.eq, map(probe.__getitem__, lo), ck)
+    end = list(map(operator.add, lo, found))
+    starts = [
+        0,
+        *itertools.compress(range(1, len(ck)), map(operator.ne, lo[1:], end)),
+        len(ck),
+    ]
+    keys, count = array.array("q"), array.array("q")
+    j = 0
+    for s, e in zip(starts, starts[1:]):
+        keys += hk[j : lo[s]]
+        count += hc[j : lo[s]]
+        keys += ck[s:e]
+        count += cc[s:e]
+        j = end[e - 1]
+    keys += hk[j:]
+    count += hc[j:]
+    return CountArrays(keys, count)
+
+
+def diff(
+    current: CountArrays, stored: CountArrays, min_isoyearweek: int
+) -> Tuple[int, int, int, List[Any]]:
+    """
+    What to add to stored to make it equal to current, in the format of
+    prepare_update_worker_shift_aggregate_count. Stored counts that are
+    not in current are only expected to be zero after min_isoyearweek;
+    before that they may be the history of pruned rows.
+    """
+    stale = stored.without(current)
+    stale = stale.compress(map(min_isoyearweek.__lt__, stale.isoyearweek))
+    stored_counts = dict(zip(stored.keys, stored.count))
+    prev = map(stored_counts.get, current.keys, itertools.repeat(0))
+    deltas = [*map(operator.sub, current.count, prev), *map(operator.neg, stale.count)]
+    keys = [
+        (k >> 2 * BITS, k >> BITS & MASK, k & MASK)
+        for k in itertools.chain(current.keys, stale.keys)
+    ]
+    stat_pos = sum(1 for d in deltas if d > 0)
+    stat_neg = sum(1 for d in deltas if d < 0)
+    add_counts = [(k, d) for k, d in zip(keys, deltas) if d]
+    return stat_pos, len(deltas) - stat_pos - stat_neg, stat_neg, add_counts
+
+
+def to_json(counts: CountArrays, workers: Iterable[Tuple[int, str, bool]]) -> List[Any]:
+    """
+    The stats of each (id, name, active) worker, in the given order.
+    """
+    # Every row of a week and month shares the same four fields.
+    period_mask = (1 << 2 * BITS) - 1
+    periods = {}
+    for period in set(map(period_mask.__and__, counts.keys)):
+        isoyear, isoweek = divmod(period >> BITS, 100)
+        year, month = divmod(period & MASK, 100)
+        periods[period] = {
+            "isoyear": isoyear,
+            "isoweek": isoweek,
+            "year": year,
+            "month": month,
+        }
+    result: List[Any] = []
+    for worker_id, name, active in workers:
+        start, end = counts.worker_range(worker_id)
+        stats = [
+            dict(periods[k & period_mask], count=count)
+            for k, count in zip(counts.keys[start:end], counts.count[start:end])
+            if count
+        ]
+        result.append({"id": worker_id, "name": name, "active": active, "stats": stats})
+    return result
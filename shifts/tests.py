@@ -1,4 +1,22 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from shifts import models
 
@@ -10,28 +28,6 @@ class WorkerStatsTestCase(TestCase):
         create_shifts()
 
     def test(self):
-        s1 = models.get_current_worker_stats()
-        s2 = models.get_worker_stats()
-        self.assertEqual(s1, s2)
-        (
-            stat_pos,
-            stat_nul,
-            stat_neg,
-            add_counts,
-        ) = models.prepare_update_worker_shift_aggregate_count()
-        self.assertNotEqual(0, stat_pos)
-        self.assertEqual(0, stat_nul)
-        self.assertEqual(0, stat_neg)
-        self.assertEqual(stat_pos + stat_neg, len(add_counts))
-        for k, row_id, count in add_counts:
-            worker, isoyearweek, yearmonth = k
-            if row_id is not None:
-                qs = models.WorkerShiftAggregateCount.objects.filter(id=row_id)
-                assert qs.values_list(
-                    "worker_id", "isoyearweek", "yearmonth"
-                ).get() == (worker, isoyearweek, yearmonth)
-        models.do_update_worker_shift_aggregate_count(add_counts)
-
         s1 = models.get_current_worker_stats()
         s2 = models.get_worker_stats()
         self.assertEqual(s1, s2)
@@ -44,4 +40,820 @@ class WorkerStatsTestCase(TestCase):
         self.assertEqual(0, stat_pos)
         self.assertNotEqual(0, stat_nul)
         self.assertEqual(0, stat_neg)
-        self.assertEqual(stat_pos + stat_neg, len(add_counts))
+        self.assertEqual([], add_counts)
+
+    def test_verify(self):
+        from django.core.management import CommandError, call_command
+        from django.db.models import F
+
+        row = models.WorkerShiftAggregateCount.objects.order_by("id")[0]
+        models.WorkerShiftAggregateCount.objects.filter(id=row.id).update(
+            count=F("count") + 2
+        )
+        with self.assertRaises(CommandError):
+            call_command("verify_worker_stats", stdout=io.StringIO())
+        out = io.StringIO()
+        call_command("verify_worker_stats", "--fix", stdout=out)
+        self.assertIn("off by +2", out.getvalue())
+        call_command("verify_worker_stats", stdout=io.StringIO())
+        self.assertEqual(models.get_current_worker_stats(), models.get_worker_stats())
+
+    def test_upsert_chunks(self):
+        qs = models.WorkerShiftAggregateCount.objects.exclude(worker=None)
+        before = {
+            (w, i, y): c
+            for w, i, y, c in qs.values_list(
+                "worker_id", "isoyearweek", "yearmonth", "count"
+            )
+        }
+        existing = sorted(before)[: models.AGGREGATE_UPSERT_CHUNK // 2]
+        worker_ids = models.Worker.objects.values_list("id", flat=True)
+        new = [(w, 190001 + i, 190001) for w in worker_ids for i in range(30)]
+        new = new[: models.AGGREGATE_UPSERT_CHUNK]
+        self.assertGreater(len(existing) + len(new), models.AGGREGATE_UPSERT_CHUNK)
+        add = [(k, 3) for k in existing] + [(k, 2) for k in new]
+        # Interleave existing and new keys across the chunks.
+        add = add[::2] + add[1::2]
+        models.do_update_worker_shift_aggregate_count(add)
+        after = {
+            (w, i, y): c
+            for w, i, y, c in qs.values_list(
+                "worker_id", "isoyearweek", "yearmonth", "count"
+            )
+        }
+        expected = dict(before)
+        expected.update((k, before[k] + 3) for k in existing)
+        expected.update((k, 2) for k in new)
+        self.assertEqual(after, expected)
+
+    def test_admin_delete_shift(self):
+        from django.contrib.auth.models import User
+        from django.core.management import call_command
+
+        self.client.force_login(User.objects.create_superuser("admin", "", "admin"))
+        shift = models.Shift.objects.filter(workershift__isnull=False).latest("date")
+        resp = self.client.post(
+            f"/djangoadmin/shifts/shift/{shift.id}/delete/", {"post": "yes"}
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(models.WorkerShift.objects.filter(shift_id=shift.id).exists())
+        call_command("verify_worker_stats", stdout=io.StringIO())
+
+    def test_admin_delete_workershift(self):
+        from django.contrib.auth.models import User
+
+        from shifts import caching
+
+        self.client.force_login(User.objects.create_superuser("admin", "", "admin"))
+        ws = models.WorkerShift.objects.select_related("shift").latest("shift__date")
+        key = caching.week_version_key(caching.week_monday(ws.shift.date))
+        (week,) = caching.get_versions([key]).values()
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                f"/djangoadmin/shifts/workershift/{ws.id}/delete/", {"post": "yes"}
+            )
+        self.assertEqual(resp.status_code, 302)
+        self.assertNotEqual(caching.get_versions([key])[key], week)
+        self.assertEqual(
+            models.Shift.objects.get(id=ws.shift_id).version, ws.shift.version + 1
+        )
+
+    def test_api_granularity(self):
+        from django.contrib.auth.models import User
+
+        self.client.force_login(User.objects.create_superuser("admin", "", "admin"))
+        workers = self.client.get("/api/v0/worker_stats/").json()["workers"]
+        total = sum(s["count"] for w in workers for s in w["stats"])
+        for granularity in models.STATS_PERIODS:
+            resp = self.client.get(
+                "/api/v0/worker_stats/", {"granularity": granularity}
+            ).json()
+            self.assertEqual(
+                [w["id"] for w in resp["workers"]], [w["id"] for w in workers]
+            )
+            self.assertEqual(
+                sum(s["count"] for w in resp["workers"] for s in w["stats"]), total
+            )
+        today = datetime.date.today()
+        w = workers[0]
+        resp = self.client.get(
+            "/api/v0/worker_stats/",
+            {"granularity": "year", "workers": str(w["id"]), "fromdate": str(today)},
+        ).json()
+        self.assertEqual(len(resp["workers"]), 1)
+        isoyearweek, yearmonth = models.isoyearweek_yearmonth(today)
+        future = models.WorkerShift.objects.filter(
+            worker_id=w["id"],
+            shift__isoyearweek__gte=isoyearweek,
+            shift__yearmonth__gte=yearmonth,
+        )
+        self.assertEqual(
+            sum(s["count"] for s in resp["workers"][0]["stats"]), future.count()
+        )
+        resp = self.client.get("/api/v0/worker_stats/", {"granularity": "day"})
+        self.assertEqual(resp.status_code, 400)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class ScheduleViewTestCase(TestCase):
+    def setUp(self):
+        from importexport import create_workers
+
+        cache.clear()
+        create_workers()
+        self.worker = models.Worker.objects.order_by("id")[0]
+        self.client.cookies["shiftplannerlogin"] = self.worker.get_session_cookie()
+        self.date = datetime.date.today() + datetime.timedelta(30)
+        isocal = self.date.isocalendar()
+        self.url = f"/s/{isocal.year}w{isocal.week}/"
+
+    def test_week_snapshot(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+        self.assertEqual(resp.status_code, 302)
+        resp = self.client.get(self.url)
+        self.assertContains(resp, '<li class="sp_myshift">%s</li>' % self.worker.name)
+
+    def test_conditional_get(self):
+        # The first response sets the CSRF cookie, which changes the ETag.
+        self.client.get(self.url)
+        resp = self.client.get(self.url)
+        etag = resp["ETag"]
+        with self.assertNumQueries(0):
+            resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+        resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_revoke_session(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(
+            resp.context["worker"],
+            models.SessionWorker(self.worker.id, self.worker.name),
+        )
+        self.worker.cookie_secret = models.random_secret(40)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.worker.save()
+        resp = self.client.get(self.url)
+        self.assertIsNone(resp.context["worker"])
+
+    def test_delete_worker_session(self):
+        cookie = self.client.cookies["shiftplannerlogin"].value
+        self.assertIsNotNone(models.Worker.get_by_cookie(cookie))
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Worker.objects.filter(id=self.worker.id).delete()
+        self.assertIsNone(models.Worker.get_by_cookie(cookie))
+
+    def test_prewarm(self):
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from shifts import views
+
+        now = timezone.now()
+        # Registration for a week opens on one day of the week before.
+        call_command("prewarm", minutes=7 * 24 * 60, stdout=io.StringIO())
+        mondays = views.prewarm_week_snapshots(now, now + datetime.timedelta(7))
+        self.assertEqual(len(mondays), 1)
+        with self.assertNumQueries(0):
+            views.get_week_snapshots(mondays)
+
+    def test_batch_register(self):
+        # Another day in the same week.
+        later = self.date + datetime.timedelta(1 if self.date.weekday() < 6 else -1)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                self.url,
+                {
+                    f"select_{self.date}_DV": "on",
+                    f"select_{self.date}_AV": "on",
+                    f"select_{later}_NV": "on",
+                    "batchregister": "1",
+                },
+            )
+        self.assertEqual(resp.status_code, 302)
+        qs = models.WorkerShift.objects.filter(worker=self.worker)
+        self.assertEqual(qs.count(), 3)
+        self.assertEqual(models.Changelog.objects.filter(kind="register").count(), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                "/api/v0/registration/",
+                {
+                    "unregister": [
+                        {"date": str(self.date), "shift": "DV"},
+                        {"date": str(later), "shift": "DV"},
+                    ]
+                },
+                content_type="application/json",
+            )
+        self.assertEqual(
+            [r["result"] for r in resp.json()["results"]], ["unregistered", "unchanged"]
+        )
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual(models.prepare_update_worker_shift_aggregate_count()[3], [])
+        resp = self.client.get(self.url)
+        self.assertContains(resp, '<li class="sp_myshift">', count=2)
+
+    def test_json_register(self):
+        url = f"/api/v0/registration/{self.date}/DV/"
+        resp = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                url,
+                {"action": "registercomment", "comment": "Sent"},
+                content_type="application/json",
+            )
+        shift = resp.json()["shift"]
+        self.assertEqual(shift["workers"], [{"name": self.worker.name, "me": True}])
+        self.assertEqual(shift["own_comment"], "Sent")
+        self.assertTrue(shift["open"])
+        # The cached week was invalidated.
+        self.assertContains(self.client.get(self.url), '<li class="sp_myshift">')
+        resp = self.client.post(
+            url, {"action": "register"}, content_type="application/json"
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["result"], "unchanged")
+        self.assertTrue(resp.json()["shift"]["me"])
+
+    def test_idempotent_register(self):
+        url = f"/api/v0/registration/{self.date}/DV/"
+
+        def register(key):
+            with self.captureOnCommitCallbacks(execute=True):
+                return self.client.post(
+                    url,
+                    {"action": "register"},
+                    content_type="application/json",
+                    HTTP_IDEMPOTENCY_KEY=key,
+                )
+
+        first = register("a")
+        self.assertEqual(first.status_code, 200)
+        again = register("a")
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.json(), first.json())
+        self.assertEqual(models.WorkerShift.objects.count(), 1)
+        self.assertEqual(register("b").json()["result"], "unchanged")
+
+    def get_admin_client(self):
+        from django.contrib.auth.models import User
+        from django.test import Client
+
+        admin = Client()
+        admin.force_login(User.objects.create_superuser("admin", "", "admin"))
+        return admin
+
+    def test_staffing(self):
+        admin = self.get_admin_client()
+        ids = list(models.Worker.objects.order_by("id").values_list("id", flat=True))
+        later = self.date + datetime.timedelta(7)
+        versions = {}
+
+        def staff(shifts):
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = admin.post(
+                    "/api/v0/staffing/",
+                    {
+                        "shifts": [
+                            {
+                                "date": str(d),
+                                "slug": s,
+                                "version": versions.get((str(d), s), 0),
+                                "workers": [{"id": i} for i in w],
+                            }
+                            for d, s, w in shifts
+                        ]
+                    },
+                    content_type="application/json",
+                )
+            if resp.status_code == 409:
+                return resp.json()["shifts"]
+            for r in resp.json()["results"]:
+                versions[r["date"], r["slug"]] = r["version"]
+            return [r["result"] for r in resp.json()["results"]]
+
+        self.client.get(self.url)
+        result = staff([(self.date, "DV", ids[:3]), (later, "AV", ids[1:2])])
+        self.assertEqual(result, ["updated", "updated"])
+        with CaptureQueriesContext(connection) as ctx:
+            result = staff(
+                [
+                    (self.date, "DV", [ids[0], ids[2]]),
+                    (self.date, "AV", []),
+                    (later, "AV", ids[1:2]),
+                    (later, "NV", ids[:2]),
+                ]
+            )
+        self.assertEqual(result, ["updated", "unchanged", "unchanged", "updated"])
+        self.assertLess(len(ctx), 20)
+        qs = models.WorkerShift.objects.filter(shift__date=self.date, shift__slug="DV")
+        self.assertEqual(
+            list(qs.order_by("order").values_list("worker_id", flat=True)),
+            [ids[0], ids[2]],
+        )
+        self.assertEqual(models.Changelog.objects.filter(kind="edit").count(), 4)
+        self.assertContains(self.client.get(self.url), '<li class="sp_myshift">')
+        # A worker unregisters, so the planner's version of the shift is stale.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {f"unregister_{self.date}_DV": "1"})
+        (conflict,) = staff([(self.date, "DV", ids[:2]), (later, "NV", [])])
+        self.assertEqual([w["id"] for w in conflict["workers"]], [ids[2]])
+        self.assertEqual(conflict["version"], versions[str(self.date), "DV"] + 1)
+        self.assertEqual(models.Changelog.objects.filter(kind="edit").count(), 4)
+        self.assertEqual(models.prepare_update_worker_shift_aggregate_count()[3], [])
+
+    def test_move_worker(self):
+        admin = self.get_admin_client()
+        ids = list(models.Worker.objects.order_by("id").values_list("id", flat=True))
+        url = f"/api/v0/shift/{self.date}/DV/"
+        version = 0
+        for workers in (ids[:5], ids[4:5] + ids[:4], ids[:4] + ids[5:6]):
+            resp = admin.post(
+                url,
+                {"workers": [{"id": i} for i in workers], "version": version},
+                content_type="application/json",
+            ).json()
+            version = resp["version"]
+            qs = models.WorkerShift.objects.filter(shift__date=self.date)
+            self.assertEqual(
+                list(qs.order_by("order").values_list("worker_id", flat=True)),
+                workers,
+            )
+        # Only the moved or replaced worker was touched.
+        self.assertEqual(len(resp["debug"]["to_delete"]), 1)
+        self.assertEqual(len(resp["debug"]["to_insert"]), 1)
+        resp = admin.post(
+            url,
+            {"workers": [], "version": version - 1},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 409)
+
+    def test_restructure_days(self):
+        admin = self.get_admin_client()
+        days = [self.date + datetime.timedelta(i) for i in range(14)]
+
+        def post(data):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = admin.post(
+                    "/api/v0/shift/", data, content_type="application/json"
+                )
+            self.assertEqual(resp.status_code, 200)
+            return len(ctx)
+
+        few = post({"materializeDays": [str(d) for d in days[:2]]})
+        many = post({"materializeDays": [str(d) for d in days[2:]]})
+        self.assertLessEqual(many, few)
+        self.assertEqual(models.Shift.objects.count(), 3 * len(days))
+
+        def modified(days):
+            result = {}
+            for d in days:
+                dv, av, nv = models.Shift.objects.filter(date=d).order_by("order")
+                # Rename one, reorder two, drop one and add one.
+                result[str(d)] = [
+                    {"id": av.id, "name": "AV"},
+                    {"id": dv.id, "name": "Dag"},
+                    {"name": "Ekstra"},
+                ]
+            return result
+
+        few = post({"modifiedDays": modified(days[:2])})
+        many = post({"modifiedDays": modified(days[2:])})
+        self.assertLessEqual(many, few)
+        self.assertEqual(
+            list(
+                models.Shift.objects.filter(date=days[-1])
+                .order_by("order")
+                .values_list("slug", flat=True)
+            ),
+            ["AV", "Dag", "Ekstra"],
+        )
+
+    def test_materialize(self):
+        from django.core.management import call_command
+
+        until = self.date + datetime.timedelta(13)
+        out = io.StringIO()
+        call_command("materialize", str(self.date), str(until), stdout=out)
+        self.assertEqual(out.getvalue().strip(), "Materialized 14 day(s)")
+        admin = self.get_admin_client()
+        resp = admin.post(
+            "/api/v0/materialize/",
+            {"from": str(self.date), "until": str(until)},
+            content_type="application/json",
+        )
+        self.assertEqual(resp.json()["materialized_days"], 0)
+        self.assertEqual(models.Shift.objects.count(), 3 * 14)
+        # Swapping the names of two shifts does not trip the unique constraint.
+        dv, av, nv = models.Shift.objects.filter(date=self.date).order_by("order")
+        resp = admin.post(
+            "/api/v0/shift/",
+            {
+                "modifiedDays": {
+                    str(self.date): [
+                        {"id": dv.id, "name": "AV"},
+                        {"id": av.id, "name": "DV"},
+                        {"id": nv.id, "name": "NV"},
+                    ]
+                }
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        av.refresh_from_db()
+        self.assertEqual(av.slug, "DV")
+        # A shift with workers is kept, so its name cannot be reused,
+        # and this is not retried as if it were a race.
+        models.WorkerShift.objects.create(
+            worker=models.Worker.objects.first(), shift=nv, order=models.ORDER_GAP
+        )
+        with mock.patch("time.sleep") as sleep:
+            resp = admin.post(
+                "/api/v0/shift/",
+                {
+                    "modifiedDays": {
+                        str(self.date): [
+                            {"id": dv.id, "name": "AV"},
+                            {"id": av.id, "name": "DV"},
+                            {"name": "NV"},
+                        ]
+                    }
+                },
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(sleep.called)
+        self.assertEqual(models.Shift.objects.filter(date=self.date).count(), 3)
+
+    def test_open_shifts(self):
+        day = f"{self.date.day}/{self.date.month}-{self.date.year}"
+        resp = self.client.get("/open/")
+        self.assertContains(resp, day, count=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+        resp = self.client.get("/open/")
+        self.assertContains(resp, day, count=3)
+        past = datetime.date.today() - datetime.timedelta(1)
+        self.assertNotContains(resp, f"{past.day}/{past.month}-{past.year}")
+
+    def test_print_etag(self):
+        admin = self.get_admin_client()
+        isocal = self.date.isocalendar()
+        url = f"/admin/s/{isocal.year}w{isocal.week}/print/"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+        etag = admin.get(url)["ETag"]
+        self.assertEqual(admin.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            admin.post(
+                f"/api/v0/worker/{self.worker.id}/",
+                {"phone": "12345678"},
+                content_type="application/json",
+            )
+        resp = admin.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "1234 5678")
+
+    def test_week_range(self):
+        later = self.date + datetime.timedelta(14)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+            self.client.post(self.url, {f"register_{later}_AV": "1"})
+        first = self.date.isocalendar()
+        last = (self.date + datetime.timedelta(21)).isocalendar()
+        range_url = f"/s/{first.year}w{first.week}-{last.year}w{last.week}/"
+        cache.clear()
+        with CaptureQueriesContext(connection) as week_queries:
+            self.client.get(self.url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as range_queries:
+            resp = self.client.get(range_url)
+        self.assertEqual(len(range_queries), len(week_queries))
+        self.assertEqual(len(resp.context["weeks"]), 4)
+        self.assertContains(resp, '<li class="sp_myshift">', count=2)
+
+
+class RegisterRetryTestCase(TransactionTestCase):
+    def setUp(self):
+        from importexport import create_workers
+
+        cache.clear()
+        create_workers()
+        self.worker, self.other = models.Worker.objects.order_by("id")[:2]
+        self.client.cookies["shiftplannerlogin"] = self.worker.get_session_cookie()
+        self.date = datetime.date.today() + datetime.timedelta(30)
+        isocal = self.date.isocalendar()
+        self.url = f"/s/{isocal.year}w{isocal.week}/"
+
+    def test_register_retry(self):
+        from shifts import views
+
+        workplace = models.Workplace.get_current()
+        prepare_shift_update = views.prepare_shift_update
+        prepare_shift_update(workplace, self.date, "DV").get_or_create_shift_id()
+        # The first attempt reads the shift before another worker's
+        # registration commits, and then collides with it.
+        stale = prepare_shift_update(workplace, self.date, "DV")
+        models.WorkerShift.objects.create(
+            worker=self.other, shift_id=stale.shift_id, order=models.ORDER_GAP
+        )
+        attempts = []
+
+        def racing_prepare_shift_update(*args):
+            upd = prepare_shift_update(*args) if attempts else stale
+            attempts.append(upd)
+            return upd
+
+        with mock.patch.object(
+            views, "prepare_shift_update", racing_prepare_shift_update
+        ):
+            resp = self.client.post(self.url, {f"register_{self.date}_DV": "1"})
+        self.assertEqual(resp.status_code, 302)
+        self.assertEqual(len(attempts), 2)
+        qs = models.WorkerShift.objects.filter(shift__date=self.date, shift__slug="DV")
+        rows = list(qs.order_by("order").values_list("worker_id", "order"))
+        self.assertEqual([w for w, o in rows], [self.other.id, self.worker.id])
+        self.assertEqual(len(set(o for w, o in rows)), 2)
+
+    def test_no_retry(self):
+        from django.db import IntegrityError
+
+        from shifts import views
+
+        workplace = models.Workplace.get_current()
+        views.prepare_shift_update(workplace, self.date, "DV").get_or_create_shift_id()
+        attempts = []
+
+        def duplicate_shift():
+            attempts.append(1)
+            models.Shift.objects.create(
+                workplace=workplace, date=self.date, slug="DV", name="DV"
+            )
+
+        with mock.patch.object(views.time, "sleep") as sleep:
+            with self.assertRaises(IntegrityError):
+                views.atomic_with_retry(duplicate_shift)
+        self.assertEqual(len(attempts), 1)
+        sleep.assert_not_called()
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class BenchmarkTestCase(TestCase):
+    def test_tiny_dataset(self):
+        from shifts import benchmark
+
+        cache.clear()
+        spec = benchmark.DatasetSpec(workers=10, weeks=2, shifts_per_day=4)
+        rows = benchmark.generate_dataset(spec)
+        self.assertEqual(rows["shifts"], 2 * 7 * 4)
+        self.assertEqual(models.WorkerShift.objects.count(), rows["worker_shifts"])
+        results = benchmark.run_endpoints(2)
+        self.assertEqual(results["schedule_get"]["queries_max"], 0)
+        self.assertGreater(results["api_export"]["queries_p50"], 0)
+        long_shifts = benchmark.run_long_shifts([10], 2)
+        self.assertEqual(long_shifts["10"]["rows_written_max"], 2)
+
+
+class InstrumentationTestCase(TestCase):
+    def test_request_stats(self):
+        from django.contrib.auth.models import User
+
+        from shifts import instrumentation
+
+        instrumentation.request_stats.reset()
+        self.client.force_login(User.objects.create_superuser("admin", "", "admin"))
+        self.client.get("/api/v0/worker/")
+        self.client.get("/api/v0/worker/")
+        stats = self.client.get("/api/v0/instrumentation/").json()
+        worker_list = stats["views"]["ApiWorkerList.get"]
+        self.assertEqual(worker_list["requests"], 2)
+        self.assertEqual(sum(b["count"] for b in worker_list["histogram"]), 2)
+        self.assertGreater(worker_list["queries"], 0)
+        self.assertTrue(stats["slow_sql"])
+        self.client.post("/api/v0/instrumentation/")
+        stats = self.client.get("/api/v0/instrumentation/").json()
+        self.assertEqual(list(stats["views"]), ["ApiInstrumentation.post"])
+
+
+class SparseOrdersTestCase(SimpleTestCase):
+    def test_sparse_orders(self):
+        old = [("a", 1024), ("b", 2048), ("c", 3072)]
+        # Moving one key to the front only changes its order.
+        self.assertEqual(
+            models.sparse_orders(old, ["c", "a", "b"]),
+            {"c": 512, "a": 1024, "b": 2048},
+        )
+        self.assertEqual(
+            models.sparse_orders(old, ["a", "x", "b", "c", "y"]),
+            {"a": 1024, "x": 1536, "b": 2048, "c": 3072, "y": 4096},
+        )
+        # No room between 1 and 2: renumber.
+        self.assertEqual(
+            models.sparse_orders([("a", 1), ("b", 2)], ["a", "x", "b"]),
+            {"a": 1024, "x": 2048, "b": 3072},
+        )
+
+
+class StatsArraysTestCase(SimpleTestCase):
+    def test_override_and_diff(self):
+        from shifts.stats_arrays import CountArrays, diff, override, to_json
+
+        current = CountArrays.from_rows(
+            [(2, 202402, 202401, 1), (1, 202403, 202401, 2)]
+        )
+        history = CountArrays.from_rows(
+            [(1, 202403, 202401, 5), (1, 202352, 202312, 3), (1, 202404, 202401, 4)]
+        )
+        merged = to_json(override(current, history), [(1, "A", True), (3, "C", False)])
+        self.assertEqual(
+            [(s["isoweek"], s["count"]) for s in merged[0]["stats"]],
+            [(52, 3), (3, 2), (4, 4)],
+        )
+        self.assertEqual(merged[1]["stats"], [])
+        self.assertEqual(override(CountArrays(), history).keys, history.keys)
+        self.assertEqual(override(current, CountArrays()).keys, current.keys)
+        # Week 202352 is before the earliest current week: pruned history.
+        self.assertEqual(
+            diff(current, history, 202402),
+            (
+                1,
+                0,
+                2,
+                [
+                    ((1, 202403, 202401), -3),
+                    ((2, 202402, 202401), 1),
+                    ((1, 202404, 202401), -4),
+                ],
+            ),
+        )
+
+
+class ChangelogBufferTestCase(TestCase):
+    def test_recover_and_flush(self):
+        from shifts.changelog_buffer import ChangelogBuffer, changelog_entry
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            orphan = os.path.join(tmpdir, "changelog-999999999.jsonl")
+            with open(orphan, "w") as fp:
+                fp.write(json.dumps(changelog_entry(timezone.now(), "crashed", {})))
+                fp.write("\n")
+            buffer = ChangelogBuffer(tmpdir)
+            buffer.local.in_request = True
+            buffer.add([changelog_entry(timezone.now(), "worker_login", {})])
+            self.assertFalse(os.path.exists(orphan))
+            self.assertEqual(buffer.as_dict()["depth"], 2)
+            self.assertEqual(models.Changelog.objects.count(), 0)
+            buffer.flush()
+            self.assertEqual(
+                sorted(models.Changelog.objects.values_list("kind", flat=True)),
+                ["crashed", "worker_login"],
+            )
+            self.assertEqual(buffer.as_dict()["depth"], 0)
+            self.assertEqual(os.path.getsize(buffer.spool.name), 0)
+            buffer.spool.close()
+
+    def test_flush_errors(self):
+        from django.db import OperationalError
+
+        from shifts.changelog_buffer import ChangelogBuffer, changelog_entry
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            buffer = ChangelogBuffer(tmpdir)
+            buffer.local.in_request = True
+            entries = [changelog_entry(timezone.now(), k, {}) for k in "abc"]
+            # Violates NOT NULL, like an entry whose worker was deleted.
+            entries[1]["kind"] = None
+            buffer.add(entries)
+            with mock.patch.object(
+                models.Changelog.objects, "bulk_create", side_effect=OperationalError
+            ), self.assertLogs("shifts.changelog_buffer"):
+                buffer.flush()
+            self.assertEqual(buffer.as_dict()["depth"], 3)
+            with self.assertLogs("shifts.changelog_buffer"):
+                buffer.flush()
+            self.assertEqual(
+                sorted(models.Changelog.objects.values_list("kind", flat=True)),
+                ["a", "c"],
+            )
+            stats = buffer.as_dict()
+            self.assertEqual((stats["depth"], stats["dropped"]), (0, 1))
+            buffer.spool.close()
+
+
+class IdempotencyTestCase(SimpleTestCase):
+    def test_multipart_form(self):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from shifts.idempotency import IdempotencyMiddleware
+
+        calls = []
+
+        def view(request):
+            calls.append(request.POST["register"])
+            return HttpResponse("done")
+
+        def get_response(request):
+            return middleware.process_view(request, view, (), {}) or view(request)
+
+        middleware = IdempotencyMiddleware(get_response)
+
+        def post(data):
+            # RequestFactory posts multipart/form-data by default.
+            request = RequestFactory().post("/", {"idempotency_key": "tap", **data})
+            return middleware(request)
+
+        self.assertEqual(post({"register": "DV"}).content, b"done")
+        again = post({"register": "DV"})
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        post({"register": "AV"})
+        self.assertEqual(calls, ["DV", "AV"])
+
+    def test_concurrent_retry(self):
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from shifts.idempotency import IdempotencyMiddleware
+
+        calls = []
+
+        def view(request):
+            calls.append(request)
+            time.sleep(0.2)
+            return HttpResponse("done")
+
+        def get_response(request):
+            return middleware.process_view(request, view, (), {}) or view(request)
+
+        middleware = IdempotencyMiddleware(get_response)
+        barrier = threading.Barrier(2)
+        responses = []
+
+        def post():
+            request = RequestFactory().post(
+                "/api/v0/registration/", {}, HTTP_IDEMPOTENCY_KEY="tap"
+            )
+            barrier.wait()
+            responses.append(middleware(request))
+
+        file_based_set = FileBasedCache.set
+
+        def slow_set(self, *args, **kwargs):
+            time.sleep(0.05)
+            return file_based_set(self, *args, **kwargs)
+
+        threads = [threading.Thread(target=post) for _ in range(2)]
+        # Widen the gap between the check and the write in FileBasedCache.add().
+        with mock.patch.object(FileBasedCache, "set", slow_set):
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r.content for r in responses], [b"done", b"done"])
+        self.assertEqual(
+            sorted(r.get("Idempotent-Replayed", "") for r in responses),
+            ["", "true"],
+        )
+
+
+class AdmissionQueueTestCase(SimpleTestCase):
+    def test_fifo(self):
+        from shifts.admission import AdmissionQueue, QueueFull
+
+        queue = AdmissionQueue(concurrency=1, max_waiting=2, timeout=5)
+        served = []
+
+        def request(i):
+            with queue.admit():
+                served.append(i)
+
+        threads = []
+        with queue.admit():
+            for i in range(2):
+                threads.append(threading.Thread(target=request, args=(i,)))
+                threads[-1].start()
+                while queue.as_dict()["depth"] <= i:
+                    time.sleep(0.001)
+            with self.assertRaises(QueueFull):
+                with queue.admit():
+                    pass
+        for t in threads:
+            t.join()
+        self.assertEqual(served, [0, 1])
+        stats = queue.as_dict()
+        self.assertEqual((stats["admitted"], stats["rejected"]), (3, 1))
+        self.assertEqual(stats["max_depth"], 2)
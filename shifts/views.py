@@ -1,14 +1,18 @@
 import datetime
 import itertools
 import json
+import random
+import time
 import typing
 import urllib.parse
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
 
 from django.conf import settings
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, connection, transaction
 from django.http import (
     Http404,
     HttpResponseNotFound,
@@ -17,16 +21,29 @@ from django.http import (
 )
 from django.templatetags.static import static
 from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
 from django.utils.safestring import SafeString
 from django.views.generic import FormView, TemplateView, View
 
-from . import forms, models
+from . import (
+    admission,
+    caching,
+    changelog_buffer,
+    forms,
+    idempotency,
+    instrumentation,
+    models,
+)
 from .util import get_isocalendar
 
 
 class HomeView(View):
     def get(self, request):
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         year, week = models.compute_default_week(
             workplace.get_settings(), datetime.date.today()
         )
@@ -42,7 +59,7 @@ class ApiMixin(PermissionRequiredMixin):
 
 class AdminHomeView(ApiMixin, View):
     def get(self, request):
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         year, week = models.compute_default_week(
             workplace.get_settings(), datetime.date.today()
         )
@@ -62,15 +79,13 @@ def monday_from_week_string(week: str) -> Optional[datetime.date]:
         return None
 
 
-def compute_is_registration_open(
-    settings: models.ShiftSettings, now: datetime.datetime
+def is_registration_window_open(
+    registration_starts: Optional[datetime.datetime],
+    registration_deadline: Optional[datetime.datetime],
+    now: datetime.datetime,
 ) -> bool:
-    registration_starts = datetime.datetime.strptime(
-        settings["registration_starts"], models.Shift.DATETIME_FMT
-    )
-    registration_deadline = datetime.datetime.strptime(
-        settings["registration_deadline"], models.Shift.DATETIME_FMT
-    )
+    if registration_starts is None or registration_deadline is None:
+        return False
     return registration_starts < now < registration_deadline
 
 
@@ -79,44 +94,69 @@ class ShiftUpdater:
     date: datetime.date
     slug: str
     shift_id: Optional[int]
-    shift_settings: Optional[Dict[str, Any]]
+    version: int
+    registration_window: Optional[
+        Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]
+    ]
     old_ones: List[Dict[str, Any]]
 
     def get_or_create_shift_id(self) -> Optional[int]:
         if self.shift_id is not None:
             return self.shift_id
-        workplace_settings = self.workplace.get_settings()
-        shifts = models.day_shifts_for_settings(
-            self.date, workplace_settings, self.workplace
+        materialize_days(self.workplace, [self.date])
+        qs = models.Shift.objects.filter(
+            workplace=self.workplace, date=self.date, slug=self.slug
         )
         try:
-            (the_shift,) = [shift for shift in shifts if shift.slug == self.slug]
-        except ValueError:
+            shift_id, version, starts, deadline = qs.values_list(
+                "id", "version", "registration_starts", "registration_deadline"
+            ).get()
+        except models.Shift.DoesNotExist:
             return None
-        for shift in shifts:
-            shift.save()
-        self.shift_id = the_shift.id
-        self.shift_settings = the_shift.get_settings()
-        return the_shift.id
+        self.shift_id = shift_id
+        self.version = version
+        self.registration_window = (starts, deadline)
+        return shift_id
+
+    def plan_workers(
+        self, worker_ids: List[int]
+    ) -> Tuple[List[Dict[str, Any]], List[models.WorkerShift]]:
+        """
+        Return the rows of old_ones to delete and the rows to insert to give
+        the shift the given workers. Only the workers that are added, removed
+        or moved are touched, unless the shift has to be renumbered.
+        """
+        old_orders = {o["worker_id"]: o["order"] for o in self.old_ones}
+        orders = models.sparse_orders(list(old_orders.items()), worker_ids)
+        to_delete = [
+            o for o in self.old_ones if orders.get(o["worker_id"]) != o["order"]
+        ]
+        to_insert = [
+            models.WorkerShift(worker_id=w, shift_id=self.shift_id, order=orders[w])
+            for w in worker_ids
+            if old_orders.get(w) != orders[w]
+        ]
+        return to_delete, to_insert
 
     def is_registration_open(self, now: datetime.datetime) -> bool:
-        if self.shift_settings is None:
-            workplace_settings = self.workplace.get_settings()
-            shifts = models.day_shifts_for_settings(
-                self.date, workplace_settings, self.workplace
+        if self.registration_window is None:
+            virtual_shifts = self.workplace.get_weekday_templates().day_shifts(
+                self.date
             )
             try:
-                (the_shift,) = [shift for shift in shifts if shift.slug == self.slug]
+                (the_shift,) = [s for s in virtual_shifts if s.slug == self.slug]
             except ValueError:
                 return False
-            self.shift_settings = the_shift.get_settings()
-        return compute_is_registration_open(self.shift_settings, now)
+            return is_registration_window_open(
+                the_shift.registration_starts, the_shift.registration_deadline, now
+            )
+        return is_registration_window_open(*self.registration_window, now)
 
     def create_changelog_entry(
         self,
         action: str,
         *,
-        worker: Optional[models.Worker] = None,
+        worker: Optional[models.SessionWorker] = None,
         user: Optional[User] = None,
     ) -> None:
         old_list: List[str] = [o["worker__name"] for o in self.old_ones]
@@ -148,13 +188,14 @@ def prepare_shift_update(
     upd.slug = slug
     assert isinstance(date, datetime.date)
     try:
-        upd.shift_id, settings = models.Shift.objects.values_list("id", "settings").get(
-            date=date, slug=slug
-        )
-        upd.shift_settings = json.loads(settings)
+        upd.shift_id, upd.version, starts, deadline = models.Shift.objects.values_list(
+            "id", "version", "registration_starts", "registration_deadline"
+        ).get(date=date, slug=slug)
+        upd.registration_window = (starts, deadline)
     except models.Shift.DoesNotExist:
         upd.shift_id = None
-        upd.shift_settings = None
+        upd.version = 0
+        upd.registration_window = None
     if upd.shift_id is None:
         upd.old_ones = []
     else:
@@ -166,207 +207,1030 @@ def prepare_shift_update(
     return upd
 
 
-class ScheduleView(TemplateView):
+ShiftKey = Tuple[datetime.date, str]
+
+
+def prepare_shift_updates(
+    workplace: models.Workplace, keys: Iterable[ShiftKey]
+) -> Dict[ShiftKey, ShiftUpdater]:
+    """
+    Like prepare_shift_update for many (date, slug) pairs at once,
+    using two queries in total.
+    """
+    result: Dict[ShiftKey, ShiftUpdater] = {}
+    for date, slug in keys:
+        assert isinstance(date, datetime.date)
+        upd = ShiftUpdater()
+        upd.workplace = workplace
+        upd.date = date
+        upd.slug = slug
+        upd.shift_id = None
+        upd.version = 0
+        upd.registration_window = None
+        upd.old_ones = []
+        result[date, slug] = upd
+    shift_qs = models.Shift.objects.filter(
+        date__in=sorted(set(date for date, slug in result)),
+        slug__in=sorted(set(slug for date, slug in result)),
+    )
+    for shift_id, version, date, slug, starts, deadline in shift_qs.values_list(
+        "id", "version", "date", "slug", "registration_starts", "registration_deadline"
+    ):
+        if (date, slug) in result:
+            upd = result[date, slug]
+            upd.shift_id = shift_id
+            upd.version = version
+            upd.registration_window = (starts, deadline)
+    by_shift_id = {u.shift_id: u for u in result.values() if u.shift_id is not None}
+    if by_shift_id:
+        ws_qs = models.WorkerShift.objects.filter(shift_id__in=by_shift_id.keys())
+        for o in ws_qs.order_by("order").values(
+            "id", "shift_id", "worker_id", "worker__name", "order"
+        ):
+            by_shift_id[o.pop("shift_id")].old_ones.append(o)
+    return result
+
+
+def materialize_days(
+    workplace: models.Workplace, dates: Iterable[datetime.date]
+) -> List[datetime.date]:
+    """
+    Save the default shifts of those of the given days that have no Shift
+    rows, with one query to find them and one bulk insert. The unique
+    constraint on (workplace, date, slug) makes concurrent calls for the
+    same day insert its shifts only once. Returns the days that were
+    materialized (by us or by a concurrent call).
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return []
+    materialized = set(
+        models.Shift.objects.filter(
+            workplace=workplace, date__gte=dates[0], date__lte=dates[-1]
+        )
+        .values_list("date", flat=True)
+        .distinct()
+    )
+    virtual = [d for d in dates if d not in materialized]
+    if virtual:
+        templates = workplace.get_weekday_templates()
+        models.Shift.objects.bulk_create(
+            [s.to_shift(workplace) for d in virtual for s in templates.day_shifts(d)],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+    return virtual
+
+
+def materialize_shift_ids(updaters: List[ShiftUpdater]) -> None:
+    """
+    Materialize the days of the given updaters that only exist as weekday
+    defaults, and fill in their shift_id.
+    """
+    virtual = [upd for upd in updaters if upd.shift_id is None]
+    if not virtual:
+        return
+    workplace = virtual[0].workplace
+    dates = materialize_days(workplace, [upd.date for upd in virtual])
+    shift_ids: Dict[ShiftKey, int] = {}
+    if dates:
+        for shift_id, date, slug in models.Shift.objects.filter(
+            workplace=workplace, date__in=dates
+        ).values_list("id", "date", "slug"):
+            shift_ids[date, slug] = shift_id
+    for upd in virtual:
+        upd.shift_id = shift_ids.get((upd.date, upd.slug))
+
+
+MAX_MATERIALIZE_DAYS = 731
+
+
+def materialize_range(fromdate: datetime.date, untildate: datetime.date) -> int:
+    """
+    Materialize the days from fromdate to untildate (inclusive) and return
+    the number of days that had no Shift rows.
+    """
+    dates = [
+        fromdate + datetime.timedelta(i) for i in range((untildate - fromdate).days + 1)
+    ]
+    workplace = models.Workplace.get_current()
+    materialized = atomic_with_retry(lambda: materialize_days(workplace, dates))
+    caching.invalidate_dates(materialized)
+    return len(materialized)
+
+
+BATCH_RESULTS = ("registered", "unregistered", "unchanged", "closed", "no_such_shift")
+
+
+def update_registrations(
+    worker: models.SessionWorker,
+    register: List[ShiftKey],
+    unregister: List[ShiftKey],
+    now: datetime.datetime,
+) -> Dict[ShiftKey, str]:
+    """
+    Register the worker for the shifts in register and unregister them from
+    the shifts in unregister, with a constant number of queries. Must be
+    called in a transaction. Returns one of BATCH_RESULTS for each shift.
+    """
+    workplace = models.Workplace.get_current()
+    updaters = prepare_shift_updates(workplace, [*register, *unregister])
+    results: Dict[ShiftKey, str] = {}
+    to_register = []
+    for key in dict.fromkeys(register):
+        upd = updaters[key]
+        if any(o["worker_id"] == worker.id for o in upd.old_ones):
+            results[key] = "unchanged"
+        elif not upd.is_registration_open(now):
+            results[key] = "closed"
+        else:
+            to_register.append(upd)
+    materialize_shift_ids(to_register)
+
+    new_worker_shifts = []
+    delete_ids = []
+    changelog = []
+    for upd in to_register:
+        key = upd.date, upd.slug
+        if upd.shift_id is None:
+            results[key] = "no_such_shift"
+            continue
+        order = models.next_order(o["order"] for o in upd.old_ones)
+        new_worker_shifts.append(
+            models.WorkerShift(worker_id=worker.id, shift_id=upd.shift_id, order=order)
+        )
+        results[key] = "registered"
+        old = [o["worker__name"] for o in upd.old_ones]
+        changelog.append(("register", upd, old, old + [worker.name]))
+    for key in dict.fromkeys(unregister):
+        if key in results:
+            # Also in register.
+            continue
+        upd = updaters[key]
+        ex = [o for o in upd.old_ones if o["worker_id"] == worker.id]
+        if not ex:
+            results[key] = "unchanged"
+            continue
+        delete_ids.append(ex[0]["id"])
+        results[key] = "unregistered"
+        old = [o["worker__name"] for o in upd.old_ones]
+        new = [o["worker__name"] for o in upd.old_ones if o["id"] != ex[0]["id"]]
+        changelog.append(("unregister", upd, old, new))
+
+    if delete_ids:
+        unregistered = [u.shift_id for k, u, old, new in changelog if k == "unregister"]
+        models.WorkerShift.objects.filter(id__in=delete_ids).delete()
+        models.WorkerShiftComment.objects.filter(
+            worker_id=worker.id, shift_id__in=unregistered
+        ).delete()
+    models.WorkerShift.objects.bulk_create(new_worker_shifts)
+    models.add_worker_shift_counts(
+        (worker.id, upd.date, 1 if k == "register" else -1)
+        for k, upd, old, new in changelog
+    )
+    if changelog:
+        models.Shift.bump_versions(upd.shift_id for k, upd, old, new in changelog)
+    changelog_buffer.buffer.add_on_commit(
+        [
+            changelog_buffer.changelog_entry(
+                now,
+                kind,
+                {
+                    "workplace": workplace.slug,
+                    "date": str(upd.date),
+                    "shift": upd.slug,
+                    "old": old,
+                    "new": new,
+                },
+                worker_id=worker.id,
+            )
+            for kind, upd, old, new in changelog
+        ]
+    )
+    return results
+
+
+class VersionConflict(Exception):
+    """
+    Some of the shifts were changed since the client loaded them.
+    """
+
+    def __init__(self, keys: List[ShiftKey]) -> None:
+        super().__init__(keys)
+        self.keys = keys
+
+
+def admin_shift_state(upd: ShiftUpdater) -> Dict[str, Any]:
+    return {
+        "date": upd.date.strftime("%Y-%m-%d"),
+        "slug": upd.slug,
+        "version": upd.version,
+        "workers": [
+            {"id": o["worker_id"], "name": o["worker__name"]} for o in upd.old_ones
+        ],
+    }
+
+
+def version_conflict_response(exn: VersionConflict) -> JsonResponse:
+    updaters = prepare_shift_updates(models.Workplace.get_current(), exn.keys)
+    return JsonResponse(
+        {
+            "error": "the shift was changed by someone else",
+            "shifts": [admin_shift_state(updaters[k]) for k in exn.keys],
+        },
+        status=409,
+    )
+
+
+def check_versions(
+    updaters: Dict[ShiftKey, ShiftUpdater], versions: Dict[ShiftKey, int]
+) -> None:
+    stale = [k for k, v in versions.items() if updaters[k].version != v]
+    if stale:
+        raise VersionConflict(stale)
+
+
+def bump_checked_versions(updaters: List[ShiftUpdater]) -> None:
+    """
+    Increment the versions of the given shifts, and raise VersionConflict
+    if a concurrent transaction got there first.
+    """
+    by_id = {upd.shift_id: upd for upd in updaters}
+    if not by_id:
+        return
+    models.Shift.bump_versions(by_id)
+    stale = []
+    for shift_id, version in models.Shift.objects.filter(
+        id__in=list(by_id)
+    ).values_list("id", "version"):
+        upd = by_id[shift_id]
+        if version != upd.version + 1:
+            stale.append((upd.date, upd.slug))
+        upd.version = version
+    if stale:
+        raise VersionConflict(stale)
+
+
+def update_staffing(
+    staffing: Dict[ShiftKey, List[int]],
+    versions: Dict[ShiftKey, int],
+    worker_names: Dict[int, str],
+    user: Optional[User],
+    now: datetime.datetime,
+) -> Dict[ShiftKey, Dict[str, Any]]:
+    """
+    Set the list of worker IDs of each given shift, keeping the common
+    prefix of the old and new lists like ApiShift does, with a constant
+    number of queries. Must be called in a transaction. Raises
+    VersionConflict unless every shift still has the given version.
+    Returns the result ("updated", "unchanged" or "no_such_shift")
+    and the new version of each shift.
+    """
+    workplace = models.Workplace.get_current()
+    updaters = prepare_shift_updates(workplace, staffing.keys())
+    check_versions(updaters, versions)
+    materialize_shift_ids(
+        [u for k, u in updaters.items() if u.shift_id is None and staffing[k]]
+    )
+    results: Dict[ShiftKey, str] = {}
+    delete_ids: List[int] = []
+    new_worker_shifts = []
+    counts: List[Tuple[int, datetime.date, int]] = []
+    changelog = []
+    for key, worker_ids in staffing.items():
+        upd = updaters[key]
+        old_ids = [o["worker_id"] for o in upd.old_ones]
+        if old_ids == worker_ids:
+            results[key] = "unchanged"
+            continue
+        if upd.shift_id is None:
+            results[key] = "no_such_shift"
+            continue
+        to_delete, to_insert = upd.plan_workers(worker_ids)
+        delete_ids += [o["id"] for o in to_delete]
+        new_worker_shifts += to_insert
+        counts += [(o["worker_id"], upd.date, -1) for o in to_delete]
+        counts += [(ws.worker_id, upd.date, 1) for ws in to_insert]
+        results[key] = "updated"
+        changelog.append(
+            (
+                upd,
+                [o["worker__name"] for o in upd.old_ones],
+                [worker_names[w] for w in worker_ids],
+            )
+        )
+    if delete_ids:
+        models.WorkerShift.objects.filter(id__in=delete_ids).delete()
+    models.WorkerShift.objects.bulk_create(new_worker_shifts)
+    models.add_worker_shift_counts(counts)
+    bump_checked_versions([upd for upd, old, new in changelog])
+    changelog_buffer.buffer.add_on_commit(
+        [
+            changelog_buffer.changelog_entry(
+                now,
+                "edit",
+                {
+                    "workplace": workplace.slug,
+                    "date": str(upd.date),
+                    "shift": upd.slug,
+                    "old": old,
+                    "new": new,
+                },
+                user_id=user.id if user is not None else None,
+            )
+            for upd, old, new in changelog
+        ]
+    )
+    return {
+        key: {"result": result, "version": updaters[key].version}
+        for key, result in results.items()
+    }
+
+
+def update_registration(
+    worker: models.SessionWorker, cleaned_data: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Apply the registration form within a transaction
+    and return an error message, or None on success.
+    """
+    date = cleaned_data["date"]
+    slug = cleaned_data["shift"]
+    workplace = models.Workplace.get_current()
+    upd = prepare_shift_update(workplace, date, slug)
+    ex: List[int] = [o["id"] for o in upd.old_ones if o["worker_id"] == worker.id]
+
+    action = cleaned_data["action"]
+    assert action in ("register", "unregister", "registercomment", "savecomment")
+    shift_id: Optional[int] = None
+    if action in ("register", "registercomment"):
+        if ex:
+            return ""
+        if not upd.is_registration_open(timezone.now()):
+            return "Tilmeldingen for denne uge er ikke åben."
+        shift_id = upd.get_or_create_shift_id()
+        if shift_id is None:
+            return "No such shift"
+        order = models.next_order(o["order"] for o in upd.old_ones)
+        ws = models.WorkerShift(worker_id=worker.id, order=order)
+        ws.shift_id = shift_id
+        ws.save()
+        models.add_worker_shift_counts([(worker.id, date, 1)])
+        models.Shift.bump_versions([shift_id])
+
+        upd.create_changelog_entry(
+            "register",
+            worker=worker,
+        )
+    elif action == "unregister":
+        if not ex:
+            return ""
+        models.WorkerShift.objects.filter(id=ex[0]).delete()
+        models.add_worker_shift_counts([(worker.id, date, -1)])
+        assert upd.shift_id
+        models.WorkerShiftComment.objects.filter(
+            worker_id=worker.id,
+            shift_id=upd.shift_id,
+        ).delete()
+        models.Shift.bump_versions([upd.shift_id])
+
+        upd.create_changelog_entry(
+            "unregister",
+            worker=worker,
+        )
+
+    if action in ("registercomment", "savecomment"):
+        new_comment = cleaned_data["owncomment"]
+        assert new_comment is not None
+        if shift_id is None:
+            shift_id = upd.get_or_create_shift_id()
+        if shift_id is None:
+            return "No such shift"
+        try:
+            ex_comment = models.WorkerShiftComment.objects.get(
+                worker_id=worker.id,
+                shift_id=shift_id,
+            )
+        except models.WorkerShiftComment.DoesNotExist:
+            old_comment = ""
+            if old_comment != new_comment:
+                models.WorkerShiftComment.objects.create(
+                    worker_id=worker.id,
+                    shift_id=shift_id,
+                    comment=cleaned_data["owncomment"],
+                )
+        else:
+            old_comment = ex_comment.comment
+            ex_comment_qs = models.WorkerShiftComment.objects.filter(id=ex_comment.id)
+            if old_comment != new_comment and not new_comment:
+                ex_comment_qs.delete()
+            elif old_comment != new_comment:
+                ex_comment_qs.update(comment=new_comment)
+        if old_comment != new_comment:
+            models.Shift.bump_versions([shift_id])
+            models.Changelog.create_now(
+                "comment",
+                {
+                    "workplace": upd.workplace.slug,
+                    "date": str(upd.date),
+                    "shift": upd.slug,
+                    "old": old_comment,
+                    "new": new_comment,
+                },
+                worker=worker,
+            )
+
+    return None
+
+
+BUSY_MESSAGE = "Der er travlt lige nu. Prøv igen om lidt."
+
+
+def register_single(
+    worker: models.SessionWorker, cleaned_data: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Run update_registration through the admission queue in a transaction.
+    Raises admission.QueueFull if the site is too busy.
+    """
+    with admission.registration_queue.admit():
+        form_error = atomic_with_retry(
+            lambda: update_registration(worker, cleaned_data)
+        )
+    if form_error is None:
+        caching.invalidate_dates([cleaned_data["date"]])
+    return form_error
+
+
+def register_batch(
+    worker: models.SessionWorker, register: List[ShiftKey], unregister: List[ShiftKey]
+) -> Dict[ShiftKey, str]:
+    """
+    Run update_registrations through the admission queue in one transaction.
+    Raises admission.QueueFull if the site is too busy.
+    """
+    with admission.registration_queue.admit():
+        results = atomic_with_retry(
+            lambda: update_registrations(worker, register, unregister, timezone.now())
+        )
+    caching.invalidate_dates([date for date, slug in results])
+    return results
+
+
+T = TypeVar("T")
+ATOMIC_ATTEMPTS = 5
+RETRY_UNIQUE_CONSTRAINTS = ("workershift_unique_worker", "workershift_unique_order")
+
+
+def lost_race(e: Exception) -> bool:
+    """
+    Tell whether e means that a concurrent request got there first: a
+    registration that collides on (worker, shift) or (shift, order), or a
+    locked database on SQLite. Any other error would just happen again.
+    """
+    message = str(e)
+    if isinstance(e, OperationalError):
+        return "database is locked" in message
+    opts = models.WorkerShift._meta
+    for constraint in opts.constraints:
+        if constraint.name not in RETRY_UNIQUE_CONSTRAINTS:
+            continue
+        # PostgreSQL names the constraint, SQLite lists its columns.
+        columns = ", ".join(
+            "%s.%s" % (opts.db_table, opts.get_field(f).column)
+            for f in constraint.fields
+        )
+        if constraint.name in message or message.endswith(": " + columns):
+            return True
+    return False
+
+
+def atomic_with_retry(fn: Callable[[], T]) -> T:
+    """
+    Run fn in a transaction. If it loses a race against a concurrent request
+    (see lost_race), roll back and run it again after a short random delay.
+    """
+    for attempt in range(ATOMIC_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                if connection.vendor == "sqlite":
+                    # SQLite fails at once when a read transaction needs to
+                    # become a write transaction while another connection
+                    # writes. Starting with a (no-op) write makes us wait
+                    # for the lock instead, within the busy timeout.
+                    models.Changelog.objects.filter(id=0).update(kind="")
+                return fn()
+        except (IntegrityError, OperationalError) as e:
+            if attempt + 1 == ATOMIC_ATTEMPTS or not lost_race(e):
+                raise
+        time.sleep(random.uniform(0, 0.005 * 2**attempt))
+    raise AssertionError("unreachable")
+
+
+WEEK_SNAPSHOT_TIMEOUT = 7 * 24 * 3600
+MAX_SCHEDULE_WEEKS = 26
+
+
+def mondays_from_range_string(weeks: str) -> Optional[List[datetime.date]]:
+    """
+    Parse a week ("2026w40") or an inclusive range of weeks
+    ("2026w40-2026w47") into the list of Mondays it covers.
+    """
+    first, sep, last = weeks.partition("-")
+    first_monday = monday_from_week_string(first)
+    last_monday = monday_from_week_string(last) if sep else first_monday
+    if first_monday is None or last_monday is None:
+        return None
+    n = 1 + (last_monday - first_monday).days // 7
+    if not 1 <= n <= MAX_SCHEDULE_WEEKS:
+        return None
+    return [first_monday + datetime.timedelta(7 * i) for i in range(n)]
+
+
+def week_range_string(first_monday: datetime.date, last_monday: datetime.date) -> str:
+    first = first_monday.isocalendar()
+    if first_monday == last_monday:
+        return f"{first.year}w{first.week}"
+    last = last_monday.isocalendar()
+    return f"{first.year}w{first.week}-{last.year}w{last.week}"
+
+
+def build_week_snapshots(
+    mondays: List[datetime.date],
+) -> Dict[datetime.date, Dict[str, Any]]:
+    """
+    Compute the part of each week page that is the same for every visitor:
+    the shifts of each day with their registered workers, all comments
+    and the registration windows. Empty days get the weekday defaults.
+    All weeks are loaded with the same constant number of queries.
+    """
+    dates = [m + datetime.timedelta(d) for m in mondays for d in range(7)]
+    shifts_for_date: Dict[datetime.date, List[Any]] = {d: [] for d in dates}
+
+    shift_qs = models.Shift.objects.filter(date__in=dates)
+    shift_qs = shift_qs.order_by("date", "order")
+    shift_by_id = {}
+    for s in shift_qs.values(
+        "id", "date", "name", "slug", "registration_starts", "registration_deadline"
+    ):
+        shift_by_id[s["id"]] = {
+            "id": s["id"],
+            "name": s["name"],
+            "slug": s["slug"],
+            "workers": [],
+            "comments": {},
+            "registration_starts": s["registration_starts"],
+            "registration_deadline": s["registration_deadline"],
+        }
+        shifts_for_date[s["date"]].append(shift_by_id[s["id"]])
+
+    ws_qs = models.WorkerShift.objects.filter(shift_id__in=shift_by_id.keys())
+    ws_qs = ws_qs.order_by("order")
+    for shift_id, worker_id, worker_name in ws_qs.values_list(
+        "shift_id", "worker_id", "worker__name"
+    ):
+        shift_by_id[shift_id]["workers"].append((worker_id, worker_name))
+
+    wsc_qs = models.WorkerShiftComment.objects.filter(shift_id__in=shift_by_id.keys())
+    for shift_id, worker_id, comment in wsc_qs.values_list(
+        "shift_id", "worker_id", "comment"
+    ):
+        shift_by_id[shift_id]["comments"][worker_id] = comment
+
+    workplace = models.Workplace.get_current()
+    workplace_settings = workplace.get_settings()
+    templates = workplace.get_weekday_templates()
+    skip = {d for d in dates if shifts_for_date[d]}
+    for s in templates.range_shifts(min(dates), max(dates), skip=skip):
+        if s.date not in shifts_for_date:
+            continue
+        shifts_for_date[s.date].append(
+            {
+                "id": None,
+                "name": s.name,
+                "slug": s.slug,
+                "workers": [],
+                "comments": {},
+                "registration_starts": s.registration_starts,
+                "registration_deadline": s.registration_deadline,
+            }
+        )
+
+    return {
+        m: {
+            "message_of_the_day": workplace_settings.get("message_of_the_day"),
+            "days": [
+                (d, shifts_for_date[d])
+                for d in (m + datetime.timedelta(i) for i in range(7))
+            ],
+        }
+        for m in mondays
+    }
+
+
+def get_week_snapshots(mondays: List[datetime.date]) -> List[Dict[str, Any]]:
+    global_version, *week_versions = caching.get_week_versions(mondays)
+    versions = {
+        m: "%s:%s" % (global_version, v) for m, v in zip(mondays, week_versions)
+    }
+    keys = {m: "shifts:week:%s:%s" % (m, versions[m]) for m in mondays}
+    cached = cache.get_many(keys.values())
+    snapshots = {m: cached[keys[m]] for m in mondays if keys[m] in cached}
+    missing = [m for m in mondays if m not in snapshots]
+    if missing:
+        built = build_week_snapshots(missing)
+        for m, snapshot in built.items():
+            snapshot["version"] = versions[m]
+        cache.set_many({keys[m]: built[m] for m in missing}, WEEK_SNAPSHOT_TIMEOUT)
+        snapshots.update(built)
+    return [snapshots[m] for m in mondays]
+
+
+def get_registration_openings(
+    start: datetime.datetime, end: datetime.datetime
+) -> List[datetime.datetime]:
+    """
+    Return the distinct times in [start, end) at which registration
+    opens for some shift, materialized or default.
+    """
+    qs = models.Shift.objects.filter(
+        registration_starts__gte=start, registration_starts__lt=end
+    )
+    openings = set(qs.values_list("registration_starts", flat=True))
+    templates = models.Workplace.get_current().get_weekday_templates()
+    openings.update(s.registration_starts for s in templates.opening_shifts(start, end))
+    return sorted(openings)
+
+
+def prewarm_week_snapshots(
+    start: datetime.datetime, end: datetime.datetime
+) -> List[datetime.date]:
+    """
+    Make sure that the snapshots of the weeks whose registration opens
+    in [start, end) are cached, and return their Mondays.
+    """
+    qs = models.Shift.objects.filter(
+        registration_starts__gte=start, registration_starts__lt=end
+    )
+    dates = set(qs.values_list("date", flat=True))
+    templates = models.Workplace.get_current().get_weekday_templates()
+    dates.update(s.date for s in templates.opening_shifts(start, end))
+    mondays = sorted(set(caching.week_monday(d) for d in dates))
+    if mondays:
+        get_week_snapshots(mondays)
+    return mondays
+
+
+def get_request_worker(request) -> Optional[models.SessionWorker]:
+    """
+    Return the worker logged in with the shiftplannerlogin cookie.
+    The cookie is resolved at most once per request.
+    """
+    try:
+        return request.shiftplanner_worker
+    except AttributeError:
+        pass
+    cookie = request.COOKIES.get("shiftplannerlogin", "")
+    request.shiftplanner_worker = models.Worker.get_by_cookie(cookie)
+    return request.shiftplanner_worker
+
+
+class ETagMixin:
+    """
+    Answer GET requests with 304 Not Modified when the client already has
+    the current version of the page, before any of the view code runs.
+    """
+
+    request: Any
+
+    def get_etag(self) -> Optional[str]:
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)  # type: ignore
+        etag = self.get_etag()
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                response["ETag"] = etag
+                patch_vary_headers(response, ["Cookie"])
+                return response
+        response = super().dispatch(request, *args, **kwargs)  # type: ignore
+        if etag is not None and response.status_code == 200:
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Cookie"])
+        return response
+
+
+class ScheduleView(ETagMixin, TemplateView):
     template_name = "shifts/schedule.html"
 
+    def get_etag(self) -> Optional[str]:
+        mondays = mondays_from_range_string(self.kwargs["week"])
+        if mondays is None:
+            return None
+        snapshots = get_week_snapshots(mondays)
+        version = ",".join(snapshot["version"] for snapshot in snapshots)
+        worker = get_request_worker(self.request)
+        if worker is None:
+            return caching.make_etag(
+                version,
+                self.request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+            )
+        # Registration opens and closes without any change to the data,
+        # so the open flags of the week are part of the page version.
+        now = timezone.now()
+        open_flags = "".join(
+            (
+                "1"
+                if is_registration_window_open(
+                    s["registration_starts"], s["registration_deadline"], now
+                )
+                else "0"
+            )
+            for snapshot in snapshots
+            for s_date, day_shifts in snapshot["days"]
+            for s in day_shifts
+        )
+        return caching.make_etag(
+            version,
+            self.request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""),
+            worker.id,
+            worker.name,
+            open_flags,
+        )
+
     def post(self, request, **kwargs):
-        cookie = self.request.COOKIES.get("shiftplannerlogin", "")
-        worker = models.Worker.get_by_cookie_secret(cookie)
+        worker = get_request_worker(self.request)
         if not worker:
             return self.render_to_response(
                 self.get_context_data(**kwargs, form_error="Not logged in")
             )
 
+        if "batchregister" in request.POST or "batchunregister" in request.POST:
+            return self.post_batch(worker, **kwargs)
+
         form = forms.RegisterForm(data=self.request.POST)
         if not form.is_valid():
             return self.render_to_response(
                 self.get_context_data(**kwargs, form_error=str(form.errors))
             )
-        date = form.cleaned_data["date"]
-        slug = form.cleaned_data["shift"]
-        workplace = models.Workplace.objects.all()[:1][0]
-        upd = prepare_shift_update(workplace, date, slug)
-        ex: List[int] = [o["id"] for o in upd.old_ones if o["worker_id"] == worker.id]
-
-        action = form.cleaned_data["action"]
-        assert action in ("register", "unregister", "registercomment", "savecomment")
-        shift_id: Optional[int] = None
-        if action in ("register", "registercomment"):
-            if ex:
-                return self.render_to_response(
-                    self.get_context_data(**kwargs, form_error="")
-                )
-            if not upd.is_registration_open(timezone.now()):
-                return self.render_to_response(
-                    self.get_context_data(
-                        **kwargs, form_error="Tilmeldingen for denne uge er ikke åben."
-                    )
-                )
-            shift_id = upd.get_or_create_shift_id()
-            if shift_id is None:
-                return self.render_to_response(
-                    self.get_context_data(**kwargs, form_error="No such shift")
-                )
-            if upd.old_ones:
-                order = 1 + max(o["order"] for o in upd.old_ones)
-            else:
-                order = 1
-            ws = models.WorkerShift(worker=worker, order=order)
-            ws.shift_id = shift_id
-            ws.save()
-
-            upd.create_changelog_entry(
-                "register",
-                worker=worker,
+        try:
+            form_error = register_single(worker, form.cleaned_data)
+        except admission.QueueFull:
+            return self.render_to_response(
+                self.get_context_data(**kwargs, form_error=BUSY_MESSAGE), status=503
             )
-        elif action == "unregister":
-            if not ex:
-                return self.render_to_response(
-                    self.get_context_data(**kwargs, form_error="")
-                )
-            models.WorkerShift.objects.filter(id=ex[0]).delete()
-            assert upd.shift_id
-            models.WorkerShiftComment.objects.filter(
-                worker=worker,
-                shift_id=upd.shift_id,
-            ).delete()
-
-            upd.create_changelog_entry(
-                "unregister",
-                worker=worker,
+        if form_error is not None:
+            return self.render_to_response(
+                self.get_context_data(**kwargs, form_error=form_error)
             )
+        return HttpResponseRedirect(self.request.path)
 
-        if action in ("registercomment", "savecomment"):
-            new_comment = form.cleaned_data["owncomment"]
-            assert new_comment is not None
-            if shift_id is None:
-                shift_id = upd.get_or_create_shift_id()
-            if shift_id is None:
-                return self.render_to_response(
-                    self.get_context_data(**kwargs, form_error="No such shift")
-                )
-            try:
-                ex_comment = models.WorkerShiftComment.objects.get(
-                    worker=worker,
-                    shift_id=shift_id,
-                )
-            except models.WorkerShiftComment.DoesNotExist:
-                old_comment = ""
-                if old_comment != new_comment:
-                    models.WorkerShiftComment.objects.create(
-                        worker=worker,
-                        shift_id=shift_id,
-                        comment=form.cleaned_data["owncomment"],
-                    )
+    def post_batch(self, worker: models.SessionWorker, **kwargs):
+        form = forms.BatchRegisterForm(data=self.request.POST)
+        if not form.is_valid():
+            return self.render_to_response(
+                self.get_context_data(**kwargs, form_error=str(form.errors))
+            )
+        shifts = form.cleaned_data["shifts"]
+        try:
+            if form.cleaned_data["action"] == "register":
+                results = register_batch(worker, shifts, [])
             else:
-                old_comment = ex_comment.comment
-                ex_comment_qs = models.WorkerShiftComment.objects.filter(
-                    id=ex_comment.id
-                )
-                if old_comment != new_comment and not new_comment:
-                    ex_comment_qs.delete()
-                elif old_comment != new_comment:
-                    ex_comment_qs.update(comment=new_comment)
-            if old_comment != new_comment:
-                models.Changelog.create_now(
-                    "comment",
-                    {
-                        "workplace": upd.workplace.slug,
-                        "date": str(upd.date),
-                        "shift": upd.slug,
-                        "old": old_comment,
-                        "new": new_comment,
-                    },
-                    worker=worker,
+                results = register_batch(worker, [], shifts)
+        except admission.QueueFull:
+            return self.render_to_response(
+                self.get_context_data(**kwargs, form_error=BUSY_MESSAGE), status=503
+            )
+        closed = [k for k, r in results.items() if r in ("closed", "no_such_shift")]
+        if closed:
+            return self.render_to_response(
+                self.get_context_data(
+                    **kwargs,
+                    form_error="Tilmeldingen er ikke åben for: %s"
+                    % ", ".join(
+                        "%s %s" % (slug, date) for date, slug in sorted(closed)
+                    ),
                 )
-
+            )
         return HttpResponseRedirect(self.request.path)
 
     def get_context_data(self, **kwargs):
-        cookie = self.request.COOKIES.get("shiftplannerlogin", "")
-        worker = models.Worker.get_by_cookie_secret(cookie)
+        worker = get_request_worker(self.request)
 
-        monday = monday_from_week_string(kwargs["week"])
-        if monday is None:
+        mondays = mondays_from_range_string(kwargs["week"])
+        if mondays is None:
             raise Http404
-        dates = [monday + datetime.timedelta(d) for d in range(7)]
 
-        prev_monday = (dates[0] - datetime.timedelta(7)).isocalendar()
-        prev_url = f"../{prev_monday.year}w{prev_monday.week}/"
-        next_monday = (dates[0] + datetime.timedelta(7)).isocalendar()
-        next_url = f"../{next_monday.year}w{next_monday.week}/"
+        step = datetime.timedelta(7 * len(mondays))
+        prev_url = "../%s/" % week_range_string(mondays[0] - step, mondays[-1] - step)
+        next_url = "../%s/" % week_range_string(mondays[0] + step, mondays[-1] + step)
 
-        shifts_for_date = {d: [] for d in dates}
-        weekdays = [{"date": d, "shifts": shifts_for_date[d]} for d in dates]
-
-        shift_qs = models.Shift.objects.filter(date__in=dates)
-        shift_qs = shift_qs.order_by("date", "order")
-        shift_id_to_worker_list = {}
-        for s in shift_qs.values("id", "date", "name", "slug", "settings"):
-            s_id = s.pop("id")
-            s_date = s.pop("date")
-            s["workers"] = []
-            shift_id_to_worker_list[s_id] = s
-            shifts_for_date[s_date].append(s)
-
-        ws_qs = models.WorkerShift.objects.filter(
-            shift_id__in=shift_id_to_worker_list.keys()
-        )
-        ws_qs = ws_qs.values_list("shift_id", "worker_id", "worker__name")
         my_id = worker.id if worker else None
-        ws_qs = ws_qs.order_by("order")
-        for shift_id, worker_id, worker_name in ws_qs:
-            me = my_id == worker_id
-            shift_id_to_worker_list[shift_id]["workers"].append(
-                {"me": me, "name": worker_name}
-            )
-            if me:
-                shift_id_to_worker_list[shift_id]["me"] = True
-
-        wsc_qs = (
-            models.WorkerShiftComment.objects.filter(
-                worker=worker, shift_id__in=shift_id_to_worker_list.keys()
-            )
-            if worker
-            else models.WorkerShiftComment.objects.none()
-        )
-        for shift_id, comment in wsc_qs.values_list("shift_id", "comment"):
-            shift_id_to_worker_list[shift_id]["own_comment"] = comment
-
-        workplace_settings = json.loads(
-            models.Workplace.objects.values_list("settings", flat=True)[:1][0]
-        )
-        for s_date in shifts_for_date:
-            if shifts_for_date[s_date]:
-                continue
-            for s in models.day_shifts_for_settings(s_date, workplace_settings):
-                shifts_for_date[s_date].append(
-                    {
-                        "name": s.name,
-                        "slug": s.slug,
-                        "workers": [],
-                        "settings": s.settings,
+        now = timezone.now()
+        snapshots = get_week_snapshots(mondays)
+        weeks = []
+        for monday, snapshot in zip(mondays, snapshots):
+            weekdays = []
+            for s_date, day_shifts in snapshot["days"]:
+                shifts = []
+                for s in day_shifts:
+                    shift = {
+                        "name": s["name"],
+                        "slug": s["slug"],
+                        "workers": [
+                            {"me": worker_id == my_id, "name": worker_name}
+                            for worker_id, worker_name in s["workers"]
+                        ],
                     }
-                )
-
-        if worker:
-            now = timezone.now()
-            for s in (s for ss in shifts_for_date.values() for s in ss):
-                s_settings = json.loads(s.pop("settings"))
-                s["open"] = compute_is_registration_open(s_settings, now)
-        year, weekno, _ = monday.isocalendar()
+                    if worker:
+                        shift["me"] = any(w["me"] for w in shift["workers"])
+                        shift["own_comment"] = s["comments"].get(my_id, "")
+                        shift["open"] = is_registration_window_open(
+                            s["registration_starts"], s["registration_deadline"], now
+                        )
+                    shifts.append(shift)
+                weekdays.append({"date": s_date, "shifts": shifts})
+            year, weekno, _ = monday.isocalendar()
+            weeks.append({"week": weekno, "year": year, "weekdays": weekdays})
+        if len(weeks) == 1:
+            title = "Uge %(week)s, %(year)s" % weeks[0]
+        else:
+            title = "Uge %s, %s – uge %s, %s" % (
+                weeks[0]["week"],
+                weeks[0]["year"],
+                weeks[-1]["week"],
+                weeks[-1]["year"],
+            )
         return {
-            "message_of_the_day": workplace_settings.get("message_of_the_day"),
+            "message_of_the_day": snapshots[0]["message_of_the_day"],
             "form_error": kwargs.get("form_error"),
             "worker": worker,
             "next": next_url,
             "prev": prev_url,
-            "week": weekno,
-            "year": year,
-            "weekdays": weekdays,
+            "title": title,
+            "weeks": weeks,
         }
 
 
+class OpenShiftListView(TemplateView):
+    template_name = "shifts/open_shift_list.html"
+
+    def get_context_data(self):
+        now = timezone.now()
+        qs = models.Shift.objects.filter(
+            registration_starts__lt=now, registration_deadline__gt=now
+        )
+        qs = qs.values_list("date", "order", "name", "registration_deadline")
+        shifts = [
+            {"date": d, "order": o, "name": n, "registration_deadline": dl}
+            for d, o, n, dl in qs
+        ]
+        templates = models.Workplace.get_current().get_weekday_templates()
+        date_range = templates.open_date_range(now)
+        if date_range is not None:
+            materialized = set(
+                models.Shift.objects.filter(date__range=date_range).values_list(
+                    "date", flat=True
+                )
+            )
+            shifts += [
+                {
+                    "date": s.date,
+                    "order": s.order,
+                    "name": s.name,
+                    "registration_deadline": s.registration_deadline,
+                }
+                for s in templates.open_shifts(now, skip=materialized)
+            ]
+        shifts.sort(key=lambda s: (s["date"], s["order"]))
+        for s in shifts:
+            iso = s["date"].isocalendar()
+            s["link"] = f"/s/{iso.year}w{iso.week}/"
+        return {"shifts": shifts}
+
+
+class ApiWorkerRegistration(View):
+    """
+    JSON version of the batch registration on the schedule page for the
+    logged in worker: POST {"register": [{"date": "YYYY-MM-DD", "shift": slug},
+    ...], "unregister": [...]}.
+    """
+
+    def post(self, request):
+        worker = get_request_worker(request)
+        if worker is None:
+            return JsonResponse({"error": "not logged in"}, status=403)
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+            register, unregister = [
+                [
+                    (
+                        datetime.datetime.strptime(o["date"], "%Y-%m-%d").date(),
+                        str(o["shift"]),
+                    )
+                    for o in data.get(k) or []
+                ]
+                for k in ("register", "unregister")
+            ]
+        except Exception:
+            return JsonResponse(
+                {"error": "expected JSON body with register and unregister lists"},
+                status=400,
+            )
+        if len(register) + len(unregister) > forms.BatchRegisterForm.MAX_SHIFTS:
+            return JsonResponse({"error": "too many shifts"}, status=400)
+        try:
+            results = register_batch(worker, register, unregister)
+        except admission.QueueFull:
+            return JsonResponse({"error": "busy, try again"}, status=503)
+        return JsonResponse(
+            {
+                "ok": True,
+                "results": [
+                    {"date": date.strftime("%Y-%m-%d"), "shift": slug, "result": r}
+                    for (date, slug), r in results.items()
+                ],
+            }
+        )
+
+
+def get_shift_state(
+    worker: models.SessionWorker, date: datetime.date, slug: str
+) -> Dict[str, Any]:
+    """
+    Return what the schedule page shows the worker about one shift,
+    without loading the rest of the week.
+    """
+    upd = prepare_shift_update(models.Workplace.get_current(), date, slug)
+    workers = [
+        {"name": o["worker__name"], "me": o["worker_id"] == worker.id}
+        for o in upd.old_ones
+    ]
+    own_comment = ""
+    if upd.shift_id is not None:
+        own_comment = (
+            models.WorkerShiftComment.objects.filter(
+                worker_id=worker.id, shift_id=upd.shift_id
+            )
+            .values_list("comment", flat=True)
+            .first()
+        ) or ""
+    return {
+        "date": date.strftime("%Y-%m-%d"),
+        "slug": slug,
+        "workers": workers,
+        "me": any(w["me"] for w in workers),
+        "open": upd.is_registration_open(timezone.now()),
+        "own_comment": own_comment,
+    }
+
+
+class ApiWorkerShiftRegistration(View):
+    """
+    JSON version of the single-shift actions on the schedule page: POST
+    {"action": "register" | "unregister" | "savecomment" | "registercomment",
+    "comment": "..."} and get back the new state of the shift.
+    """
+
+    def post(self, request, **kwargs):
+        worker = get_request_worker(request)
+        if worker is None:
+            return JsonResponse({"error": "not logged in"}, status=403)
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+            form = forms.RegisterForm(
+                data={
+                    "action": data["action"],
+                    "date": kwargs["date"],
+                    "shift": kwargs["slug"],
+                    "owncomment": data.get("comment", ""),
+                }
+            )
+        except Exception:
+            return JsonResponse(
+                {"error": "expected JSON body with an action"}, status=400
+            )
+        if not form.is_valid():
+            return JsonResponse({"error": str(form.errors)}, status=400)
+        try:
+            form_error = register_single(worker, form.cleaned_data)
+        except admission.QueueFull:
+            return JsonResponse({"error": BUSY_MESSAGE}, status=503)
+        shift = get_shift_state(
+            worker, form.cleaned_data["date"], form.cleaned_data["shift"]
+        )
+        if form_error == "":
+            # Already done, e.g. after a double tap or in another tab.
+            return JsonResponse({"ok": True, "result": "unchanged", "shift": shift})
+        if form_error is not None:
+            return JsonResponse({"error": form_error, "shift": shift}, status=400)
+        return JsonResponse({"ok": True, "shift": shift})
+
+
 class WorkerShiftListView(TemplateView):
     template_name = "shifts/worker_shift_list.html"
 
@@ -380,9 +1244,8 @@ class WorkerShiftListView(TemplateView):
         except (ValueError, models.Worker.DoesNotExist):
             raise Http404
 
-    def get_worker_self(self) -> Optional[models.Worker]:
-        cookie = self.request.COOKIES.get("shiftplannerlogin", "")
-        return models.Worker.get_by_cookie_secret(cookie)
+    def get_worker_self(self) -> Optional[models.SessionWorker]:
+        return get_request_worker(self.request)
 
     def get(self, *args, **kwargs):
         self.worker_admin = self.get_worker_admin()
@@ -394,7 +1257,7 @@ class WorkerShiftListView(TemplateView):
         return super().get(*args, **kwargs)
 
     def get_context_data(self):
-        qs = models.WorkerShift.objects.filter(worker=self.worker)
+        qs = models.WorkerShift.objects.filter(worker_id=self.worker.id)
         qs = qs.values_list("shift__date", "shift__order", "shift__name", "order")
         shifts = []
         for shift_date, shift_order, shift_name, order in qs:
@@ -411,7 +1274,7 @@ class WorkerShiftListView(TemplateView):
                     "comment": None,
                 }
             )
-        qs_wsc = models.WorkerShiftComment.objects.filter(worker=self.worker)
+        qs_wsc = models.WorkerShiftComment.objects.filter(worker_id=self.worker.id)
         qs_wsc = qs_wsc.values_list(
             "shift__date", "shift__order", "shift__name", "comment"
         )
@@ -458,7 +1321,7 @@ class WorkerLoginView(FormView):
         resp = HttpResponseRedirect("/")
         resp.set_cookie(
             "shiftplannerlogin",
-            worker.get_or_save_cookie_secret(),
+            worker.get_session_cookie(),
             max_age=60 * 24 * 3600 if form.cleaned_data["remember_me"] else None,
             secure=True,
             httponly=True,
@@ -476,8 +1339,7 @@ class WorkerLogoutView(TemplateView):
     template_name = "shifts/worker_logout.html"
 
     def post(self, request):
-        cookie = self.request.COOKIES.get("shiftplannerlogin", "")
-        worker = models.Worker.get_by_cookie_secret(cookie)
+        worker = get_request_worker(request)
 
         resp = HttpResponseRedirect("/")
         resp.delete_cookie(
@@ -657,6 +1519,10 @@ class ApiWorker(ApiMixin, View):
                     {"error": "En anden vagttager har denne emailadresse"}
                 )
         qs.update(**changed)
+        models.Worker.invalidate_sessions([id])
+        # The schedule shows names, and the print view phone and email too.
+        if changed.keys() & {"name", "phone", "email"}:
+            caching.invalidate_all()
         models.Changelog.create_now(
             "edit_worker",
             {
@@ -671,7 +1537,7 @@ class ApiWorker(ApiMixin, View):
 
 class ApiWorkerShiftDataDelete(ApiMixin, View):
     def get(self, request):
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         workplace_settings = workplace.get_settings()
         if "retain_weeks" not in workplace_settings:
             return JsonResponse(
@@ -722,7 +1588,7 @@ class ApiWorkerShiftDataDelete(ApiMixin, View):
                 },
                 status=400,
             )
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         shifts = models.Shift.objects.filter(workplace=workplace, date__lt=before)
         qs = models.WorkerShift.objects.filter(shift__in=shifts)
         qsc = models.WorkerShiftComment.objects.filter(shift__in=shifts)
@@ -731,12 +1597,12 @@ class ApiWorkerShiftDataDelete(ApiMixin, View):
                 {"error": "stale info for counts, please try again"},
                 status=400,
             )
-        *prep, add_counts = models.prepare_update_worker_shift_aggregate_count()
-        models.do_update_worker_shift_aggregate_count(add_counts)
+        # The aggregate counts are kept, as the history of the deleted rows.
+        models.Shift.bump_versions(shifts.values("id"))
         actual_shifts_count = qs.delete()
         actual_comments_count = qsc.delete()
+        caching.invalidate_all()
         debug_data = {
-            "prep": prep,
             "shifts": actual_shifts_count,
             "comments": actual_comments_count,
         }
@@ -796,24 +1662,24 @@ class ApiWorkerDelete(ApiMixin, View):
                     },
                     status=400,
                 )
-        *prep, add_counts = models.prepare_update_worker_shift_aggregate_count()
-        models.do_update_worker_shift_aggregate_count(add_counts)
+        # The workers' aggregate counts are kept with worker=None.
         del_count = qs.delete()
-        debug_data = {"prep": prep, "del_count": del_count, "missing": sorted(missing)}
+        models.Worker.invalidate_sessions(worker_data.keys())
+        caching.invalidate_all()
+        debug_data = {"del_count": del_count, "missing": sorted(missing)}
         return JsonResponse({"ok": True, "debug": debug_data})
 
 
-class ApiWorkerStats(ApiMixin, View):
-    def get(self, request):
-        return JsonResponse({"workers": models.get_worker_stats()})
-
-
 class ApiWorkplace(ApiMixin, View):
     def get(self, request):
-        fields = ["id", "slug", "name", "settings"]
-        workplace = models.Workplace.objects.values(*fields).order_by("id")[:1][0]
-        workplace["settings"] = json.loads(workplace["settings"])
-        return JsonResponse({"rows": [workplace]})
+        workplace = models.Workplace.get_current()
+        row = {
+            "id": workplace.id,
+            "slug": workplace.slug,
+            "name": workplace.name,
+            "settings": workplace.get_settings(),
+        }
+        return JsonResponse({"rows": [row]})
 
     def post(self, request):
         id, settings_str = models.Workplace.objects.values_list(
@@ -840,6 +1706,7 @@ class ApiWorkplace(ApiMixin, View):
         if not changed:
             return JsonResponse({"ok": True, "debug": {"noop": True}})
         models.Workplace.objects.filter(id=id).update(settings=json.dumps(combined))
+        models.Workplace.invalidate_current()
         models.Changelog.create_now(
             "edit_workplace_settings",
             {
@@ -875,6 +1742,16 @@ class WeekFilterMixin:
                 ).date()
             except ValueError:
                 raise ValueError("bad untildate")
+        if "fromweek" in self.request.GET:
+            from_monday = monday_from_week_string(self.request.GET["fromweek"])
+            if from_monday is None:
+                raise ValueError("bad fromweek")
+            fromdate = from_monday
+        if "untilweek" in self.request.GET:
+            until_monday = monday_from_week_string(self.request.GET["untilweek"])
+            if until_monday is None:
+                raise ValueError("bad untilweek")
+            untildate = until_monday + datetime.timedelta(6)
         if "week" in self.request.GET:
             monday = monday_from_week_string(self.request.GET["week"])
             if monday is None:
@@ -885,7 +1762,69 @@ class WeekFilterMixin:
         return fromdate, untildate, monday
 
 
-class ApiShiftList(ApiMixin, View, WeekFilterMixin):
+class ApiWorkerStats(ApiMixin, View, WeekFilterMixin):
+    FILTERS = (
+        "granularity",
+        "workers",
+        "active",
+        "fromdate",
+        "untildate",
+        "fromweek",
+        "untilweek",
+        "week",
+    )
+
+    def get(self, request):
+        if not any(k in request.GET for k in self.FILTERS):
+            return JsonResponse({"workers": models.get_worker_stats()})
+        # Counts per period, computed in the database.
+        granularity = request.GET.get("granularity", "month")
+        if granularity not in models.STATS_PERIODS:
+            return JsonResponse(
+                {
+                    "error": "granularity must be one of %s"
+                    % ", ".join(models.STATS_PERIODS)
+                },
+                status=400,
+            )
+        try:
+            fromdate, untildate, monday = self.get_week_filter()
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        worker_ids: Optional[List[int]] = None
+        if "workers" in request.GET:
+            try:
+                worker_ids = [int(w) for w in request.GET["workers"].split(",") if w]
+            except ValueError:
+                return JsonResponse({"error": "bad workers"}, status=400)
+        active_only = request.GET.get("active") in ("1", "true")
+        return JsonResponse(
+            {
+                "granularity": granularity,
+                "workers": models.get_worker_period_stats(
+                    granularity, fromdate, untildate, worker_ids, active_only
+                ),
+            }
+        )
+
+
+class ApiShiftList(ApiMixin, ETagMixin, View, WeekFilterMixin):
+    def get_etag(self) -> Optional[str]:
+        try:
+            fromdate, untildate, monday = self.get_week_filter()
+        except ValueError:
+            return None
+        if fromdate is None or untildate is None or fromdate > untildate:
+            return None
+        first_monday = caching.week_monday(fromdate)
+        weeks = 1 + (untildate - first_monday).days // 7
+        if weeks > 60:
+            return None
+        mondays = [first_monday + datetime.timedelta(7 * i) for i in range(weeks)]
+        return caching.make_etag(
+            fromdate, untildate, *caching.get_week_versions(mondays)
+        )
+
     def add_default_shifts(
         self,
         shifts_db: List[Any],
@@ -894,9 +1833,7 @@ class ApiShiftList(ApiMixin, View, WeekFilterMixin):
     ) -> None:
         assert fromdate is None or isinstance(fromdate, datetime.date)
         assert untildate is None or isinstance(untildate, datetime.date)
-        workplace_settings = json.loads(
-            models.Workplace.objects.values_list("settings", flat=True)[:1][0]
-        )
+        templates = models.Workplace.get_current().get_weekday_templates()
         seen_dates: Set[datetime.date] = set(row["date"] for row in shifts_db)
         if fromdate is None:
             if not seen_dates:
@@ -908,21 +1845,18 @@ class ApiShiftList(ApiMixin, View, WeekFilterMixin):
                 return
             untildate = max(seen_dates)
             untildate += datetime.timedelta(6 - untildate.weekday())
-        for i in range(1 + (untildate - fromdate).days):
-            d = fromdate + datetime.timedelta(i)
-            if d in seen_dates:
-                continue
-            for s in models.day_shifts_for_settings(d, workplace_settings):
-                shifts_db.append(
-                    {
-                        "id": None,
-                        "date": d,
-                        "order": s.order,
-                        "slug": s.slug,
-                        "name": s.name,
-                        "settings": s.settings,
-                    }
-                )
+        for s in templates.range_shifts(fromdate, untildate, skip=seen_dates):
+            shifts_db.append(
+                {
+                    "id": None,
+                    "date": s.date,
+                    "order": s.order,
+                    "slug": s.slug,
+                    "name": s.name,
+                    "settings": s.settings,
+                    "version": 0,
+                }
+            )
 
     def get(self, request):
         qs = models.Shift.objects.all()
@@ -942,14 +1876,38 @@ class ApiShiftList(ApiMixin, View, WeekFilterMixin):
         wsc_qs = models.WorkerShiftComment.objects.filter(shift__in=qs)
         wsc_db = wsc_qs.values_list("shift_id", "worker_id", "comment")
         wsc_db = wsc_db.order_by("shift_id")
-        shifts_db = list(qs.values("id", "date", "order", "slug", "name", "settings"))
+        shifts_db = [
+            {
+                "id": row["id"],
+                "date": row["date"],
+                "order": row["order"],
+                "slug": row["slug"],
+                "name": row["name"],
+                "settings": models.shift_settings(
+                    row["settings"],
+                    row["registration_starts"],
+                    row["registration_deadline"],
+                ),
+                "version": row["version"],
+            }
+            for row in qs.values(
+                "id",
+                "date",
+                "order",
+                "slug",
+                "name",
+                "settings",
+                "version",
+                "registration_starts",
+                "registration_deadline",
+            )
+        ]
         self.add_default_shifts(shifts_db, fromdate, untildate)
         shifts_db.sort(key=lambda s: (s["date"], s["order"]))
         shifts_json = [
             {
                 **row,
                 "date": row["date"].strftime("%Y-%m-%d"),
-                "settings": json.loads(row["settings"]),
                 "workers": [],
                 "comments": [],
             }
@@ -973,91 +1931,171 @@ class ApiShiftList(ApiMixin, View, WeekFilterMixin):
         return JsonResponse(result)
 
     def post(self, request):
-        workplace = models.Workplace.objects.all()[:1][0]
         try:
             data = json.loads(request.body.decode("utf-8"))
+            materialize = [
+                datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+                for date_str in data.get("materializeDays") or []
+            ]
+            modified = {
+                datetime.datetime.strptime(date_str, "%Y-%m-%d").date(): shifts
+                for date_str, shifts in (data.get("modifiedDays") or {}).items()
+            }
         except Exception:
             return JsonResponse({"error": "expected JSON body"}, status=400)
-        materialize = [
-            datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-            for date_str in data.get("materializeDays") or []
-        ]
-        if materialize:
-            materialize = sorted(
-                set(materialize)
-                - set(
-                    models.Shift.objects.filter(
-                        workplace=workplace,
-                        date__in=sorted(set(materialize)),
-                    )
-                    .values_list("date", flat=True)
-                    .distinct()
+        try:
+            response = atomic_with_retry(
+                lambda: self.update_days(
+                    models.Workplace.get_current(), materialize, modified
                 )
             )
-        new_shifts = []
-        if materialize:
-            workplace_settings = workplace.get_settings()
-            for date in materialize:
-                new_shifts += models.day_shifts_for_settings(
-                    date, workplace_settings, workplace
-                )
-            for s in new_shifts:
-                s.save()
+        except IntegrityError:
+            # Duplicate names are rejected in update_days, so this is a
+            # concurrent change that kept winning.
+            return JsonResponse(
+                {"error": "the shifts were changed at the same time; try again"},
+                status=409,
+            )
+        if response.status_code == 200:
+            caching.invalidate_dates([*materialize, *modified])
+        return response
+
+    def update_days(
+        self,
+        workplace: models.Workplace,
+        materialize: List[datetime.date],
+        modified: Dict[datetime.date, List[Dict[str, Any]]],
+    ) -> JsonResponse:
+        timings: Dict[str, float] = {}
+        t = time.perf_counter()
+
+        def lap(name: str) -> None:
+            nonlocal t
+            now = time.perf_counter()
+            timings[name] = round(1000 * (now - t), 3)
+            t = now
+
+        materialized = materialize_days(workplace, materialize)
+        lap("materialize_ms")
+
+        ex_by_date: Dict[datetime.date, List[models.Shift]] = {d: [] for d in modified}
+        if modified:
+            for e in models.Shift.objects.filter(
+                workplace=workplace, date__in=sorted(modified)
+            ).order_by("date", "order"):
+                ex_by_date[e.date].append(e)
+        lap("load_ms")
+
         delete = []
         update = []
         update_reorder = []
         insert = []
-        for date_str, shifts in (data.get("modifiedDays") or {}).items():
-            date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-            ex = list(
-                models.Shift.objects.filter(
-                    workplace=workplace,
-                    date=date,
-                ).order_by("order")
-            )
-            settings = ex[0].settings if ex else "{}"
+        changed: List[models.Shift] = []
+        renamed: List[models.Shift] = []
+        for date, shifts in modified.items():
+            ex = ex_by_date[date]
+            if ex:
+                settings = (
+                    ex[0].settings,
+                    ex[0].registration_starts,
+                    ex[0].registration_deadline,
+                )
+            else:
+                settings = ("{}", None, None)
             dupe_order = len(set(e.order for e in ex)) != len(ex)
+            ex_by_id = {e.id: e for e in ex}
             ex_ids = [e.id for e in ex]
             new_ids = [e.get("id") for e in shifts]
             new_ids_set = set(new_ids)
+            unknown = new_ids_set - set(ex_ids) - {None}
+            if unknown:
+                transaction.set_rollback(True)
+                return JsonResponse(
+                    {"error": f"no such shift on {date}: {sorted(unknown)}"},
+                    status=400,
+                )
+            if len(set(s["name"] for s in shifts)) != len(shifts):
+                transaction.set_rollback(True)
+                return JsonResponse(
+                    {"error": f"shift names on {date} must be distinct"},
+                    status=400,
+                )
             for e in ex:
                 if e.id not in new_ids_set:
                     delete.append(e.id)
-            if dupe_order or ex_ids != new_ids:
-                for i, s in enumerate(shifts, 1):
-                    s_id = s.get("id")
-                    if s_id is None:
-                        insert.append((date, i, s["name"], settings))
-                    else:
-                        update_reorder.append((s_id, i, s["name"]))
-            else:
-                for s in enumerate(shifts, 1):
-                    s_id = s.get("id")
-                    assert s_id is not None
-                    update.append((s_id, s["name"]))
-        delete = sorted(
-            set(delete)
-            - set(
-                models.WorkerShift.objects.filter(shift_id__in=delete)
-                .values_list("shift_id", flat=True)
-                .distinct()
+            keys = [s.get("id") or ("new", i) for i, s in enumerate(shifts)]
+            orders = models.sparse_orders(
+                [] if dupe_order else [(e.id, e.order) for e in ex], keys
             )
+            for key, s in zip(keys, shifts):
+                if s.get("id") is None:
+                    insert.append((date, orders[key], s["name"], settings))
+                    continue
+                e = ex_by_id[key]
+                if e.order != orders[key]:
+                    update_reorder.append((e.id, orders[key], s["name"]))
+                else:
+                    update.append((e.id, s["name"]))
+                if (e.name, e.slug, e.order) != (s["name"], s["name"], orders[key]):
+                    if e.slug != s["name"]:
+                        renamed.append(e)
+                    e.name = e.slug = s["name"]
+                    e.order = orders[key]
+                    changed.append(e)
+        kept = set(
+            models.WorkerShift.objects.filter(shift_id__in=delete)
+            .values_list("shift_id", flat=True)
+            .distinct()
         )
+        for date, ex in ex_by_date.items():
+            names = set(s["name"] for s in modified[date])
+            for e in ex:
+                if e.id in kept and e.slug in names:
+                    # Checked here rather than left to the unique
+                    # constraint, which atomic_with_retry would retry.
+                    transaction.set_rollback(True)
+                    return JsonResponse(
+                        {
+                            "error": f"shift {e.name} on {date} has workers, "
+                            f"so it is kept and its name cannot be reused"
+                        },
+                        status=400,
+                    )
+        delete = sorted(set(delete) - kept)
         if delete:
             models.Shift.objects.filter(id__in=delete).delete()
-        for date, order, name, settings in insert:
-            models.Shift.objects.create(
-                workplace=workplace,
-                date=date,
-                order=order,
-                slug=name,
-                name=name,
-                settings=settings,
+        lap("delete_ms")
+        if renamed:
+            # Free the old slugs first, so that shifts can swap names
+            # without violating the unique constraint.
+            models.Shift.objects.bulk_update(
+                [models.Shift(id=e.id, slug="~%s" % e.id) for e in renamed],
+                ["slug"],
+                batch_size=500,
+            )
+        models.Shift.objects.bulk_update(
+            changed, ["name", "slug", "order"], batch_size=500
+        )
+        lap("update_ms")
+        new_shifts = []
+        for date, order, name, (settings, starts, deadline) in insert:
+            isoyearweek, yearmonth = models.isoyearweek_yearmonth(date)
+            new_shifts.append(
+                models.Shift(
+                    workplace=workplace,
+                    date=date,
+                    isoyearweek=isoyearweek,
+                    yearmonth=yearmonth,
+                    order=order,
+                    slug=name,
+                    name=name,
+                    settings=settings,
+                    registration_starts=starts,
+                    registration_deadline=deadline,
+                )
             )
-        for id, order, name in update_reorder:
-            models.Shift.objects.filter(id=id).update(name=name, slug=name, order=order)
-        for id, name in update:
-            models.Shift.objects.filter(id=id).update(name=name, slug=name)
+        models.Shift.objects.bulk_create(new_shifts, batch_size=500)
+        lap("insert_ms")
         return JsonResponse(
             {
                 "ok": True,
@@ -1066,7 +2104,8 @@ class ApiShiftList(ApiMixin, View, WeekFilterMixin):
                     "update": update,
                     "update_reorder": update_reorder,
                     "delete": delete,
-                    "new_shifts": len(new_shifts),
+                    "materialized_days": len(materialized),
+                    "timings": timings,
                 },
             },
             status=200,
@@ -1078,14 +2117,9 @@ class ApiShift(ApiMixin, View):
         date_str: str = kwargs["date"]
         slug: str = kwargs["slug"]
         try:
-            date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
+            date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             raise Http404
-        workplace = models.Workplace.objects.all()[:1][0]
-        upd = prepare_shift_update(workplace, date, slug)
-        shift_id = upd.get_or_create_shift_id()
-        if shift_id is None:
-            raise Http404
         try:
             data = json.loads(request.body.decode("utf-8"))
         except Exception:
@@ -1096,29 +2130,40 @@ class ApiShift(ApiMixin, View):
             return JsonResponse(
                 {"error": "worker IDs in shift must be distinct"}, status=400
             )
-        common_prefix = 0
-        while (
-            common_prefix < len(upd.old_ones)
-            and common_prefix < len(workers)
-            and upd.old_ones[common_prefix]["worker_id"] == workers[common_prefix]["id"]
-        ):
-            common_prefix += 1
-        to_delete = upd.old_ones[common_prefix:]
-        to_insert = workers[common_prefix:]
+        version = data.get("version")
+        if not isinstance(version, int):
+            return JsonResponse(
+                {"error": "expected the version of the shift that was edited"},
+                status=400,
+            )
+        try:
+            response = atomic_with_retry(
+                lambda: self.update_shift(request, date, slug, workers, version)
+            )
+        except VersionConflict as e:
+            return version_conflict_response(e)
+        if response.status_code == 200:
+            caching.invalidate_dates([date])
+        return response
+
+    def update_shift(
+        self,
+        request,
+        date: datetime.date,
+        slug: str,
+        workers: List[Dict[str, Any]],
+        version: int,
+    ) -> JsonResponse:
+        workplace = models.Workplace.get_current()
+        upd = prepare_shift_update(workplace, date, slug)
+        check_versions({(date, slug): upd}, {(date, slug): version})
+        shift_id = upd.get_or_create_shift_id()
+        if shift_id is None:
+            raise Http404
+        to_delete, to_insert_models = upd.plan_workers([w["id"] for w in workers])
         to_delete_qs = models.WorkerShift.objects.filter(
             id__in=[o["id"] for o in to_delete]
         )
-        start_order = (
-            (1 + upd.old_ones[common_prefix - 1]["order"]) if common_prefix else 1
-        )
-        to_insert_models = [
-            models.WorkerShift(
-                worker_id=o["id"],
-                shift_id=shift_id,
-                order=start_order + i,
-            )
-            for i, o in enumerate(to_insert)
-        ]
         if to_delete:
             del_count = to_delete_qs.count()
             if del_count != len(to_delete):
@@ -1130,6 +2175,11 @@ class ApiShift(ApiMixin, View):
                 )
             to_delete_qs.delete()
         models.WorkerShift.objects.bulk_create(to_insert_models)
+        models.add_worker_shift_counts(
+            [(o["worker_id"], date, -1) for o in to_delete]
+            + [(ws.worker_id, date, 1) for ws in to_insert_models]
+        )
+        bump_checked_versions([upd])
         upd.create_changelog_entry(
             "edit",
             user=request.user,
@@ -1137,15 +2187,133 @@ class ApiShift(ApiMixin, View):
         return JsonResponse(
             {
                 "ok": True,
+                "version": upd.version,
                 "debug": {
-                    "common_prefix": common_prefix,
                     "to_delete": to_delete,
-                    "to_insert": to_insert,
+                    "to_insert": [
+                        {"id": ws.worker_id, "order": ws.order}
+                        for ws in to_insert_models
+                    ],
                 },
             }
         )
 
 
+class ApiShiftStaffing(ApiMixin, View):
+    """
+    Set the workers of many shifts at once. POST {"shifts": [{"date":
+    "2021-03-01", "slug": "DV", "version": 3, "workers": [{"id": 1}]}]},
+    where version is the version of the shift that the client has seen.
+    """
+
+    MAX_SHIFTS = 1000
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+            staffing: Dict[ShiftKey, List[int]] = {}
+            versions: Dict[ShiftKey, int] = {}
+            for shift in data["shifts"]:
+                date = datetime.datetime.strptime(shift["date"], "%Y-%m-%d").date()
+                key = (date, str(shift["slug"]))
+                if key in staffing:
+                    return JsonResponse(
+                        {"error": "shift %s %s given twice" % key}, status=400
+                    )
+                staffing[key] = [int(w["id"]) for w in shift["workers"]]
+                versions[key] = int(shift["version"])
+        except Exception:
+            return JsonResponse(
+                {"error": "expected JSON body with a list of shifts with versions"},
+                status=400,
+            )
+        if len(staffing) > self.MAX_SHIFTS:
+            return JsonResponse(
+                {"error": "at most %s shifts per request" % self.MAX_SHIFTS},
+                status=400,
+            )
+        for key, worker_ids in staffing.items():
+            if len(set(worker_ids)) != len(worker_ids):
+                return JsonResponse(
+                    {"error": "worker IDs in shift %s %s must be distinct" % key},
+                    status=400,
+                )
+        all_ids = set(w for worker_ids in staffing.values() for w in worker_ids)
+        worker_names = dict(
+            models.Worker.objects.filter(id__in=all_ids).values_list("id", "name")
+        )
+        if len(worker_names) != len(all_ids):
+            return JsonResponse(
+                {"error": "no such worker: %s" % sorted(all_ids - set(worker_names))},
+                status=400,
+            )
+        now = timezone.now()
+        try:
+            results = atomic_with_retry(
+                lambda: update_staffing(
+                    staffing, versions, worker_names, request.user, now
+                )
+            )
+        except VersionConflict as e:
+            return version_conflict_response(e)
+        caching.invalidate_dates(
+            [date for (date, slug), r in results.items() if r["result"] == "updated"]
+        )
+        return JsonResponse(
+            {
+                "ok": True,
+                "results": [
+                    {"date": str(date), "slug": slug, **results[date, slug]}
+                    for date, slug in staffing
+                ],
+            }
+        )
+
+
+class ApiMaterialize(ApiMixin, View):
+    """
+    Save the default shifts of a range of days, e.g. a whole season.
+    POST {"from": "2021-01-01", "until": "2021-06-30"}.
+    """
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body.decode("utf-8"))
+            fromdate = datetime.datetime.strptime(data["from"], "%Y-%m-%d").date()
+            untildate = datetime.datetime.strptime(data["until"], "%Y-%m-%d").date()
+        except Exception:
+            return JsonResponse(
+                {"error": "expected JSON body with from and until"}, status=400
+            )
+        if not 0 <= (untildate - fromdate).days < MAX_MATERIALIZE_DAYS:
+            return JsonResponse(
+                {"error": "at most %s days at a time" % MAX_MATERIALIZE_DAYS},
+                status=400,
+            )
+        return JsonResponse(
+            {"ok": True, "materialized_days": materialize_range(fromdate, untildate)}
+        )
+
+
+class ApiInstrumentation(ApiMixin, View):
+    def get(self, request):
+        return JsonResponse(
+            {
+                **instrumentation.request_stats.as_dict(),
+                "registration_queue": admission.registration_queue.as_dict(),
+                "changelog_buffer": changelog_buffer.buffer.as_dict(),
+                "idempotency": idempotency.stats.as_dict(),
+            }
+        )
+
+    def post(self, request):
+        instrumentation.request_stats.reset()
+        admission.registration_queue.reset_stats()
+        changelog_buffer.buffer.reset_stats()
+        idempotency.stats.reset()
+        return JsonResponse({"ok": True})
+
+
 class ApiChangelog(ApiMixin, View, WeekFilterMixin):
     def get(self, request):
         qs = models.Changelog.objects.all()
@@ -1254,11 +2422,17 @@ class ApiExport(ApiMixin, View):
         )
 
 
-class AdminPrintView(ApiMixin, TemplateView):
+class AdminPrintView(ApiMixin, ETagMixin, TemplateView):
     template_name = "shifts/schedule_print.html"
 
+    def get_etag(self) -> Optional[str]:
+        monday = monday_from_week_string(self.kwargs["week"])
+        if monday is None:
+            return None
+        return caching.make_etag(monday, *caching.get_week_versions([monday]))
+
     def get_context_data(self, **kwargs):
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         workplace_settings = workplace.get_settings()
         print_header_text = workplace_settings.get("print_header_text") or ""
         max_print = int(workplace_settings.get("max_print_per_shift") or 3)
@@ -1329,7 +2503,7 @@ class AdminViewBase(ApiMixin, TemplateView):
             return {}
 
     def get_context_data(self, **kwargs):
-        workplace = models.Workplace.objects.all()[:1][0]
+        workplace = models.Workplace.get_current()
         if settings.FRONTEND_DEV_MODE:
             port = settings.FRONTEND_DEV_PORT
             styles = [static(s) for s in self.styles]